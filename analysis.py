@@ -0,0 +1,140 @@
+from functools import lru_cache
+
+from css import parse_stylesheet, parse_selector, split_selector_list, Rule, AtRule
+from tweaks import TWEAKS, Tweak
+
+
+# Estimated matching cost of selector parts, numbers are relative weights not timings
+COMPOUND_COST = 1
+DESCENDANT_COST = 2
+GENERAL_SIBLING_COST = 2
+HAS_COST = 25
+SUBSTRING_ATTRIBUTE_COST = 6
+WORD_ATTRIBUTE_COST = 3
+UNIVERSAL_KEY_COST = 15
+UNIVERSAL_COST = 3
+DEEP_CHAIN_LENGTH = 6
+DEEP_CHAIN_COST = 4
+# selector with score from this value is shown as expensive
+EXPENSIVE_SCORE = 20
+
+_NESTED_PSEUDOS = {"has", "not", "is", "where", "matches"}
+
+
+class SelectorCostError(Exception):
+    pass
+
+
+class SelectorCost:
+    def __init__(self, selector: str, score: int, reasons: list[str]) -> None:
+        self.selector = selector
+        self.score = score
+        self.reasons = reasons
+
+    @property
+    def expensive(self) -> bool:
+        return self.score >= EXPENSIVE_SCORE
+
+
+def _compound_cost(compound, is_key: bool, reasons: list[str]) -> int:
+    score = COMPOUND_COST
+    for part in compound:
+        if part.kind == "universal" and len(compound) == 1:
+            if is_key:
+                score += UNIVERSAL_KEY_COST
+                reasons.append("universal key selector")
+            else:
+                score += UNIVERSAL_COST
+                reasons.append("universal selector")
+        elif part.kind == "attribute" and part.operator in ("*=", "^=", "$="):
+            score += SUBSTRING_ATTRIBUTE_COST
+            reasons.append(f"substring attribute match [{part.name}{part.operator}]")
+        elif part.kind == "attribute" and part.operator in ("~=", "|="):
+            score += WORD_ATTRIBUTE_COST
+            reasons.append(f"word attribute match [{part.name}{part.operator}]")
+        elif part.kind == "pseudo" and part.name in _NESTED_PSEUDOS and part.argument:
+            inner = sum(_selector_score(s, reasons) for s in split_selector_list(part.argument))
+            if part.name == "has":
+                score += HAS_COST + inner * 2
+                reasons.append(":has() re-evaluated on subtree mutations")
+            else:
+                score += inner
+    return score
+
+
+def _selector_score(selector: str, reasons: list[str]) -> int:
+    chain = parse_selector(selector)
+    score = 0
+    for index, (combinator, compound) in enumerate(chain):
+        if combinator == " ":
+            score += DESCENDANT_COST
+        elif combinator == "~":
+            score += GENERAL_SIBLING_COST
+        score += _compound_cost(compound, index == len(chain) - 1, reasons)
+    if len(chain) > DEEP_CHAIN_LENGTH:
+        score += (len(chain) - DEEP_CHAIN_LENGTH) * DEEP_CHAIN_COST
+        reasons.append(f"deep chain of {len(chain)} compounds")
+    return score
+
+
+@lru_cache(maxsize=4096)
+def selector_cost(selector: str) -> SelectorCost:
+    reasons = []
+    try:
+        score = _selector_score(selector, reasons)
+    except ValueError as e:
+        return SelectorCost(selector, 0, [f"not analyzed: {e}"])
+    return SelectorCost(selector, score, list(dict.fromkeys(reasons)))
+
+
+def _rules(nodes):
+    for node in nodes:
+        if isinstance(node, Rule):
+            yield node
+        elif isinstance(node, AtRule) and node.rules is not None:
+            yield from _rules(node.rules)
+
+
+def stylesheet_costs(css: str) -> list[SelectorCost]:
+    """Cost of every selector in stylesheet, in source order"""
+    return [selector_cost(selector) for rule in _rules(parse_stylesheet(css)) for selector in rule.selectors]
+
+
+# tweak id -> (content key, total score, costs), content key is kept to notice changed tweaks
+_tweak_costs: dict[str, tuple[object, int, list[SelectorCost]]] = {}
+
+
+def tweak_costs(tweak: Tweak) -> list[SelectorCost]:
+    cached = _tweak_costs.get(tweak.id)
+    if cached is None or cached[0] != tweak.content_key:
+        costs = stylesheet_costs(tweak.css())
+        cached = (tweak.content_key, sum(cost.score for cost in costs), costs)
+        _tweak_costs[tweak.id] = cached
+    return cached[2]
+
+
+def tweak_cost(tweak: Tweak) -> int:
+    tweak_costs(tweak)
+    return _tweak_costs[tweak.id][1]
+
+
+def project_cost(tweak_ids: list[str]) -> int:
+    total = 0
+    for tweak_id in tweak_ids:
+        tweak = TWEAKS.get(tweak_id)
+        if tweak:
+            total += tweak_cost(tweak)
+    return total
+
+
+def check_project_cost(tweak_ids: list[str], max_cost: int) -> int:
+    """Returns total cost of tweaks, raises SelectorCostError if it is above max_cost"""
+    total = project_cost(tweak_ids)
+    if total > max_cost:
+        expensive = sorted(
+            (tweak_id for tweak_id in set(tweak_ids) if tweak_id in TWEAKS),
+            key=lambda tweak_id: tweak_cost(TWEAKS.get(tweak_id)),
+            reverse=True
+        )[:3]
+        raise SelectorCostError(f"Selector cost {total} is above limit {max_cost} (most expensive: {', '.join(expensive)})")
+    return total
@@ -0,0 +1,149 @@
+from PyQt6.QtCore import Qt, QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+from projects import Project, ProjectHandler, save_project_file
+from render import CssWriter
+
+
+class AutosaveSignals(QObject):
+    saved = pyqtSignal(str)
+    failed = pyqtSignal(str)
+    # snapshot that was written, delivered on gui thread
+    written = pyqtSignal(object)
+
+
+class AutosaveTask(QRunnable):
+    def __init__(self, snapshot: Project, css_writer: CssWriter = None, optimize_css: bool = False, save=save_project_file,
+                 tweaks=None, params: dict = None, max_cost: int = None):
+        super().__init__()
+        self.snapshot = snapshot
+        self.save = save
+        # rendered tweaks, inherited ones included
+        self.tweaks = tweaks if tweaks is not None else snapshot.tweaks
+        self.params = params if params is not None else snapshot.params
+        self.css_writer = css_writer
+        self.optimize_css = optimize_css
+        self.max_cost = max_cost
+        self.signals = AutosaveSignals()
+
+    def run(self):
+        try:
+            self.save(self.snapshot)
+            self.signals.written.emit(self.snapshot)
+            if self.css_writer:
+                self.css_writer.render(self.snapshot.abs_path, self.tweaks, self.optimize_css, self.max_cost,
+                                       params=self.params)
+            self.signals.saved.emit(self.snapshot.name)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+
+
+class AutosaveController(QObject):
+    """Marks project dirty on every change and saves it once changes stop for debounce_ms.
+    Writes run on single-thread pool, so they never overlap and the latest snapshot is written last"""
+    saved = pyqtSignal(str)
+    failed = pyqtSignal(str)
+    DEBOUNCE_MS = 1000
+
+    def __init__(self, parent=None, debounce_ms: int = DEBOUNCE_MS):
+        super().__init__(parent)
+        self.enabled = False
+        self.render_css = False
+        self.optimize_css = False
+        # selector cost limit of rendered css, None disables the check
+        self.max_selector_cost = None
+        self.css_writer = CssWriter()
+        # writes snapshot, called from pool thread
+        self.save = save_project_file
+        # when set, snapshot is written to its store, bases are checked and inherited tweaks rendered,
+        # and loaded copy of project is updated on gui thread after write (see ProjectHandler.remember_saved)
+        self.project_handler: ProjectHandler | None = None
+        self.project: Project | None = None
+        self.dirty = False
+        self.tasks = []
+        # bumped by manual save, written signals of older tasks still queued are ignored
+        self.generation = 0
+        
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(debounce_ms)
+        self.timer.timeout.connect(self.save_now)
+
+    def set_debounce(self, debounce_ms: int):
+        self.timer.setInterval(debounce_ms)
+
+    def debounce(self) -> int:
+        return self.timer.interval()
+
+    def mark_dirty(self, project: Project):
+        """Restarts debounce timer, so burst of changes results in one write"""
+        if not self.enabled:
+            return
+        if self.project is not None and self.project is not project:
+            self.flush()
+        self.project = project
+        self.dirty = True
+        self.timer.start()
+
+    def save_now(self):
+        self.timer.stop()
+        if not self.dirty or self.project is None:
+            return
+        self.dirty = False
+        snapshot = self.project.copy()
+        css_writer = self.css_writer if self.render_css else None
+        save = self.save
+        handler = self.project_handler
+        tweaks = params = None
+        if handler is not None:
+            save = handler.store.save
+            try:
+                # same check as manual save, project extending itself is not written
+                handler.check_bases(snapshot)
+                if css_writer:
+                    tweaks = handler.resolved_tweaks(snapshot).copy()
+                    params = {tweak_id: dict(values) for tweak_id, values in handler.resolved_params(snapshot).items()}
+            except ValueError as e:
+                self.failed.emit(str(e))
+                return
+        task = AutosaveTask(snapshot, css_writer, self.optimize_css, save, tweaks, params, self.max_selector_cost)
+        if handler is not None:
+            # queued to controller thread, handler is not thread safe
+            task.signals.written.connect(lambda project, generation=self.generation: self._remember_saved(project, generation),
+                                         Qt.ConnectionType.QueuedConnection)
+        # status of write finished before manual save would be reported after it
+        task.signals.saved.connect(lambda name, generation=self.generation: self._report_saved(name, generation))
+        task.signals.failed.connect(self.failed)
+        task.signals.saved.connect(lambda _, task=task: self._forget(task))
+        task.signals.failed.connect(lambda _, task=task: self._forget(task))
+        # keep python reference until signals are delivered
+        self.tasks.append(task)
+        self.pool.start(task)
+
+    def _report_saved(self, name: str, generation: int):
+        if generation == self.generation:
+            self.saved.emit(name)
+
+    def _remember_saved(self, project, generation: int):
+        if self.project_handler is not None and generation == self.generation:
+            self.project_handler.remember_saved(project)
+
+    def _forget(self, task):
+        if task in self.tasks:
+            self.tasks.remove(task)
+
+    def discard_pending(self):
+        """Called before manual save: pending changes are dropped and running write is waited for,
+        so older snapshot can not overwrite the manually saved project"""
+        self.timer.stop()
+        self.dirty = False
+        self.pool.waitForDone()
+        self.generation += 1
+
+    def flush(self):
+        """Writes pending changes and waits until every write is finished"""
+        self.save_now()
+        self.pool.waitForDone()
+        self.project = None
@@ -0,0 +1,614 @@
+import json
+from PyQt6.QtCore import Qt, QThreadPool
+from PyQt6.QtWidgets import (QMainWindow, QWidget, QMessageBox, QInputDialog,
+                             QFileDialog, QDialog, QVBoxLayout, QListView, QLabel, QLineEdit)
+from PyQt6.QtGui import QAction
+
+from projects import ProjectHandler, Project, InheritanceError
+from templates import ParamError
+from app.tweaks_list import TweaksListModel, TweakItemDelegate, TweakRole
+from app.project_loader import ProjectLoadWorker
+from app.styles_watcher import QtStylesWatcher
+from app.autosave import AutosaveController
+from tweaks import TWEAKS, TweakRegistry
+from search import IncrementalSearch, get_search_index
+from render import CssWriter, get_css_path
+from analysis import SelectorCostError, project_cost
+from conflicts import get_conflict_graph
+from vscode_targets import discover_targets, apply_css
+from tracing import traced
+
+APP_NAME = "VSCode Tweaks"
+
+class TweakManager:
+    def __init__(self, main_window):
+        self.main_window = main_window
+        self.tweaks_widget = None
+        self.tweaks_model = None
+        self.tweaks_view = None
+        self.filter_edit = None
+        self.search = None
+
+    @traced("ui.create_tweaks_interface")
+    def create_tweaks_interface(self, tweaks_list):
+        """Creates ui of tweaks list"""
+        container = QWidget()
+        layout = QVBoxLayout(container)
+        
+        title = QLabel("Available Tweaks")
+        title.setStyleSheet("font-size: 16px; font-weight: bold;")
+        layout.addWidget(title)
+        
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Filter tweaks")
+        self.filter_edit.setClearButtonEnabled(True)
+        self.filter_edit.textChanged.connect(self.apply_filter)
+        layout.addWidget(self.filter_edit)
+        
+        self.tweaks_model = TweaksListModel(tweaks_list)
+        self.tweaks_model.tweak_toggled.connect(self.on_tweak_toggled)
+        # model rows are catalog ordinals only when model is built from registry itself
+        self.search = IncrementalSearch(get_search_index(tweaks_list)) if isinstance(tweaks_list, TweakRegistry) else None
+        
+        self.tweaks_view = QListView()
+        self.tweaks_view.setModel(self.tweaks_model)
+        self.tweaks_view.setItemDelegate(TweakItemDelegate(self.tweaks_view))
+        self.tweaks_view.setUniformItemSizes(True)
+        self.tweaks_view.setMouseTracking(True)
+        self.tweaks_view.setSelectionMode(QListView.SelectionMode.NoSelection)
+        self.tweaks_view.setVerticalScrollMode(QListView.ScrollMode.ScrollPerPixel)
+        self.tweaks_view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.tweaks_view.doubleClicked.connect(self.on_tweak_double_clicked)
+        layout.addWidget(self.tweaks_view)
+        
+        self.tweaks_widget = container
+        self.tweaks_widget.hide()
+        return container
+
+    @traced("ui.filter_tweaks")
+    def apply_filter(self, text):
+        """Narrows tweaks list to ones matching text, called on every keystroke"""
+        if self.search is None:
+            return
+        self.tweaks_model.set_visible_rows(self.search.update(text) if text.strip() else None)
+
+    def on_tweak_double_clicked(self, index):
+        tweak = index.data(TweakRole)
+        if tweak is not None and tweak.params:
+            self.main_window.edit_tweak_params(tweak)
+
+    def on_tweak_toggled(self, tweak_id, checked):
+        """When tweak selection changed"""
+        self.main_window.handle_tweak_toggle(tweak_id, checked)
+
+    def show_tweaks_interface(self):
+        """Shows tweaks ui (when project selected)"""
+        if self.tweaks_widget:
+            self.tweaks_widget.show()
+
+    def hide_tweaks_interface(self):
+        """Hides tweaks ui (when project is closed)"""
+        if self.tweaks_widget:
+            self.tweaks_widget.hide()
+
+    def get_selected_tweaks(self):
+        """Returns selected tweaks ids"""
+        return self.tweaks_model.checked_ids()
+
+    @traced("ui.set_selected_tweaks")
+    def set_selected_tweaks(self, tweak_ids):
+        """Restores tweaks from list of tweaks"""
+        self.tweaks_model.set_checked_ids(tweak_ids)
+
+    def set_tweak_checked(self, tweak_id, checked):
+        """Changes checkbox state without notifying main window"""
+        self.tweaks_model.set_tweak_checked(tweak_id, checked)
+
+    def clear_selection(self):
+        """Resets all selections"""
+        for tweak_id in self.get_selected_tweaks():
+            # row can be hidden by filter, so state is changed by id
+            self.tweaks_model.set_tweak_checked(tweak_id, False)
+            self.on_tweak_toggled(tweak_id, False)
+
+
+class MainWindow(QMainWindow):
+    def __init__(self, project_handler: ProjectHandler) -> None:
+        super().__init__()
+        self.project_handler = project_handler
+        self.working_project: Project | None = None
+        self.tweak_manager = TweakManager(self)
+        self.css_writer = CssWriter()
+        self.optimize_css = False
+        # selector cost limit for rendering, None disables the check
+        self.max_selector_cost = None
+        # settings.json paths left unchecked in last Apply to VSCode dialog
+        self.unchecked_targets: set[str] = set()
+        # when enabled checking a tweak unchecks tweaks conflicting with it
+        self.auto_resolve_conflicts = False
+        self.project_dialog = None
+        self.projects_loading = False
+        self.projects_loaded = (0, 0)
+        self.project_loader = None
+        self.styles_watcher = None
+        self.autosave = AutosaveController(self)
+        self.autosave.project_handler = project_handler
+        self.autosave.saved.connect(lambda name: self.statusBar().showMessage(f"Autosaved: {name}"))
+        self.autosave.failed.connect(lambda error: self.statusBar().showMessage(f"Autosave failed: {error}"))
+        
+        self.setup_ui()
+        self.create_menu_bar()
+
+    def start_loading_projects(self):
+        """Loads projects in background, window and project dialog are filled by batches"""
+        self.projects_loading = True
+        self.statusBar().showMessage("Loading projects...")
+        worker = ProjectLoadWorker(self.project_handler)
+        worker.signals.batch_loaded.connect(self.on_projects_batch_loaded)
+        worker.signals.failed.connect(self.on_projects_loading_failed)
+        worker.signals.finished.connect(self.on_projects_loading_finished)
+        self.project_loader = worker
+        QThreadPool.globalInstance().start(worker)
+
+    def on_projects_batch_loaded(self, batch, done, total):
+        added = self.project_handler.add_projects(batch)
+        self.projects_loaded = (done, total)
+        if self.project_dialog:
+            self.project_dialog.add_projects(added)
+            self.project_dialog.set_loading_state(done, total)
+        self.statusBar().showMessage(f"Loading projects {done}/{total}...")
+
+    def on_projects_loading_failed(self, error):
+        QMessageBox.critical(self, "Error", f"Failed to load projects: {error}")
+
+    def on_projects_loading_finished(self):
+        self.projects_loading = False
+        self.project_loader = None
+        self.start_watching_styles()
+        if self.project_dialog:
+            self.project_dialog.set_loading_state(*self.projects_loaded, loading=False)
+        self.statusBar().showMessage(f"Projects loaded: {len(self.project_handler.projects)}")
+
+    def start_watching_styles(self):
+        if self.styles_watcher is None and self.project_handler.store.watchable:
+            self.styles_watcher = QtStylesWatcher(self.project_handler, self)
+            self.styles_watcher.projects_changed.connect(self.on_projects_changed)
+            # pick up changes made while projects were loading
+            self.styles_watcher.schedule_poll()
+
+    def on_projects_changed(self, updates):
+        for event, project in updates:
+            if self.project_dialog:
+                if event == "removed":
+                    self.project_dialog.remove_project(project)
+                else:
+                    self.project_dialog.update_project(project)
+            # working project is a copy read from store, loaded descendants are other objects
+            if self.working_project and self.working_project.abs_path in {
+                descendant.abs_path for descendant in self.project_handler.descendants(project)
+            }:
+                self.show_inherited_changes()
+        self.statusBar().showMessage(f"Projects updated: {len(updates)} changed, {len(self.project_handler.projects)} total")
+
+    @traced("ui.setup")
+    def setup_ui(self):
+        self.setWindowTitle(APP_NAME)
+        self.setGeometry(*self.calculate_window_size())
+        
+        self.central_widget = QWidget()
+        self.setCentralWidget(self.central_widget)
+        
+        self.main_layout = QVBoxLayout(self.central_widget)
+        
+        self.welcome_label = QLabel("Welcome to VSCode Tweaks Manager!\nCreate a new project or open an existing one.")
+        self.welcome_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.welcome_label.setStyleSheet("font-size: 14px; color: #6c757d; margin: 50px;")
+        self.main_layout.addWidget(self.welcome_label)
+        
+        tweaks_interface = self.tweak_manager.create_tweaks_interface(self.get_available_tweaks())
+        self.main_layout.addWidget(tweaks_interface)
+        
+        self.statusBar().showMessage("Ready")
+
+    def calculate_window_size(self):
+        screen = self.screen()
+        
+        if screen:
+            screen_size = screen.availableGeometry()
+            screen_width = screen_size.width()
+            screen_height = screen_size.height()
+            
+            window_width = screen_width // 4
+            window_height = screen_height // 3
+            
+            x = (screen_width - window_width) // 2
+            y = (screen_height - window_height) // 2
+            
+            return x, y, window_width, window_height
+        else:
+            return 100, 100, 800, 600
+
+    def get_available_tweaks(self):
+        return TWEAKS
+
+    def get_enabled_tweaks_from_project(self, project_data):
+        return project_data.get("tweaks", [])
+
+    def handle_tweak_toggle(self, tweak_id, checked):
+        if self.working_project:
+            self.autosave.mark_dirty(self.working_project)
+            graph = get_conflict_graph()
+            if not checked:
+                self.project_handler.set_tweak(self.working_project, tweak_id, False)
+                return
+            
+            clashes = graph.check(tweak_id, self.resolved_tweaks().mask)
+            self.project_handler.set_tweak(self.working_project, tweak_id, True)
+            if not clashes:
+                return
+            if self.auto_resolve_conflicts:
+                for other_id in clashes:
+                    self.tweak_manager.set_tweak_checked(other_id, False)
+                    self.handle_tweak_toggle(other_id, False)
+                self.statusBar().showMessage(f"Disabled conflicting tweaks: {', '.join(clashes)}")
+            else:
+                self.statusBar().showMessage(f"Warning: {tweak_id} conflicts with {', '.join(clashes)}")
+
+    def resolved_tweaks(self):
+        """Tweaks of working project including inherited ones"""
+        return self.project_handler.resolved_tweaks(self.working_project)
+
+    def show_inherited_changes(self):
+        """Base of working project changed on disk"""
+        try:
+            self.tweak_manager.set_selected_tweaks(self.resolved_tweaks().ids())
+        except InheritanceError as e:
+            self.statusBar().showMessage(str(e))
+
+    def edit_tweak_params(self, tweak):
+        if not self.working_project:
+            return
+        # dialog module is imported on first use to keep startup light
+        from app.params_dialog import TweakParamsDialog
+
+        values = self.project_handler.resolved_params(self.working_project).get(tweak.id, {})
+        dialog = TweakParamsDialog(self, tweak, values)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        try:
+            for name, value in dialog.get_values().items():
+                self.project_handler.set_param(self.working_project, tweak.id, name, value)
+        except ParamError as e:
+            QMessageBox.warning(self, "Warning", str(e))
+            return
+        self.autosave.mark_dirty(self.working_project)
+        self.statusBar().showMessage(f"Parameters of {tweak.name} changed")
+
+    def report_conflicts(self):
+        pairs = get_conflict_graph().validate(self.resolved_tweaks())
+        if pairs:
+            self.statusBar().showMessage(
+                "Conflicting tweaks: " + ", ".join(f"{a} / {b}" for a, b in pairs)
+            )
+
+    def set_auto_resolve_conflicts(self, checked):
+        self.auto_resolve_conflicts = checked
+
+    def set_autosave(self, checked):
+        self.autosave.enabled = checked
+        if not checked:
+            self.autosave.flush()
+
+    def edit_autosave_delay(self):
+        value, ok = QInputDialog.getInt(
+            self,
+            "Autosave Delay",
+            "Save project this many milliseconds after last change:",
+            value=self.autosave.debounce(),
+            min=100,
+            max=60_000,
+            step=100
+        )
+        if ok:
+            self.autosave.set_debounce(value)
+
+    def set_autosave_render(self, checked):
+        self.autosave.render_css = checked
+
+    def closeEvent(self, event):
+        self.autosave.flush()
+        super().closeEvent(event)
+
+    def create_menu_bar(self):
+        menubar = self.menuBar()
+        
+        project_menu = menubar.addMenu("Project")
+        
+        # New Project
+        new_action = QAction("New", self)
+        new_action.setStatusTip("Create new project")
+        new_action.triggered.connect(self.new_project)
+        project_menu.addAction(new_action)
+        
+        project_menu.addSeparator()
+        
+        # Open actions
+        open_via_manager = QAction("Open via manager", self)
+        open_via_manager.setStatusTip("Open project using project manager")
+        open_via_manager.triggered.connect(self.open_project)
+        project_menu.addAction(open_via_manager)
+
+        open_from_file = QAction("Open from file", self)
+        open_from_file.setStatusTip("Open project from JSON file")
+        open_from_file.triggered.connect(self.open_project_from_file)
+        project_menu.addAction(open_from_file)
+        
+        project_menu.addSeparator()
+        
+        # Save actions
+        save_action = QAction("Save", self)
+        save_action.setStatusTip("Save project changes")
+        save_action.triggered.connect(self.save_project)
+        project_menu.addAction(save_action)
+
+        save_as_action = QAction("Save as", self)
+        save_as_action.setStatusTip("Save project to new file")
+        save_as_action.triggered.connect(self.save_project_as)
+        project_menu.addAction(save_as_action)
+        
+        project_menu.addSeparator()
+        
+        # Apply actions
+        save_to_css = QAction("Save to .css", self)
+        save_to_css.setStatusTip("Export tweaks to CSS file")
+        save_to_css.triggered.connect(self.render_to_css)
+        project_menu.addAction(save_to_css)
+
+        optimize_css = QAction("Optimize .css output", self)
+        optimize_css.setStatusTip("Strip comments and whitespace, merge rules with same selectors")
+        optimize_css.setCheckable(True)
+        optimize_css.setChecked(self.optimize_css)
+        optimize_css.toggled.connect(self.set_optimize_css)
+        project_menu.addAction(optimize_css)
+
+        max_selector_cost = QAction("Selector cost limit...", self)
+        max_selector_cost.setStatusTip("Refuse to render .css whose selectors cost more than the limit")
+        max_selector_cost.triggered.connect(self.edit_max_selector_cost)
+        project_menu.addAction(max_selector_cost)
+
+        auto_resolve = QAction("Auto-resolve conflicts", self)
+        auto_resolve.setStatusTip("Uncheck tweaks that conflict with newly checked one")
+        auto_resolve.setCheckable(True)
+        auto_resolve.setChecked(self.auto_resolve_conflicts)
+        auto_resolve.toggled.connect(self.set_auto_resolve_conflicts)
+        project_menu.addAction(auto_resolve)
+
+        autosave = QAction("Autosave", self)
+        autosave.setStatusTip("Save project in background shortly after changes")
+        autosave.setCheckable(True)
+        autosave.setChecked(self.autosave.enabled)
+        autosave.toggled.connect(self.set_autosave)
+        project_menu.addAction(autosave)
+
+        autosave_delay = QAction("Autosave delay...", self)
+        autosave_delay.setStatusTip("Time without changes after which project is autosaved")
+        autosave_delay.triggered.connect(self.edit_autosave_delay)
+        project_menu.addAction(autosave_delay)
+
+        autosave_render = QAction("Update .css on autosave", self)
+        autosave_render.setStatusTip("Render .css file together with autosave")
+        autosave_render.setCheckable(True)
+        autosave_render.setChecked(self.autosave.render_css)
+        autosave_render.toggled.connect(self.set_autosave_render)
+        project_menu.addAction(autosave_render)
+
+        apply_to_vsc = QAction("Apply to VSCode", self)
+        apply_to_vsc.setStatusTip("Apply styles to settings of every found VSCode install and profile")
+        apply_to_vsc.triggered.connect(self.change_path_of_style_to_current)
+        project_menu.addAction(apply_to_vsc)
+
+
+    def set_optimize_css(self, checked):
+        self.optimize_css = checked
+        self.autosave.optimize_css = checked
+
+    def edit_max_selector_cost(self):
+        value, ok = QInputDialog.getInt(
+            self,
+            "Selector Cost Limit",
+            "Maximum selector cost of rendered .css (0 disables the check):",
+            value=self.max_selector_cost or 0,
+            min=0,
+            max=1_000_000
+        )
+        if ok:
+            self.set_max_selector_cost(value or None)
+
+    def set_max_selector_cost(self, value: int | None):
+        self.max_selector_cost = value
+        self.autosave.max_selector_cost = value
+
+    @traced("ui.apply_to_vscode")
+    def change_path_of_style_to_current(self):
+        if not self.working_project:
+            return
+        # settings are not pointed at css that was not written
+        if not self.render_to_css():
+            return
+        
+        targets = discover_targets()
+        if not targets:
+            QMessageBox.warning(self, "Warning", "No VSCode settings.json was found.")
+            return
+        # dialog module is imported on first use to keep startup light
+        from app.targets_dialog import TargetsDialog
+        dialog = TargetsDialog(self, targets, self.unchecked_targets)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        # targets unchecked once stay unchecked next time
+        self.unchecked_targets = dialog.get_unchecked_paths()
+        targets = dialog.get_selected_targets()
+        if not targets:
+            return
+        
+        results = apply_css(targets, self.get_css_path(self.working_project.abs_path))
+        lines = []
+        for result in results:
+            if result.error:
+                status = f"error: {result.error}"
+            else:
+                status = "updated" if result.changed else "up to date"
+            lines.append(f"{result.target.label}: {status} ({result.seconds * 1000:.1f} ms)")
+        
+        failed = [result for result in results if result.error]
+        if failed:
+            QMessageBox.critical(self, "Error", "Failed to update some settings:\n" + "\n".join(lines))
+        else:
+            self.statusBar().showMessage("; ".join(lines))
+
+    def new_project(self):
+        name, ok = QInputDialog.getText(
+            self, 
+            "New Project", 
+            "Enter project name:", 
+            text=f"project-{len(self.project_handler.projects)}"
+        )
+        
+        if ok and name:
+            new_project = self.project_handler.new_project(name)
+            self.load_project(new_project.abs_path)
+
+    def open_project(self):
+        # dialog module is imported on first use to keep startup light
+        from app.projects_window import ProjectSelectorDialog
+        
+        dialog = ProjectSelectorDialog(self, self.project_handler)
+        if self.projects_loading:
+            dialog.set_loading_state(*self.projects_loaded)
+        
+        self.project_dialog = dialog
+        try:
+            accepted = dialog.exec() == QDialog.DialogCode.Accepted
+        finally:
+            self.project_dialog = None
+        
+        if accepted:
+            project = dialog.get_selected_project()
+            if project:
+                # listed copy can be older than stored project
+                self.load_project(project.abs_path)
+
+    def get_css_path(self, original:str) -> str:
+        return get_css_path(original)
+
+    @traced("ui.render_to_css")
+    def render_to_css(self) -> bool:
+        """Returns True when css file of working project is up to date"""
+        if not self.working_project:
+            return False
+        try:
+            tweaks = self.resolved_tweaks()
+            written = self.css_writer.render(
+                self.working_project.abs_path,
+                tweaks,
+                self.optimize_css,
+                self.max_selector_cost,
+                params=self.project_handler.resolved_params(self.working_project)
+            )
+        except (SelectorCostError, InheritanceError, ParamError) as e:
+            QMessageBox.warning(self, "Warning", str(e))
+            return False
+        cost = project_cost(tweaks)
+        if written:
+            self.statusBar().showMessage(f"CSS file updated (selector cost {cost})")
+        else:
+            self.statusBar().showMessage(f"CSS file is up to date (selector cost {cost})")
+        return True
+
+    def open_project_from_file(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, 
+            caption="Open Project", 
+            directory=self.project_handler.styles_folder_name, 
+            filter="JSON Files (*.json)"
+        )
+        
+        if path:
+            self.load_project_from_file(path)
+
+    @traced("ui.load_project_from_file")
+    def load_project_from_file(self, path):
+        self.autosave.flush()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.show_project(Project().from_json(data, path))
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to load project: {str(e)}")
+
+    @traced("ui.load_project")
+    def load_project(self, abs_path):
+        """Opens project of project handler store"""
+        self.autosave.flush()
+        try:
+            project = self.project_handler.load_project(abs_path)
+            if project is None:
+                raise ValueError(f"{abs_path} does not exist")
+            self.show_project(project)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to load project: {str(e)}")
+
+    def show_project(self, project: Project):
+        # raises InheritanceError before anything is shown
+        tweaks = self.project_handler.resolved_tweaks(project)
+        self.working_project = project
+        self.setWindowTitle(f"{APP_NAME} - {project.name}")
+        self.statusBar().showMessage(f"Project loaded: {project.name}")
+        
+        self.welcome_label.hide()
+        self.tweak_manager.show_tweaks_interface()
+        if self.styles_watcher:
+            self.styles_watcher.watch_file(project.abs_path)
+        
+        self.tweak_manager.set_selected_tweaks(tweaks.ids())
+        self.report_conflicts()
+
+    def save_project(self):
+        if not self.working_project:
+            QMessageBox.warning(self, "Warning", "No project is currently open.")
+            return
+        
+        try:
+            self.autosave.discard_pending()
+            self.project_handler.save_project(self.working_project)
+                
+            self.statusBar().showMessage("Project saved successfully.")
+            
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to save project: {str(e)}")
+
+    def save_project_as(self):
+        if not self.working_project:
+            QMessageBox.warning(self, "Warning", "No project is currently open.")
+            return
+        
+        name, ok = QInputDialog.getText(
+            self, 
+            "Save Project As", 
+            "Enter new project name:",
+            text=self.working_project.name
+        )
+        
+        if ok and name:
+            try:
+                project = self.working_project
+                new_project = self.project_handler.new_project(
+                    name, project.tweaks.ids(), project.extends, project.removed, project.params
+                )
+                self.load_project(new_project.abs_path)
+                
+                self.statusBar().showMessage(f"Project saved as: {name}")
+                
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Failed to save project: {str(e)}")
+
@@ -0,0 +1,36 @@
+from PyQt6.QtWidgets import QDialog, QDialogButtonBox, QFormLayout, QLabel, QLineEdit, QVBoxLayout
+
+from tweaks import Tweak
+
+
+class TweakParamsDialog(QDialog):
+    """Edits parameter values of one tweak, empty field means default value"""
+    def __init__(self, parent, tweak: Tweak, values: dict):
+        super().__init__(parent)
+        self.tweak = tweak
+        self.edits = {}
+        self.setWindowTitle(f"Parameters of {tweak.name}")
+
+        layout = QVBoxLayout(self)
+        description = QLabel(tweak.description)
+        description.setWordWrap(True)
+        description.setStyleSheet("color: #6c757d;")
+        layout.addWidget(description)
+
+        form = QFormLayout()
+        for param in tweak.params:
+            edit = QLineEdit(values.get(param.name, ""))
+            edit.setPlaceholderText(param.default)
+            edit.setToolTip(f"{param.type}, default {param.default}")
+            form.addRow(param.label, edit)
+            self.edits[param.name] = edit
+        layout.addLayout(form)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    def get_values(self) -> dict:
+        """Parameter name -> entered value, None for empty fields"""
+        return {name: edit.text().strip() or None for name, edit in self.edits.items()}
@@ -0,0 +1,27 @@
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+from projects import ProjectHandler
+
+
+class ProjectLoaderSignals(QObject):
+    batch_loaded = pyqtSignal(list, int, int)
+    finished = pyqtSignal()
+    failed = pyqtSignal(str)
+
+
+class ProjectLoadWorker(QRunnable):
+    """Scans and parses projects in thread pool, results are delivered by batch_loaded signal"""
+    def __init__(self, project_handler: ProjectHandler, batch_size: int = ProjectHandler.BATCH_SIZE):
+        super().__init__()
+        self.project_handler = project_handler
+        self.batch_size = batch_size
+        self.signals = ProjectLoaderSignals()
+
+    def run(self):
+        try:
+            for batch, done, total in self.project_handler.load_project_batches(self.batch_size):
+                self.signals.batch_loaded.emit(batch, done, total)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        finally:
+            self.signals.finished.emit()
@@ -0,0 +1,69 @@
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex
+
+from projects import ProjectHandler
+
+
+ProjectRole = Qt.ItemDataRole.UserRole
+PathRole = Qt.ItemDataRole.UserRole + 1
+
+
+class ProjectsListModel(QAbstractListModel):
+    """Projects of ProjectHandler sorted by name, fetched page by page while view scrolls.
+    Name filter is applied by project handler (or its store), so filtering does not need every row"""
+    PAGE_SIZE = 200
+
+    def __init__(self, project_handler: ProjectHandler, parent=None):
+        super().__init__(parent)
+        self.project_handler = project_handler
+        self.name_filter = ""
+        self.projects = []
+        self.total = project_handler.count()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.projects)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and len(self.projects) < self.total
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        page = self.project_handler.page(len(self.projects), self.PAGE_SIZE, self.name_filter)
+        if not page:
+            # fewer projects than counted, some were removed meanwhile
+            self.total = len(self.projects)
+            return
+        self.beginInsertRows(QModelIndex(), len(self.projects), len(self.projects) + len(page) - 1)
+        self.projects.extend(page)
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        project = self.projects[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return project.name
+        if role == Qt.ItemDataRole.ToolTipRole or role == PathRole:
+            return project.abs_path
+        if role == ProjectRole:
+            return project
+        return None
+
+    def set_name_filter(self, name_filter: str):
+        """Starts listing again with only names containing name_filter (case insensitive)"""
+        self.name_filter = name_filter
+        self.reload(self.PAGE_SIZE)
+
+    def reload(self, keep_rows: int = None):
+        """Lists projects again after they changed, keeps at least as many rows fetched as before"""
+        rows = max(keep_rows if keep_rows is not None else len(self.projects), self.PAGE_SIZE)
+        self.beginResetModel()
+        self.total = self.project_handler.count(self.name_filter)
+        self.projects = self.project_handler.page(0, rows, self.name_filter)
+        self.endResetModel()
+
+    def row_of(self, abs_path: str) -> int | None:
+        for row, project in enumerate(self.projects):
+            if project.abs_path == abs_path:
+                return row
+        return None
@@ -1,58 +1,151 @@
-from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QListWidget, 
-                             QPushButton, QLabel, QListWidgetItem, QMessageBox)
-from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QListView, QListWidget, QSplitter,
+                             QPushButton, QLabel, QLineEdit, QMessageBox)
+from PyQt6.QtCore import Qt, QTimer
+
+from app.projects_list import ProjectsListModel, ProjectRole, PathRole
+from projects import ProjectHandler, InheritanceError
+from tweaks import TWEAKS
 
 
 class ProjectSelectorDialog(QDialog):
-    def __init__(self, parent=None, projects_list: list = None):
+    """Projects are listed by ProjectsListModel, only pages the list is scrolled to are fetched"""
+    # changes of project list come in bursts while projects are loading
+    RELOAD_DELAY_MS = 300
+
+    def __init__(self, parent, project_handler: ProjectHandler):
         super().__init__(parent)
-        self.projects = projects_list if projects_list is not None else []
+        self.project_handler = project_handler
         self.selected_project = None
-        
+
+        self.reload_timer = QTimer(self)
+        self.reload_timer.setSingleShot(True)
+        self.reload_timer.setInterval(self.RELOAD_DELAY_MS)
+        self.reload_timer.timeout.connect(self.reload_projects)
+
         self.setup_ui()
 
     def setup_ui(self):
         self.setWindowTitle("Select Project")
         self.resize(500, 400)
-        
+
         layout = QVBoxLayout()
-        
+
         title = QLabel("Available Projects:")
         title.setStyleSheet("font-weight: bold; margin-bottom: 10px;")
         layout.addWidget(title)
-        
-        self.projects_list = QListWidget()
-        self.projects_list.itemDoubleClicked.connect(self.accept_selection)
-        
-        for project in self.projects:
-            item = QListWidgetItem(project.name)
-            item.setData(Qt.ItemDataRole.UserRole, project.abs_path)
-            self.projects_list.addItem(item)
-        
-        layout.addWidget(self.projects_list)
-        
+
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Filter by name")
+        self.filter_edit.setClearButtonEnabled(True)
+        self.filter_edit.textChanged.connect(self.set_name_filter)
+        layout.addWidget(self.filter_edit)
+
+        self.loading_label = QLabel()
+        self.loading_label.setStyleSheet("color: #6c757d;")
+        self.loading_label.hide()
+        layout.addWidget(self.loading_label)
+
+        self.projects_model = ProjectsListModel(self.project_handler, self)
+        self.projects_view = QListView()
+        self.projects_view.setModel(self.projects_model)
+        self.projects_view.setUniformItemSizes(True)
+        self.projects_view.doubleClicked.connect(self.accept_selection)
+        self.projects_view.selectionModel().currentChanged.connect(self.update_preview)
+
+        self.preview = QListWidget()
+        self.preview.hide()
+
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+        splitter.addWidget(self.projects_view)
+        splitter.addWidget(self.preview)
+        layout.addWidget(splitter)
+
         buttons_layout = QHBoxLayout()
-        
+
+        self.preview_btn = QPushButton("Preview")
+        self.preview_btn.setCheckable(True)
+        self.preview_btn.toggled.connect(self.set_preview_visible)
+        buttons_layout.addWidget(self.preview_btn)
+
+        buttons_layout.addStretch()
+
         select_btn = QPushButton("Select")
         select_btn.clicked.connect(self.accept_selection)
         buttons_layout.addWidget(select_btn)
-        
+
         cancel_btn = QPushButton("Cancel")
         cancel_btn.clicked.connect(self.reject)
         buttons_layout.addWidget(cancel_btn)
-        
+
         layout.addLayout(buttons_layout)
         self.setLayout(layout)
 
+    def set_name_filter(self, text):
+        self.projects_model.set_name_filter(text.strip())
+
+    def reload_projects(self):
+        """Lists projects again, current project stays selected if it is still listed"""
+        current = self.projects_view.currentIndex()
+        abs_path = current.data(PathRole) if current.isValid() else None
+        self.projects_model.reload()
+        if abs_path:
+            row = self.projects_model.row_of(abs_path)
+            if row is not None:
+                self.projects_view.setCurrentIndex(self.projects_model.index(row))
+
+    def add_projects(self, projects: list):
+        """Projects loaded after dialog was opened"""
+        if projects:
+            self.reload_timer.start()
+
+    def update_project(self, project):
+        self.reload_timer.start()
+
+    def remove_project(self, project):
+        self.reload_timer.start()
+
+    def set_loading_state(self, done: int, total: int, loading: bool = True):
+        if loading:
+            self.loading_label.setText(f"Loading {done}/{total}...")
+            self.loading_label.show()
+        else:
+            self.loading_label.hide()
+            self.reload_timer.stop()
+            self.reload_projects()
+
+    def set_preview_visible(self, visible):
+        self.preview.setVisible(visible)
+        self.update_preview(self.projects_view.currentIndex())
+
+    def update_preview(self, current, previous=None):
+        """Tweaks project ends up with, inherited ones included.
+        Project is read from store only when preview is shown"""
+        if not self.preview_btn.isChecked():
+            return
+        self.preview.clear()
+        abs_path = current.data(PathRole) if current.isValid() else None
+        project = self.project_handler.load_project(abs_path) if abs_path else None
+        if project is None:
+            return
+        try:
+            tweaks = self.project_handler.resolved_tweaks(project)
+        except InheritanceError as e:
+            self.preview.addItem(f"Broken inheritance: {e}")
+            tweaks = project.tweaks
+        for tweak_id in tweaks:
+            tweak = TWEAKS.get(tweak_id)
+            text = tweak.name if tweak else f"{tweak_id} (unknown)"
+            self.preview.addItem(text if tweak_id in project.tweaks else f"{text} (inherited)")
+
     def accept_selection(self):
         """Обрабатывает выбор проекта"""
-        current_item = self.projects_list.currentItem()
-        if current_item:
-            self.selected_project = current_item.data(Qt.ItemDataRole.UserRole)
+        current = self.projects_view.currentIndex()
+        if current.isValid():
+            self.selected_project = current.data(ProjectRole)
             self.accept()
         else:
             QMessageBox.warning(self, "Warning", "Please select a project from the list.")
 
     def get_selected_project(self):
-        """Возвращает путь к выбранному проекту"""
-        return self.selected_project
\ No newline at end of file
+        """Возвращает выбранный проект"""
+        return self.selected_project
@@ -0,0 +1,56 @@
+import os
+
+from PyQt6.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+
+from projects import ProjectHandler
+from watcher import StylesWatcher
+
+
+class QtStylesWatcher(QObject):
+    """Watches styles folder with QFileSystemWatcher, bursts of changes are handled once"""
+    projects_changed = pyqtSignal(list)
+    DEBOUNCE_MS = 200
+
+    def __init__(self, project_handler: ProjectHandler, parent=None):
+        super().__init__(parent)
+        self.styles_watcher = StylesWatcher(project_handler)
+        self.fs_watcher = QFileSystemWatcher([project_handler.styles_folder_name], self)
+        self.fs_watcher.directoryChanged.connect(self.schedule_poll)
+        self.fs_watcher.fileChanged.connect(self.schedule_file_poll)
+        # what events named since last poll, only that is checked
+        self.folder_changed = False
+        self.changed_files: set[str] = set()
+        
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(self.DEBOUNCE_MS)
+        self.timer.timeout.connect(self.poll)
+
+    def watch_file(self, path: str):
+        """Also watch content of single file (directory events do not cover in-place edits on every platform)"""
+        if path not in self.fs_watcher.files():
+            self.fs_watcher.addPath(path)
+
+    def schedule_poll(self, *_):
+        """Folder changed, its listing is compared with known files"""
+        self.folder_changed = True
+        self.timer.start()
+
+    def schedule_file_poll(self, path: str):
+        self.changed_files.add(path)
+        self.timer.start()
+
+    def poll(self):
+        events = self.styles_watcher.poll_listing() if self.folder_changed else []
+        seen = {path for _, path in events}
+        files, self.changed_files = self.changed_files, set()
+        self.folder_changed = False
+        events.extend(self.styles_watcher.poll_paths(path for path in files if os.path.abspath(path) not in seen))
+        for path in files:
+            # file replaced by rename is dropped from watcher
+            if os.path.exists(path):
+                self.watch_file(path)
+
+        updates = self.styles_watcher.apply(events)
+        if updates:
+            self.projects_changed.emit(updates)
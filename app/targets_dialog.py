@@ -0,0 +1,39 @@
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QDialog, QDialogButtonBox, QLabel, QListWidget, QListWidgetItem, QVBoxLayout
+
+from vscode_targets import SettingsTarget
+
+
+class TargetsDialog(QDialog):
+    """Checklist of found VSCode settings.json, only checked ones are patched"""
+    def __init__(self, parent, targets: list[SettingsTarget], unchecked_paths: set = frozenset()):
+        super().__init__(parent)
+        self.targets = targets
+        self.setWindowTitle("Apply to VSCode")
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel("Point Custom UI Style imports of these settings to the project .css:"))
+
+        self.list = QListWidget()
+        for target in targets:
+            item = QListWidgetItem(target.label)
+            item.setToolTip(target.path)
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            checked = target.path not in unchecked_paths
+            item.setCheckState(Qt.CheckState.Checked if checked else Qt.CheckState.Unchecked)
+            self.list.addItem(item)
+        layout.addWidget(self.list)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    def _checked(self) -> list[bool]:
+        return [self.list.item(row).checkState() == Qt.CheckState.Checked for row in range(self.list.count())]
+
+    def get_selected_targets(self) -> list[SettingsTarget]:
+        return [target for target, checked in zip(self.targets, self._checked()) if checked]
+
+    def get_unchecked_paths(self) -> set:
+        return {target.path for target, checked in zip(self.targets, self._checked()) if not checked}
@@ -0,0 +1,220 @@
+from bisect import bisect_left
+
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QSize, QRect, QEvent, pyqtSignal
+from PyQt6.QtWidgets import QStyledItemDelegate, QStyle, QStyleOptionButton, QApplication
+from PyQt6.QtGui import QColor, QFont, QFontMetrics
+
+from analysis import tweak_cost, tweak_costs, EXPENSIVE_SCORE
+from conflicts import get_conflict_graph
+
+
+TweakRole = Qt.ItemDataRole.UserRole
+CostRole = Qt.ItemDataRole.UserRole + 1
+ConflictsRole = Qt.ItemDataRole.UserRole + 2
+
+
+class TweaksListModel(QAbstractListModel):
+    """Tweaks catalog as list model, checked state is kept here instead of widgets.
+    Rows of tweaks list are source rows, view shows only visible ones (sorted), or all when visible is None"""
+    tweak_toggled = pyqtSignal(str, bool)
+
+    def __init__(self, tweaks_list, parent=None):
+        super().__init__(parent)
+        self.tweaks = list(tweaks_list)
+        self.rows = {tweak.id: row for row, tweak in enumerate(self.tweaks)}
+        self.checked: set[int] = set()
+        self.visible: list[int] | None = None
+
+    def set_visible_rows(self, rows):
+        """Shows only given source rows, None shows all"""
+        self.beginResetModel()
+        self.visible = rows
+        self.endResetModel()
+
+    def source_row(self, row: int) -> int:
+        return row if self.visible is None else self.visible[row]
+
+    def view_row(self, source_row: int) -> int | None:
+        if self.visible is None:
+            return source_row
+        row = bisect_left(self.visible, source_row)
+        return row if row < len(self.visible) and self.visible[row] == source_row else None
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.tweaks) if self.visible is None else len(self.visible)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        source_row = self.source_row(index.row())
+        tweak = self.tweaks[source_row]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return tweak.name
+        if role == Qt.ItemDataRole.ToolTipRole:
+            tooltip = tweak.description
+            conflicts = self.data(index, ConflictsRole)
+            if conflicts:
+                tooltip += f"\n\nConflicts with: {', '.join(conflicts)}"
+            reasons = [reason for cost in tweak_costs(tweak) for reason in cost.reasons]
+            tooltip += f"\n\nSelector cost: {tweak_cost(tweak)}"
+            if reasons:
+                tooltip += f" ({'; '.join(dict.fromkeys(reasons))})"
+            if tweak.params:
+                tooltip += "\n\nParameters (double click to edit): " + ", ".join(
+                    f"{param.label} = {param.default}" for param in tweak.params
+                )
+            return tooltip
+        if role == CostRole:
+            return tweak_cost(tweak)
+        if role == ConflictsRole:
+            graph = get_conflict_graph()
+            return graph.ids_of(graph.conflicts_mask(tweak.id))
+        if role == Qt.ItemDataRole.CheckStateRole:
+            return Qt.CheckState.Checked if source_row in self.checked else Qt.CheckState.Unchecked
+        if role == TweakRole:
+            return tweak
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsUserCheckable
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != Qt.ItemDataRole.CheckStateRole:
+            return False
+        checked = Qt.CheckState(value) == Qt.CheckState.Checked
+        source_row = self.source_row(index.row())
+        if self._set_row_checked(source_row, checked):
+            self.dataChanged.emit(index, index, [Qt.ItemDataRole.CheckStateRole])
+            self.tweak_toggled.emit(self.tweaks[source_row].id, checked)
+        return True
+
+    def _set_row_checked(self, row, checked) -> bool:
+        if checked == (row in self.checked):
+            return False
+        if checked:
+            self.checked.add(row)
+        else:
+            self.checked.discard(row)
+        return True
+
+    def set_tweak_checked(self, tweak_id, checked):
+        """Changes checked state of one tweak without emitting tweak_toggled"""
+        row = self.rows.get(tweak_id)
+        if row is not None and self._set_row_checked(row, checked):
+            view_row = self.view_row(row)
+            if view_row is not None:
+                index = self.index(view_row)
+                self.dataChanged.emit(index, index, [Qt.ItemDataRole.CheckStateRole])
+
+    def checked_ids(self):
+        return [self.tweaks[row].id for row in sorted(self.checked)]
+
+    def set_checked_ids(self, tweak_ids):
+        """Replaces checked state without emitting tweak_toggled"""
+        self.checked = {self.rows[tweak_id] for tweak_id in tweak_ids if tweak_id in self.rows}
+        if self.rowCount():
+            self.dataChanged.emit(self.index(0), self.index(self.rowCount() - 1), [Qt.ItemDataRole.CheckStateRole])
+
+
+class TweakItemDelegate(QStyledItemDelegate):
+    """Paints tweak row (checkbox, name, conflicts mark, description), only called for visible rows"""
+    PADDING = 6
+    BACKGROUND = QColor("#f8f9fa")
+    HOVER_BACKGROUND = QColor("#e9ecef")
+    BORDER = QColor("#dee2e6")
+    DESCRIPTION_COLOR = QColor("#6c757d")
+    CONFLICT_COLOR = QColor("#dc3545")
+    EXPENSIVE_COLOR = QColor("#fd7e14")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        font = QApplication.font()
+        self.name_font = QFont(font)
+        self.description_font = QFont(font)
+        self.description_font.setPointSizeF(max(font.pointSizeF() - 1, 6))
+        self.conflict_font = QFont(self.description_font)
+        self.double_clicked = False
+
+    def sizeHint(self, option, index):
+        name_height = option.fontMetrics.height()
+        description_height = QFontMetrics(self.description_font).height()
+        return QSize(option.rect.width(), name_height + description_height + self.PADDING * 3)
+
+    def _checkbox_rect(self, option):
+        style = QApplication.style()
+        indicator = QStyleOptionButton()
+        rect = style.subElementRect(QStyle.SubElement.SE_CheckBoxIndicator, indicator, None)
+        return QRect(option.rect.left() + self.PADDING, option.rect.top() + self.PADDING,
+                     rect.width(), rect.height())
+
+    def paint(self, painter, option, index):
+        tweak = index.data(TweakRole)
+        checked = index.data(Qt.ItemDataRole.CheckStateRole) == Qt.CheckState.Checked
+        rect = option.rect.adjusted(1, 1, -1, -1)
+        hovered = bool(option.state & QStyle.StateFlag.State_MouseOver)
+
+        painter.save()
+        painter.fillRect(rect, self.HOVER_BACKGROUND if hovered else self.BACKGROUND)
+        painter.setPen(self.BORDER)
+        painter.drawRect(rect)
+
+        checkbox = QStyleOptionButton()
+        checkbox.rect = self._checkbox_rect(option)
+        checkbox.state = QStyle.StateFlag.State_Enabled | (QStyle.StateFlag.State_On if checked else QStyle.StateFlag.State_Off)
+        QApplication.style().drawPrimitive(QStyle.PrimitiveElement.PE_IndicatorCheckBox, checkbox, painter)
+
+        text_left = checkbox.rect.right() + self.PADDING
+        name_metrics = option.fontMetrics
+        name_rect = QRect(text_left, rect.top() + self.PADDING, rect.right() - text_left - self.PADDING, name_metrics.height())
+
+        badges_width = 0
+        painter.setFont(self.conflict_font)
+        cost = index.data(CostRole)
+        cost_text = f"cost {cost}"
+        painter.setPen(self.EXPENSIVE_COLOR if cost >= EXPENSIVE_SCORE else self.DESCRIPTION_COLOR)
+        painter.drawText(name_rect, Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, cost_text)
+        badges_width += painter.fontMetrics().horizontalAdvance(cost_text) + self.PADDING
+        
+        if index.data(ConflictsRole):
+            conflict_text = "⚠️ Conflicts"
+            painter.setPen(self.CONFLICT_COLOR)
+            painter.drawText(name_rect.adjusted(0, 0, -badges_width, 0), Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, conflict_text)
+            badges_width += painter.fontMetrics().horizontalAdvance(conflict_text) + self.PADDING
+
+        painter.setFont(self.name_font)
+        painter.setPen(option.palette.text().color())
+        name = name_metrics.elidedText(tweak.name, Qt.TextElideMode.ElideRight, name_rect.width() - badges_width)
+        painter.drawText(name_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, name)
+
+        if tweak.description:
+            painter.setFont(self.description_font)
+            painter.setPen(self.DESCRIPTION_COLOR)
+            description_rect = QRect(text_left + 20, name_rect.bottom() + self.PADDING,
+                                     rect.right() - text_left - 20 - self.PADDING, painter.fontMetrics().height())
+            description = painter.fontMetrics().elidedText(tweak.description, Qt.TextElideMode.ElideRight, description_rect.width())
+            painter.drawText(description_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, description)
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        """Checkbox is toggled by click inside it or by space, double click on row is left to view"""
+        if event.type() == QEvent.Type.MouseButtonDblClick:
+            # release following double click must not toggle a second time
+            self.double_clicked = True
+            return False
+        if event.type() == QEvent.Type.MouseButtonRelease:
+            if self.double_clicked:
+                self.double_clicked = False
+                return True
+            toggle = (event.button() == Qt.MouseButton.LeftButton
+                      and self._checkbox_rect(option).contains(event.position().toPoint()))
+        else:
+            toggle = event.type() == QEvent.Type.KeyPress and event.key() in (Qt.Key.Key_Space, Qt.Key.Key_Select)
+        if not toggle:
+            return False
+        checked = index.data(Qt.ItemDataRole.CheckStateRole) == Qt.CheckState.Checked
+        state = Qt.CheckState.Unchecked if checked else Qt.CheckState.Checked
+        return model.setData(index, state, Qt.ItemDataRole.CheckStateRole)
@@ -0,0 +1,291 @@
+"""Scaling benchmarks on synthetic catalogs and styles folders.
+
+Results are written as json, --compare checks them against saved baseline and
+exits with 1 when some benchmark got slower than --tolerance allows.
+
+Usage: python benchmarks/run.py [--full] [--output results.json] [--compare baseline.json]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import random
+import platform
+import tempfile
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import (  # noqa: E402
+    fill_registry, make_param_tweaks, make_snapshot, make_styles_folder, make_tweaks
+)
+from dom import parse_html  # noqa: E402
+from projects import ProjectHandler, JsonDirectoryStore, Project, copy_projects  # noqa: E402
+from render import CssWriter, render_css  # noqa: E402
+from sqlite_store import SqliteProjectStore  # noqa: E402
+from search import IncrementalSearch, SearchIndex  # noqa: E402
+from templates import Template  # noqa: E402
+from tweaks import TWEAKS, TweakRegistry, TweaksHandler, write_pack  # noqa: E402
+
+QUICK_CATALOGS = [1000, 10000]
+QUICK_PROJECTS = [1000, 10000]
+FULL_CATALOGS = [1000, 10000, 50000]
+FULL_PROJECTS = [1000, 10000, 100000]
+SNAPSHOT_ELEMENTS = 5000
+
+
+def measure(func, repeat: int = 5) -> dict:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {"median": statistics.median(times), "min": min(times), "runs": repeat}
+
+
+class Suite:
+    def __init__(self, repeat: int) -> None:
+        self.repeat = repeat
+        self.results = {}
+
+    def add(self, name: str, func, repeat: int = None):
+        result = measure(func, repeat or self.repeat)
+        self.results[name] = result
+        print(f"{name:<48} {result['median'] * 1000:10.3f} ms  (min {result['min'] * 1000:.3f} ms)")
+
+    def skip(self, name: str, reason: str):
+        self.results[name] = {"skipped": reason}
+        print(f"{name:<48} skipped: {reason}")
+
+
+def bench_catalog(suite: Suite, size: int, ids: list[str], work_dir: str):
+    selected = ids[:12] + ids[-12:]
+    suite.add(f"tweaks_handler[catalog={size}]", lambda: TweaksHandler(selected))
+    suite.add(f"get_css_content[catalog={size}]", lambda: TweaksHandler(selected).get_css_content())
+    suite.add(f"render_css_optimized[catalog={size}]", lambda: render_css(selected, optimize=True, cache=None))
+    suite.add(f"render_css_cached[catalog={size}]", lambda: render_css(selected, optimize=True))
+
+    project_path = os.path.join(work_dir, f"render-{size}.json")
+    writer = CssWriter()
+    variants = [selected, selected[:-1]]
+
+    def render_changed():
+        # alternate between two selections so every call writes the file
+        variants.reverse()
+        writer.render(project_path, variants[0])
+
+    suite.add(f"render_to_css_changed[catalog={size}]", render_changed)
+    suite.add(f"render_to_css_unchanged[catalog={size}]", lambda: writer.render(project_path, selected))
+
+    snapshot = parse_html(make_snapshot(random.Random(0), SNAPSHOT_ELEMENTS))
+    suite.add(f"render_css_pruned[catalog={size}]", lambda: render_css(selected, cache=None, snapshot=snapshot))
+
+    suite.add(f"search_index_build[catalog={size}]", lambda: SearchIndex(TWEAKS), repeat=3)
+    index = SearchIndex(TWEAKS)
+    query = "synthetic tweak 42"
+
+    def type_query():
+        session = IncrementalSearch(index)
+        for end in range(1, len(query) + 1):
+            session.update(query[:end])
+
+    suite.add(f"search_typing_{len(query)}_keys[catalog={size}]", type_query)
+    bench_ui(suite, size, selected)
+
+
+def bench_snapshot(suite: Suite, element_count: int):
+    snapshot_html = make_snapshot(random.Random(0), element_count)
+    suite.add(f"parse_snapshot[elements={element_count}]", lambda: parse_html(snapshot_html), repeat=3)
+
+
+def bench_params(suite: Suite, size: int, project_count: int = 1000):
+    """Every project renders the same parameterized tweaks with its own values"""
+    registry = TweakRegistry(make_param_tweaks(size))
+    rng = random.Random(size)
+    selected = [f"synthetic_{i}" for i in rng.sample(range(size), 24)]
+    projects = [
+        {tweak_id: {"margin": f"{rng.randint(0, 40)}px", "opacity": f"0.{rng.randint(1, 9)}"} for tweak_id in selected}
+        for _ in range(project_count)
+    ]
+    tweaks = list(registry)
+    suite.add(f"compile_templates[catalog={size}]", lambda: [Template(tweak.content, tweak.params) for tweak in tweaks], repeat=3)
+
+    def render_all():
+        for params in projects:
+            TweaksHandler(selected, registry).get_css_content(params)
+
+    suite.add(f"render_params_{project_count}_projects[catalog={size}]", render_all, repeat=3)
+
+
+def bench_pack(suite: Suite, size: int, work_dir: str, css_size: int = 4000):
+    """Json catalog against pack with the same (large) css bodies"""
+    tweaks = make_tweaks(size, css_size=css_size)
+    json_path = os.path.join(work_dir, f"catalog-{size}.json")
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump([{"id": t.id, "name": t.name, "description": t.description, "content": t.content, "conflicts": t.conflicts} for t in tweaks], f)
+    pack_path = os.path.join(work_dir, f"catalog-{size}.pack")
+    write_pack(pack_path, tweaks)
+    del tweaks
+
+    suite.add(f"load_catalog_json[catalog={size}]", lambda: TweakRegistry().load_catalog(json_path), repeat=3)
+    suite.add(f"load_catalog_pack[catalog={size}]", lambda: TweakRegistry().load_pack(pack_path), repeat=3)
+    registry = TweakRegistry()
+    registry.load_pack(pack_path)
+    selected = [f"synthetic_{i}" for i in range(0, size, max(1, size // 24))]
+    suite.add(f"get_css_content_pack[catalog={size}]", lambda: TweaksHandler(selected, registry).get_css_content())
+
+
+_app = None
+
+
+def bench_ui(suite: Suite, size: int, selected: list[str]):
+    global _app
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    try:
+        from PyQt6.QtWidgets import QApplication
+        from app.main_window import TweakManager
+    except ImportError as e:
+        suite.skip(f"tweak_manager_ui[catalog={size}]", str(e))
+        suite.skip(f"set_selected_tweaks[catalog={size}]", str(e))
+        return
+
+    if _app is None:
+        _app = QApplication.instance() or QApplication([])
+
+    class Window:
+        def handle_tweak_toggle(self, tweak_id, checked):
+            pass
+
+    manager = TweakManager(Window())
+    suite.add(f"tweak_manager_ui[catalog={size}]", lambda: manager.create_tweaks_interface(TWEAKS), repeat=3)
+    suite.add(f"set_selected_tweaks[catalog={size}]", lambda: manager.set_selected_tweaks(selected))
+
+
+def bench_projects(suite: Suite, size: int, ids: list[str], work_dir: str):
+    folder = os.path.join(work_dir, f"styles-{size}")
+    make_styles_folder(folder, size, ids)
+    index_path = os.path.join(folder, JsonDirectoryStore.INDEX_FILE_NAME)
+
+    def cold():
+        if os.path.exists(index_path):
+            os.remove(index_path)
+        ProjectHandler(folder)
+
+    suite.add(f"load_projects_cold[projects={size}]", cold, repeat=3)
+    ProjectHandler(folder)
+    suite.add(f"load_projects_indexed[projects={size}]", lambda: ProjectHandler(folder), repeat=3)
+    
+    db_path = os.path.join(work_dir, f"projects-{size}.db")
+    store = SqliteProjectStore(db_path, folder)
+    suite.add(f"sqlite_import[projects={size}]", lambda: copy_projects(JsonDirectoryStore(folder), store), repeat=1)
+    suite.add(f"load_projects_sqlite[projects={size}]", lambda: ProjectHandler(store=store), repeat=3)
+    suite.add(f"sqlite_page[projects={size}]", lambda: store.page(size // 2, 50))
+    suite.add(f"sqlite_projects_using[projects={size}]", lambda: store.projects_using(ids[0]))
+    store.close()
+    bench_inheritance(suite, size, ids, work_dir)
+
+
+def bench_inheritance(suite: Suite, size: int, ids: list[str], work_dir: str, branches: int = 10):
+    """Root project, branches extending it and size projects extending one of the branches"""
+    handler = ProjectHandler(os.path.join(work_dir, f"layered-{size}"), lazy=True)
+    path = handler.store.project_path
+    rng = random.Random(size)
+    root = Project("root", ids[:40], path("root"))
+    bases = [Project(f"base-{i}", rng.sample(ids, 8), path(f"base-{i}"), ["root"], rng.sample(ids[:40], 4))
+             for i in range(branches)]
+    leaves = [Project(f"leaf-{i}", rng.sample(ids, 4), path(f"leaf-{i}"), [f"base-{i % branches}"], rng.sample(ids[:40], 2))
+              for i in range(size)]
+    handler.add_projects([root] + bases + leaves)
+
+    def resolve_all():
+        handler.invalidate(root.abs_path)
+        for project in leaves:
+            handler.flattened(project)
+
+    suite.add(f"resolve_layered_cold[projects={size}]", resolve_all, repeat=3)
+    resolve_all()
+    base = bases[0]
+    tweak_id = ids[-1]
+
+    def edit_base():
+        # only leaves of edited branch are resolved again
+        handler.set_tweak(base, tweak_id, tweak_id not in base.tweaks)
+        for project in handler.descendants(base):
+            handler.flattened(project)
+
+    suite.add(f"resolve_layered_edit_base[projects={size}]", edit_base)
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> bool:
+    """Prints ratio to baseline for every benchmark, returns True when nothing regressed"""
+    ok = True
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or "median" not in base or "median" not in result:
+            continue
+        ratio = result["median"] / base["median"] if base["median"] else 1.0
+        status = "ok"
+        if ratio > tolerance:
+            status = "REGRESSION"
+            ok = False
+        print(f"{name:<48} x{ratio:6.2f}  {status}")
+    return ok
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Scaling benchmarks")
+    parser.add_argument("--full", action="store_true", help="also run 50k tweaks and 100k projects")
+    parser.add_argument("--catalogs", type=int, nargs="*", help="catalog sizes to run")
+    parser.add_argument("--projects", type=int, nargs="*", help="styles folder sizes to run")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write results json here")
+    parser.add_argument("--compare", help="baseline results json")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="allowed slowdown ratio against baseline")
+    args = parser.parse_args(argv)
+
+    catalogs = sorted(args.catalogs if args.catalogs is not None else (FULL_CATALOGS if args.full else QUICK_CATALOGS))
+    project_counts = sorted(args.projects if args.projects is not None else (FULL_PROJECTS if args.full else QUICK_PROJECTS))
+
+    suite = Suite(args.repeat)
+    work_dir = tempfile.mkdtemp(prefix="vscode-tweaks-bench-")
+    try:
+        bench_snapshot(suite, SNAPSHOT_ELEMENTS)
+        ids = []
+        for size in catalogs:
+            # catalog grows between sizes, built-in tweaks are not counted
+            if size > len(ids):
+                ids += fill_registry(TWEAKS, size - len(ids), start=len(ids))
+            bench_catalog(suite, size, ids[:size], work_dir)
+            bench_pack(suite, size, work_dir)
+            bench_params(suite, size)
+        catalog_ids = ids or [tweak.id for tweak in TWEAKS]
+        for size in project_counts:
+            bench_projects(suite, size, catalog_ids, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = {
+        "meta": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": suite.results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(output, f, indent=4)
+        print(f"Results saved to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f).get("results", {})
+        return 0 if compare(suite.results, baseline, args.tolerance) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
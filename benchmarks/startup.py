@@ -0,0 +1,132 @@
+"""Cold start harness: measures import time and time to first shown window.
+
+Every run is a fresh interpreter (Qt uses offscreen platform), median of runs is
+compared with startup_budget.json. Exit code is 1 when budget is exceeded.
+
+Usage: python benchmarks/startup.py [--runs N] [--update-budget]
+Budget is median times BUDGET_HEADROOM, "measured" entry of budget file records medians and machine.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_budget.json")
+# headroom multiplier used by --update-budget
+BUDGET_HEADROOM = 1.5
+
+
+def measure_child():
+    """Runs inside fresh interpreter, prints measurements as json"""
+    start = time.perf_counter()
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+
+    import cli  # noqa: F401
+    core_ms = (time.perf_counter() - start) * 1000
+    core_imports_qt = any(name.startswith("PyQt6") for name in sys.modules)
+
+    from PyQt6.QtCore import QTimer
+    from PyQt6.QtWidgets import QApplication
+    from app.main_window import MainWindow
+    from projects import ProjectHandler
+    from tweaks import TWEAKS
+    import_ms = (time.perf_counter() - start) * 1000
+
+    app = QApplication([])
+    TWEAKS.load_catalogs()
+    main_window = MainWindow(ProjectHandler(lazy=True))
+    main_window.show()
+    shown = {}
+
+    def on_shown():
+        shown["ms"] = (time.perf_counter() - start) * 1000
+        app.quit()
+
+    # fires after pending show/paint events are processed
+    QTimer.singleShot(0, on_shown)
+    app.exec()
+
+    print(json.dumps({
+        "core_import_ms": core_ms,
+        "import_ms": import_ms,
+        "first_window_ms": shown["ms"],
+        "core_imports_qt": core_imports_qt,
+        "dialog_imported": "app.projects_window" in sys.modules,
+    }))
+
+
+def run_once() -> dict:
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child"],
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def load_budget() -> dict:
+    if not os.path.isfile(BUDGET_PATH):
+        return {}
+    with open(BUDGET_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Startup time harness")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--update-budget", action="store_true", help="store current medians (with headroom) as budget")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        measure_child()
+        return 0
+
+    runs = [run_once() for _ in range(args.runs)]
+    medians = {key: statistics.median(run[key] for run in runs) for key in ("core_import_ms", "import_ms", "first_window_ms")}
+
+    failed = False
+    if any(run["core_imports_qt"] for run in runs):
+        print("FAIL core modules import PyQt6")
+        failed = True
+    if any(run["dialog_imported"] for run in runs):
+        print("FAIL project selector dialog is imported on startup")
+        failed = True
+
+    if args.update_budget:
+        budget = {key: round(value * BUDGET_HEADROOM, 1) for key, value in medians.items()}
+        # budget is only meaningful together with what it was measured on
+        budget["measured"] = {
+            "medians_ms": {key: round(value, 1) for key, value in medians.items()},
+            "runs": args.runs,
+            "headroom": BUDGET_HEADROOM,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "date": time.strftime("%Y-%m-%d"),
+        }
+        with open(BUDGET_PATH, "w", encoding="utf-8") as f:
+            json.dump(budget, f, indent=4)
+        print(f"Budget saved to {BUDGET_PATH}")
+    budget = load_budget()
+
+    for key, value in medians.items():
+        limit = budget.get(key)
+        status = "ok"
+        if limit is not None and value > limit:
+            status = "OVER BUDGET"
+            failed = True
+        limit_text = f"{limit:.1f} ms" if limit is not None else "-"
+        print(f"{key:<18} {value:9.1f} ms  budget {limit_text:>10}  {status}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""Generators of synthetic tweak catalogs and styles folders for benchmarks"""
+import os
+import json
+import random
+
+from templates import TweakParam
+from tweaks import Tweak, TweakRegistry
+
+
+PARTS = [
+    ".monaco-workbench", ".part.editor", ".content", ".editor-group-container", ".title", ".tabs-container",
+    ".tab.sizing-fit", ".monaco-icon-label", ".part.titlebar", ".titlebar-container", ".titlebar-left",
+    ".part.statusbar", ".right-items", ".left-items", ".action-item", ".monaco-action-bar", ".quick-input-widget",
+]
+DECLARATIONS = [
+    "display: none !important;", "justify-content: center !important;", "flex: 1 1 300px !important;",
+    "margin-left: 14px !important;", "text-align: center !important;", "flex-grow: 1 !important;",
+    "filter: blur(4px) brightness(70%) !important;", "opacity: 0.8 !important;",
+]
+
+
+def make_css(rng: random.Random, target_size: int) -> str:
+    """Comments and rules like in built-in tweaks, roughly target_size characters long"""
+    rules = []
+    size = 0
+    while size < target_size:
+        selector = ">".join(rng.sample(PARTS, rng.randint(3, 7)))
+        body = "\n".join("    " + d for d in rng.sample(DECLARATIONS, rng.randint(1, 3)))
+        rule = f"/* synthetic rule {len(rules)} */\n{selector} {{\n{body}\n}}"
+        rules.append(rule)
+        size += len(rule) + 1
+    return "\n".join(rules)
+
+
+def make_tweaks(count: int, seed: int = 0, css_size: int = 400, conflict_rate: float = 0.02, start: int = 0) -> list[Tweak]:
+    """Tweaks synthetic_<start>..synthetic_<start + count - 1>"""
+    rng = random.Random(seed + start)
+    tweaks = []
+    for i in range(start, start + count):
+        conflicts = [f"synthetic_{rng.randrange(start + count)}"] if rng.random() < conflict_rate else []
+        tweaks.append(Tweak(
+            f"synthetic_{i}",
+            f"Synthetic tweak {i}",
+            f"Generated tweak number {i} for benchmarks, changes {rng.choice(PARTS)}",
+            make_css(rng, css_size),
+            conflicts
+        ))
+    return tweaks
+
+
+def make_param_tweaks(count: int, seed: int = 0, css_size: int = 400) -> list[Tweak]:
+    """Synthetic tweaks whose content ends with rule using two parameters (margin, opacity)"""
+    tweaks = make_tweaks(count, seed, css_size)
+    params = [TweakParam("margin", "length", "14px"), TweakParam("opacity", "number", "0.8")]
+    return [
+        Tweak(tweak.id, tweak.name, tweak.description,
+              tweak.content + "\n.part.titlebar>.menubar {\n    margin-left: {{margin}} !important;\n    opacity: {{opacity}};\n}",
+              tweak.conflicts, params)
+        for tweak in tweaks
+    ]
+
+
+def fill_registry(registry: TweakRegistry, count: int, seed: int = 0, css_size: int = 400, start: int = 0) -> list[str]:
+    """Registers synthetic tweaks into registry, returns their ids"""
+    tweaks = make_tweaks(count, seed, css_size, start=start)
+    for tweak in tweaks:
+        registry.register(tweak)
+    return [tweak.id for tweak in tweaks]
+
+
+def make_snapshot(rng: random.Random, element_count: int) -> str:
+    """Html of nested elements with classes from PARTS, like saved VSCode window"""
+    parts = []
+    open_tags = 0
+    for _ in range(element_count):
+        classes = " ".join(part.lstrip(".").replace(".", " ") for part in rng.sample(PARTS, rng.randint(1, 2)))
+        parts.append(f'<div class="{classes}" role="presentation">')
+        open_tags += 1
+        while open_tags > 1 and rng.random() < 0.45:
+            parts.append("</div>")
+            open_tags -= 1
+    parts.append("</div>" * open_tags)
+    return f"<html><body>{''.join(parts)}</body></html>"
+
+
+def make_styles_folder(folder: str, count: int, tweak_ids: list[str], seed: int = 0, tweaks_per_project: int = 12):
+    """Writes count project json files with random tweak selections"""
+    rng = random.Random(seed)
+    os.makedirs(folder, exist_ok=True)
+    for i in range(count):
+        name = f"project-{i}"
+        data = {"name": name, "tweaks": rng.sample(tweak_ids, min(tweaks_per_project, len(tweak_ids)))}
+        with open(os.path.join(folder, f"{name}.json"), "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4)
@@ -0,0 +1,546 @@
+"""Headless batch renderer, works without PyQt6.
+
+Usage: python -m cli render [project names...] [--all] [--jobs N]
+       python -m cli analyze [tweak ids...] [--project NAME] [--verbose]
+       python -m cli check [project names...] [--all]
+       python -m cli targets | apply PROJECT [--target NAME]
+       python -m cli watch [--interval SECONDS]
+       python -m cli list [--filter TEXT] [--offset N] [--limit N] | using TWEAK_ID
+       python -m cli --db projects.db import [FOLDER] | export FOLDER
+       python -m cli pack CATALOG.json [--output CATALOG.pack]
+       python -m cli dead SNAPSHOT.html [tweak ids...] [--project NAME]
+       python -m cli params [tweak ids...] [--project NAME] | set-param PROJECT TWEAK_ID NAME [VALUE]
+"""
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from analysis import SelectorCostError, project_cost, tweak_cost, tweak_costs
+from conflicts import get_conflict_graph
+from dom import Document, load_snapshot
+from pruning import tweak_dead_rules
+from vscode_targets import discover_targets, filter_targets, apply_css
+from watcher import StylesWatcher
+import tracing
+from projects import ProjectHandler, Project, JsonDirectoryStore, InheritanceError, copy_projects
+from render import CssWriter, get_css_path
+from sqlite_store import SqliteProjectStore
+from tweaks import TWEAKS, CATALOGS_FOLDER, PACK_EXTENSION, TweakRegistry, write_pack
+
+
+_writer: CssWriter | None = None
+
+
+_optimize = False
+_max_cost: int | None = None
+_snapshot: Document | None = None
+
+
+def _init_render(optimize: bool = False, max_cost: int = None, snapshot_path: str = None):
+    global _writer, _optimize, _max_cost, _snapshot
+    _writer = CssWriter()
+    _optimize = optimize
+    _max_cost = max_cost
+    _snapshot = load_snapshot(snapshot_path) if snapshot_path else None
+
+
+def _init_worker(catalogs_folder: str, optimize: bool = False, max_cost: int = None, snapshot_path: str = None,
+                 trace_state: tuple = None):
+    """Initializer of worker process, loads catalogs as main does in parent process"""
+    if trace_state:
+        tracing.start_worker(trace_state)
+    _init_render(optimize, max_cost, snapshot_path)
+    TWEAKS.load_catalogs(catalogs_folder)
+
+
+def _render_project(project: Project) -> dict:
+    start = time.perf_counter()
+    result = {"name": project.name, "path": get_css_path(project.abs_path), "error": None, "written": False, "size": 0,
+              "cost": project_cost(project.tweaks)}
+    try:
+        result["written"] = _writer.render(project.abs_path, project.tweaks, _optimize, _max_cost, _snapshot, project.params)
+        result["size"] = os.path.getsize(result["path"])
+    except Exception as e:
+        result["error"] = str(e)
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def _render_in_worker(project: Project) -> dict:
+    result = _render_project(project)
+    # spans of worker process travel with result, parent merges them
+    result["trace"] = tracing.take_recorded()
+    return result
+
+
+def open_projects(args, lazy: bool = False) -> ProjectHandler:
+    """Projects of --db database when given, otherwise json files of --styles folder"""
+    store = SqliteProjectStore(args.db, args.styles) if args.db else None
+    return ProjectHandler(args.styles, lazy=lazy, store=store)
+
+
+def select_projects(project_handler: ProjectHandler, names: list[str], render_all: bool) -> tuple[list, list]:
+    """Returns (projects, names that were not found), name can be project name, file name or path"""
+    if render_all:
+        return list(project_handler.projects), []
+    
+    by_key = {}
+    for project in project_handler.projects:
+        by_key.setdefault(project.name, project)
+        by_key.setdefault(os.path.splitext(os.path.basename(project.abs_path))[0], project)
+        by_key.setdefault(project.abs_path, project)
+    
+    selected, missing = [], []
+    for name in names:
+        project = by_key.get(name) or by_key.get(os.path.abspath(name))
+        if project:
+            selected.append(project)
+        else:
+            missing.append(name)
+    return selected, missing
+
+
+def flatten_projects(project_handler: ProjectHandler, projects: list) -> tuple[list, list]:
+    """Returns (projects with resolved tweaks, errors of projects whose inheritance is broken)"""
+    flattened, errors = [], []
+    for project in projects:
+        try:
+            flattened.append(project_handler.flattened(project))
+        except InheritanceError as e:
+            errors.append(f"{project.name}: {e}")
+    return flattened, errors
+
+
+def render_projects(projects: list, jobs: int, catalogs_folder: str, optimize: bool = False, max_cost: int = None,
+                    snapshot_path: str = None):
+    """Renders projects in process pool, yields result dict per project as they finish"""
+    if jobs <= 1 or len(projects) <= 1:
+        # TWEAKS of this process are loaded by main
+        _init_render(optimize, max_cost, snapshot_path)
+        for project in projects:
+            yield _render_project(project)
+        return
+    
+    chunksize = max(1, len(projects) // (jobs * 8))
+    init_args = (catalogs_folder, optimize, max_cost, snapshot_path, tracing.worker_state())
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=init_args) as executor:
+        for result in executor.map(_render_in_worker, projects, chunksize=chunksize):
+            tracing.merge(result.pop("trace"))
+            yield result
+
+
+def cmd_render(args) -> int:
+    if not args.all and not args.projects:
+        print("Nothing to render: pass project names or --all", file=sys.stderr)
+        return 2
+    
+    project_handler = open_projects(args)
+    projects, missing = select_projects(project_handler, args.projects, args.all)
+    for name in missing:
+        print(f"Project not found: {name}", file=sys.stderr)
+    
+    start = time.perf_counter()
+    projects, errors = flatten_projects(project_handler, projects)
+    for error in errors:
+        print(f"Not rendered, {error}", file=sys.stderr)
+    written = failed = total_size = 0
+    for result in render_projects(projects, args.jobs, args.catalogs, args.optimize, args.max_cost, args.prune):
+        if result["error"]:
+            failed += 1
+            status = f"error: {result['error']}"
+        else:
+            written += result["written"]
+            total_size += result["size"]
+            status = "written" if result["written"] else "unchanged"
+        if not args.quiet:
+            print(f"{result['name']:<32} {result['seconds'] * 1000:8.2f} ms  cost {result['cost']:>5}  {status}")
+    elapsed = time.perf_counter() - start
+    
+    rate = len(projects) / elapsed if elapsed > 0 else 0.0
+    print(
+        f"Rendered {len(projects)} projects ({written} written, {len(projects) - written - failed} unchanged, {failed} failed) "
+        f"in {elapsed:.3f} s, {rate:.1f} projects/s, {total_size / 1024:.1f} KB of css"
+    )
+    return 1 if failed or missing or errors else 0
+
+
+def cmd_analyze(args) -> int:
+    if args.project:
+        project_handler = open_projects(args)
+        projects, missing = select_projects(project_handler, args.project, False)
+        for name in missing:
+            print(f"Project not found: {name}", file=sys.stderr)
+        if missing:
+            return 1
+        projects, errors = flatten_projects(project_handler, projects)
+        for error in errors:
+            print(error, file=sys.stderr)
+        if errors:
+            return 1
+        tweak_ids = [tweak_id for project in projects for tweak_id in project.tweaks]
+    else:
+        tweak_ids = args.tweaks or [tweak.id for tweak in TWEAKS]
+    
+    tweaks = [TWEAKS.get(tweak_id) for tweak_id in dict.fromkeys(tweak_ids) if tweak_id in TWEAKS]
+    for tweak in sorted(tweaks, key=tweak_cost, reverse=True):
+        print(f"{tweak.id:<40} {tweak_cost(tweak):>5}")
+        if args.verbose:
+            for cost in tweak_costs(tweak):
+                reasons = f"  ({'; '.join(cost.reasons)})" if cost.reasons else ""
+                print(f"    {cost.score:>4}  {cost.selector}{reasons}")
+    
+    total = project_cost(tweak_ids)
+    print(f"Total selector cost: {total}")
+    return 1 if args.max_cost is not None and total > args.max_cost else 0
+
+
+def cmd_dead(args) -> int:
+    """Reports rules of tweaks whose selectors match nothing in DOM snapshot"""
+    if args.project:
+        project_handler = open_projects(args)
+        projects, missing = select_projects(project_handler, args.project, False)
+        for name in missing:
+            print(f"Project not found: {name}", file=sys.stderr)
+        if missing:
+            return 1
+        projects, errors = flatten_projects(project_handler, projects)
+        for error in errors:
+            print(error, file=sys.stderr)
+        if errors:
+            return 1
+        tweak_ids = [tweak_id for project in projects for tweak_id in project.tweaks]
+    else:
+        tweak_ids = args.tweaks or [tweak.id for tweak in TWEAKS]
+    
+    document = load_snapshot(args.snapshot)
+    dead_rules = 0
+    for tweak_id in dict.fromkeys(tweak_ids):
+        tweak = TWEAKS.get(tweak_id)
+        if tweak is None:
+            continue
+        found = tweak_dead_rules(tweak, document)
+        for rule, dead in found:
+            whole = len(dead) == len(rule.selectors)
+            dead_rules += whole
+            print(f"{tweak.id:<40} {'rule' if whole else 'selectors'}: {', '.join(dead)}")
+    print(f"{dead_rules} rules match nothing in {args.snapshot} ({len(document.elements)} elements)")
+    return 0
+
+
+def cmd_params(args) -> int:
+    """Lists parameters of tweaks, with values of project when given"""
+    values = {}
+    tweak_ids = args.tweaks
+    if args.project:
+        project_handler = open_projects(args)
+        projects, missing = select_projects(project_handler, [args.project], False)
+        if missing:
+            print(f"Project not found: {args.project}", file=sys.stderr)
+            return 1
+        projects, errors = flatten_projects(project_handler, projects)
+        if errors:
+            print(errors[0], file=sys.stderr)
+            return 1
+        values = projects[0].params
+        tweak_ids = tweak_ids or projects[0].tweaks.ids()
+    
+    tweaks = [TWEAKS.get(tweak_id) for tweak_id in tweak_ids] if tweak_ids else list(TWEAKS)
+    for tweak in tweaks:
+        if tweak is None or not tweak.params:
+            continue
+        for param in tweak.params:
+            value = values.get(tweak.id, {}).get(param.name)
+            shown = f"{value} (default {param.default})" if value is not None else param.default
+            print(f"{tweak.id:<32} {param.name:<16} {param.type:<10} {shown}")
+    return 0
+
+
+def cmd_set_param(args) -> int:
+    """Sets (or without value resets) parameter value in project"""
+    project_handler = open_projects(args)
+    projects, missing = select_projects(project_handler, [args.project], False)
+    if missing:
+        print(f"Project not found: {args.project}", file=sys.stderr)
+        return 1
+    project = project_handler.load_project(projects[0].abs_path)
+    try:
+        project_handler.set_param(project, args.tweak, args.name, args.value)
+        project_handler.save_project(project)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    print(f"{project.name}: {args.tweak}.{args.name} = {args.value if args.value is not None else 'default'}")
+    return 0
+
+
+def cmd_check(args) -> int:
+    if not args.all and not args.projects:
+        print("Nothing to check: pass project names or --all", file=sys.stderr)
+        return 2
+    
+    project_handler = open_projects(args)
+    projects, missing = select_projects(project_handler, args.projects, args.all)
+    for name in missing:
+        print(f"Project not found: {name}", file=sys.stderr)
+    projects, errors = flatten_projects(project_handler, projects)
+    for error in errors:
+        print(error, file=sys.stderr)
+    
+    graph = get_conflict_graph()
+    invalid = 0
+    for project in projects:
+        pairs = graph.validate(project.tweaks)
+        if pairs:
+            invalid += 1
+            print(f"{project.name}: " + ", ".join(f"{a} / {b}" for a, b in pairs))
+    print(f"Checked {len(projects)} projects, {invalid} with conflicting tweaks")
+    return 1 if invalid or missing or errors else 0
+
+
+def _targets(args) -> list:
+    return filter_targets(discover_targets(home=args.home), args.target)
+
+
+def cmd_targets(args) -> int:
+    targets = _targets(args)
+    for target in targets:
+        print(f"{target.label:<40} {target.path}")
+    print(f"Found {len(targets)} settings.json")
+    return 0
+
+
+def cmd_apply(args) -> int:
+    project_handler = open_projects(args)
+    projects, missing = select_projects(project_handler, [args.project], False)
+    if missing:
+        print(f"Project not found: {args.project}", file=sys.stderr)
+        return 1
+    projects, errors = flatten_projects(project_handler, projects)
+    if errors:
+        print(errors[0], file=sys.stderr)
+        return 1
+    project = projects[0]
+    
+    targets = _targets(args)
+    if not targets:
+        print("No VSCode settings.json found", file=sys.stderr)
+        return 1
+    
+    try:
+        CssWriter().render(project.abs_path, project.tweaks, args.optimize, args.max_cost, params=project.params)
+    except (SelectorCostError, ValueError, OSError) as e:
+        # settings are not pointed at css that was not written
+        print(f"{project.name}: {e}", file=sys.stderr)
+        return 1
+    start = time.perf_counter()
+    results = apply_css(targets, get_css_path(project.abs_path), args.jobs)
+    elapsed = time.perf_counter() - start
+    
+    failed = 0
+    for result in results:
+        if result.error:
+            failed += 1
+            status = f"error: {result.error}"
+        else:
+            status = "updated" if result.changed else "up to date"
+        print(f"{result.target.label:<40} {result.seconds * 1000:8.2f} ms  {status}")
+    print(f"Applied {project.name} to {len(results)} targets ({failed} failed) in {elapsed:.3f} s")
+    return 1 if failed else 0
+
+
+def cmd_watch(args) -> int:
+    """Renders projects again whenever their json files change, projects extending changed ones too"""
+    project_handler = open_projects(args)
+    if not project_handler.store.watchable:
+        print("Only json projects folder can be watched", file=sys.stderr)
+        return 2
+    writer = CssWriter()
+    print(f"Watching {os.path.abspath(args.styles)} ({len(project_handler.projects)} projects), press Ctrl+C to stop")
+    
+    def render(project, event):
+        start = time.perf_counter()
+        try:
+            written = writer.render(project.abs_path, project_handler.resolved_tweaks(project), args.optimize,
+                                    params=project_handler.resolved_params(project))
+            status = "written" if written else "unchanged"
+        except Exception as e:
+            status = f"error: {e}"
+        print(f"{project.name:<32} {event:<8} {(time.perf_counter() - start) * 1000:8.2f} ms  {status}")
+    
+    def on_updates(updates):
+        rendered = set()
+        for event, project in updates:
+            if event == "removed":
+                print(f"{project.name:<32} removed")
+            elif project.abs_path not in rendered:
+                rendered.add(project.abs_path)
+                render(project, event)
+            # projects extending removed one fail with unknown base
+            for descendant in project_handler.descendants(project):
+                if descendant.abs_path not in rendered:
+                    rendered.add(descendant.abs_path)
+                    render(descendant, "base")
+    
+    try:
+        StylesWatcher(project_handler).watch(on_updates, args.interval)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cmd_list(args) -> int:
+    # database answers pages itself, json folder has to be loaded
+    project_handler = open_projects(args, lazy=bool(args.db))
+    total = project_handler.count(args.filter)
+    projects = project_handler.page(args.offset, args.limit, args.filter)
+    for project in projects:
+        extends = f"  extends {', '.join(project.extends)}" if project.extends else ""
+        print(f"{project.name:<32} {len(project.tweaks):>4} tweaks  {project.abs_path}{extends}")
+    print(f"Shown {len(projects)} of {total} projects")
+    return 0
+
+
+def cmd_using(args) -> int:
+    projects = open_projects(args, lazy=bool(args.db)).projects_using(args.tweak)
+    for project in projects:
+        print(project.name)
+    print(f"{len(projects)} projects use {args.tweak}")
+    return 0
+
+
+def cmd_import(args) -> int:
+    """Copies json projects into --db database"""
+    if not args.db:
+        print("Import needs --db", file=sys.stderr)
+        return 2
+    start = time.perf_counter()
+    copied = copy_projects(JsonDirectoryStore(args.folder or args.styles), SqliteProjectStore(args.db, args.styles), args.batch_size)
+    print(f"Imported {copied} projects in {time.perf_counter() - start:.3f} s")
+    return 0
+
+
+def cmd_export(args) -> int:
+    """Writes projects of current store as json files to folder"""
+    store = open_projects(args, lazy=True).store
+    start = time.perf_counter()
+    copied = copy_projects(store, JsonDirectoryStore(args.folder), args.batch_size)
+    print(f"Exported {copied} projects in {time.perf_counter() - start:.3f} s")
+    return 0
+
+
+def cmd_pack(args) -> int:
+    """Converts json catalog to pack with lazily loaded css bodies"""
+    registry = TweakRegistry()
+    registry.load_catalog(args.catalog)
+    output = args.output or os.path.splitext(args.catalog)[0] + PACK_EXTENSION
+    size = write_pack(output, list(registry))
+    print(f"Packed {len(registry)} tweaks ({size / 1024:.1f} KB of css) to {output}")
+    if os.path.abspath(os.path.dirname(output)) == os.path.abspath(os.path.dirname(args.catalog)):
+        print(f"Remove {args.catalog} if it is in catalogs folder, otherwise its tweaks are loaded twice")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m cli", description="VSCode Tweaks headless tools")
+    parser.add_argument("--styles", default="styles", help="projects folder (default: styles)")
+    parser.add_argument("--db", help="keep projects in this SQLite file instead of json files, css goes to --styles")
+    parser.add_argument("--catalogs", default=CATALOGS_FOLDER, help="extra tweak catalogs folder")
+    parser.add_argument("--trace", metavar="PATH", help="write chrome trace json to PATH and print timing summary")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    render = commands.add_parser("render", help="render projects to .css files")
+    render.add_argument("projects", nargs="*", help="project names, file names or paths")
+    render.add_argument("--all", action="store_true", help="render every project")
+    render.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="worker processes")
+    render.add_argument("-O", "--optimize", action="store_true", help="minify css and merge duplicate rules")
+    render.add_argument("--max-cost", type=int, help="fail project whose selectors cost more than this")
+    render.add_argument("--prune", metavar="SNAPSHOT", help="drop selectors that match nothing in saved VSCode DOM snapshot (html)")
+    render.add_argument("-q", "--quiet", action="store_true", help="print only summary")
+    render.set_defaults(func=cmd_render)
+    
+    analyze = commands.add_parser("analyze", help="estimate selector matching cost of tweaks")
+    analyze.add_argument("tweaks", nargs="*", help="tweak ids (default: whole catalog)")
+    analyze.add_argument("-p", "--project", action="append", help="analyze tweaks of project, can be repeated")
+    analyze.add_argument("-v", "--verbose", action="store_true", help="show every selector with reasons")
+    analyze.add_argument("--max-cost", type=int, help="exit with error if total cost is above this")
+    analyze.set_defaults(func=cmd_analyze)
+    
+    dead = commands.add_parser("dead", help="report tweak rules matching nothing in saved VSCode DOM snapshot")
+    dead.add_argument("snapshot", help="html of VSCode window saved from devtools")
+    dead.add_argument("tweaks", nargs="*", help="tweak ids (default: whole catalog)")
+    dead.add_argument("-p", "--project", action="append", help="check tweaks of project, can be repeated")
+    dead.set_defaults(func=cmd_dead)
+    
+    params = commands.add_parser("params", help="list parameters of tweaks")
+    params.add_argument("tweaks", nargs="*", help="tweak ids (default: whole catalog or tweaks of project)")
+    params.add_argument("-p", "--project", help="show values of project")
+    params.set_defaults(func=cmd_params)
+    
+    set_param = commands.add_parser("set-param", help="set parameter value of tweak in project")
+    set_param.add_argument("project")
+    set_param.add_argument("tweak")
+    set_param.add_argument("name")
+    set_param.add_argument("value", nargs="?", help="omit to use inherited or default value again")
+    set_param.set_defaults(func=cmd_set_param)
+    
+    check = commands.add_parser("check", help="report conflicting tweaks in projects")
+    check.add_argument("projects", nargs="*", help="project names, file names or paths")
+    check.add_argument("--all", action="store_true", help="check every project")
+    check.set_defaults(func=cmd_check)
+    
+    targets = commands.add_parser("targets", help="list settings.json of found VSCode installs and profiles")
+    apply = commands.add_parser("apply", help="render project and point VSCode settings to its css")
+    apply.add_argument("project", help="project name, file name or path")
+    apply.add_argument("-O", "--optimize", action="store_true", help="minify css and merge duplicate rules")
+    apply.add_argument("--max-cost", type=int, help="fail if selectors of project cost more than this")
+    apply.add_argument("-j", "--jobs", type=int, help="settings files patched at once")
+    for command in (targets, apply):
+        command.add_argument("-t", "--target", action="append", help="only targets whose name or path contains this, can be repeated")
+        command.add_argument("--home", help="home folder used to look for VSCode config (default: current user)")
+    targets.set_defaults(func=cmd_targets)
+    
+    watch = commands.add_parser("watch", help="render projects again when their files change")
+    watch.add_argument("-O", "--optimize", action="store_true", help="minify css and merge duplicate rules")
+    watch.add_argument("--interval", type=float, default=1.0, help="seconds between checks")
+    watch.set_defaults(func=cmd_watch)
+    apply.set_defaults(func=cmd_apply)
+    
+    listing = commands.add_parser("list", help="list projects sorted by name")
+    listing.add_argument("-f", "--filter", default="", help="only names containing this (case insensitive)")
+    listing.add_argument("--offset", type=int, default=0)
+    listing.add_argument("--limit", type=int, default=50)
+    listing.set_defaults(func=cmd_list)
+    
+    using = commands.add_parser("using", help="list projects that have tweak selected")
+    using.add_argument("tweak", help="tweak id")
+    using.set_defaults(func=cmd_using)
+    
+    import_command = commands.add_parser("import", help="copy json projects into --db database")
+    import_command.add_argument("folder", nargs="?", help="json projects folder (default: --styles)")
+    export = commands.add_parser("export", help="write projects as json files")
+    export.add_argument("folder", help="target folder")
+    for command in (import_command, export):
+        command.add_argument("--batch-size", type=int, default=ProjectHandler.BATCH_SIZE, help="projects saved per transaction")
+    import_command.set_defaults(func=cmd_import)
+    export.set_defaults(func=cmd_export)
+    
+    pack = commands.add_parser("pack", help="convert json tweak catalog to pack with lazily loaded css")
+    pack.add_argument("catalog", help="json catalog")
+    pack.add_argument("-o", "--output", help=f"pack path (default: catalog path with {PACK_EXTENSION} extension)")
+    pack.set_defaults(func=cmd_pack)
+    
+    return parser
+
+
+def main(argv: list[str] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.trace:
+        tracing.enable(args.trace)
+    TWEAKS.load_catalogs(args.catalogs)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+from selection import TweakSelection
+from tweaks import TWEAKS, TweakRegistry
+
+
+class ConflictGraph:
+    """Symmetric conflict graph of catalog, conflicts of every tweak are stored as bitset of ordinals"""
+    def __init__(self, registry: TweakRegistry = None) -> None:
+        self.registry = registry if registry is not None else TWEAKS
+        self.masks: list[int] = []
+        self.version = None
+        self.build()
+
+    def build(self):
+        masks = [0] * len(self.registry)
+        for ordinal, tweak in enumerate(self.registry):
+            for other_id in tweak.conflicts:
+                other = self.registry.ordinal(other_id)
+                if other is None or other == ordinal:
+                    continue
+                masks[ordinal] |= 1 << other
+                masks[other] |= 1 << ordinal
+        self.masks = masks
+        self.version = self.registry.version
+
+    def mask_of(self, tweak_ids) -> int:
+        if isinstance(tweak_ids, TweakSelection) and tweak_ids.registry is self.registry:
+            return tweak_ids.mask
+        mask = 0
+        for tweak_id in tweak_ids:
+            ordinal = self.registry.ordinal(tweak_id)
+            if ordinal is not None:
+                mask |= 1 << ordinal
+        return mask
+
+    def ids_of(self, mask: int) -> list[str]:
+        ids = []
+        while mask:
+            low = mask & -mask
+            ids.append(self.registry.by_ordinal(low.bit_length() - 1).id)
+            mask ^= low
+        return ids
+
+    def conflicts_mask(self, tweak_id: str) -> int:
+        ordinal = self.registry.ordinal(tweak_id)
+        if ordinal is None or ordinal >= len(self.masks):
+            return 0
+        return self.masks[ordinal]
+
+    def check(self, tweak_id: str, selected_mask: int) -> list[str]:
+        """Returns ids of selected tweaks that conflict with tweak_id"""
+        clash = self.conflicts_mask(tweak_id) & selected_mask
+        return self.ids_of(clash) if clash else []
+
+    def validate(self, tweak_ids) -> list[tuple[str, str]]:
+        """Returns every conflicting pair among tweak_ids, each pair once"""
+        tweak_ids = list(tweak_ids)
+        selected = self.mask_of(tweak_ids)
+        pairs = []
+        for tweak_id in tweak_ids:
+            ordinal = self.registry.ordinal(tweak_id)
+            if ordinal is None:
+                continue
+            # only partners with higher ordinal, so every pair is reported once
+            clash = self.masks[ordinal] & selected & ~((1 << (ordinal + 1)) - 1)
+            if clash:
+                pairs.extend((tweak_id, other) for other in self.ids_of(clash))
+        return pairs
+
+
+_graphs: dict[int, ConflictGraph] = {}
+
+
+def get_conflict_graph(registry: TweakRegistry = None) -> ConflictGraph:
+    """Returns graph of registry, it is rebuilt only after catalog has changed"""
+    registry = registry if registry is not None else TWEAKS
+    graph = _graphs.get(id(registry))
+    if graph is None or graph.registry is not registry:
+        graph = _graphs[id(registry)] = ConflictGraph(registry)
+    elif graph.version != registry.version:
+        graph.build()
+    return graph
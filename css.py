@@ -0,0 +1,534 @@
+import re
+
+from tracing import traced
+
+
+_IMPORTANT = re.compile(r"\s*!\s*important\s*$", re.IGNORECASE)
+# at-rules whose body is a list of ordinary rules, rules inside them are optimized as a separate stylesheet
+GROUP_AT_RULES = {"media", "supports", "container", "layer", "document", "scope"}
+
+
+class Declaration:
+    def __init__(self, property: str, value: str, important: bool = False) -> None:
+        self.property = property
+        self.value = value
+        self.important = important
+
+    def to_css(self) -> str:
+        return f"{self.property}:{self.value}{'!important' if self.important else ''}"
+
+
+class Rule:
+    def __init__(self, selectors: list[str], declarations: list[Declaration], raw_body: str = None) -> None:
+        self.selectors = selectors
+        self.declarations = declarations
+        # body that could not be split into declarations (nested css), kept as is and never merged
+        self.raw_body = raw_body
+
+    @property
+    def selector(self) -> str:
+        return ",".join(self.selectors)
+
+    def to_css(self) -> str:
+        if self.raw_body is not None:
+            return f"{self.selector}{{{self.raw_body}}}"
+        return f"{self.selector}{{{';'.join(d.to_css() for d in self.declarations)}}}"
+
+
+class AtRule:
+    def __init__(self, name: str, prelude: str, rules: list = None, declarations: list[Declaration] = None) -> None:
+        self.name = name
+        self.prelude = prelude
+        self.rules = rules
+        self.declarations = declarations
+
+    def to_css(self) -> str:
+        head = f"@{self.name}{' ' + self.prelude if self.prelude else ''}"
+        if self.rules is not None:
+            return f"{head}{{{''.join(node.to_css() for node in self.rules)}}}"
+        if self.declarations is not None:
+            return f"{head}{{{';'.join(d.to_css() for d in self.declarations)}}}"
+        return f"{head};"
+
+
+def strip_comments(text: str) -> str:
+    out = []
+    i = 0
+    quote = None
+    length = len(text)
+    while i < length:
+        char = text[i]
+        if quote:
+            out.append(char)
+            if char == "\\" and i + 1 < length:
+                out.append(text[i + 1])
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in "\"'":
+            quote = char
+            out.append(char)
+        elif char == "/" and text.startswith("*", i + 1):
+            end = text.find("*/", i + 2)
+            i = length if end == -1 else end + 2
+            out.append(" ")
+            continue
+        else:
+            out.append(char)
+        i += 1
+    return "".join(out)
+
+
+def _scan(text: str, pos: int, stops: str) -> int:
+    """Returns index of first stop char at nesting depth 0 outside strings, or len(text)"""
+    depth = 0
+    quote = None
+    length = len(text)
+    while pos < length:
+        char = text[pos]
+        if quote:
+            if char == "\\":
+                pos += 1
+            elif char == quote:
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif depth == 0 and char in stops:
+            return pos
+        elif char in "([":
+            depth += 1
+        elif char in ")]":
+            depth = max(depth - 1, 0)
+        pos += 1
+    return length
+
+
+def _matching_brace(text: str, pos: int) -> int:
+    """pos points after "{", returns index of matching "}" """
+    depth = 1
+    while pos < len(text):
+        pos = _scan(text, pos, "{}")
+        if pos >= len(text):
+            break
+        depth += 1 if text[pos] == "{" else -1
+        if depth == 0:
+            return pos
+        pos += 1
+    return len(text)
+
+
+def _split_top_level(text: str, separator: str) -> list[str]:
+    parts = []
+    pos = 0
+    while pos <= len(text):
+        end = _scan(text, pos, separator)
+        parts.append(text[pos:end])
+        pos = end + 1
+    return parts
+
+
+def _minify_fragment(text: str, tight: str) -> str:
+    """Collapses whitespace outside strings and removes it around chars from tight"""
+    out = []
+    pos = 0
+    quote = None
+    for match in re.finditer(r"\\.|[\"']|\s+", text):
+        chunk = match.group()
+        if quote:
+            if chunk == quote:
+                quote = None
+            continue
+        if chunk in ("\"", "'"):
+            out.append(text[pos:match.start()])
+            pos = match.start()
+            quote = chunk
+            continue
+        if chunk.startswith("\\"):
+            continue
+        out.append(text[pos:match.start()])
+        out.append("\0")
+        pos = match.end()
+    out.append(text[pos:])
+    result = "".join(out).strip("\0")
+    # remove placeholders near tight chars, remaining ones become single spaces
+    for char in tight:
+        result = result.replace("\0" + char, char).replace(char + "\0", char)
+    return result.replace("\0", " ")
+
+
+def minify_selector(selector: str) -> str:
+    return _minify_fragment(selector.strip(), ">+~,")
+
+
+def minify_value(value: str) -> str:
+    return _minify_fragment(value.strip(), ",")
+
+
+def parse_declarations(body: str) -> list[Declaration]:
+    declarations = []
+    for part in _split_top_level(body, ";"):
+        colon = _scan(part, 0, ":")
+        if colon >= len(part):
+            continue
+        property = part[:colon].strip()
+        value = part[colon + 1:]
+        important = False
+        match = _IMPORTANT.search(value)
+        if match:
+            important = True
+            value = value[:match.start()]
+        if property:
+            declarations.append(Declaration(property.lower() if not property.startswith("--") else property,
+                                            minify_value(value), important))
+    return declarations
+
+
+def _parse_nodes(text: str, pos: int = 0, end: int = None) -> list:
+    nodes = []
+    end = len(text) if end is None else end
+    while pos < end:
+        while pos < end and text[pos].isspace():
+            pos += 1
+        if pos >= end:
+            break
+
+        if text[pos] == "@":
+            stop = min(_scan(text, pos, "{;"), end)
+            head = text[pos + 1:stop].strip()
+            name, _, prelude = head.partition(" ")
+            name = name.lower()
+            prelude = minify_value(prelude)
+            if stop >= end or text[stop] == ";":
+                nodes.append(AtRule(name, prelude))
+                pos = stop + 1
+                continue
+            close = _matching_brace(text, stop + 1)
+            body = text[stop + 1:close]
+            if _scan(body, 0, "{") < len(body):
+                nodes.append(AtRule(name, prelude, rules=_parse_nodes(body)))
+            else:
+                nodes.append(AtRule(name, prelude, declarations=parse_declarations(body)))
+            pos = close + 1
+            continue
+
+        stop = min(_scan(text, pos, "{};"), end)
+        if stop >= end or text[stop] != "{":
+            # stray text without block, css parsers drop it as well
+            pos = stop + 1
+            continue
+        selectors = [minify_selector(s) for s in _split_top_level(text[pos:stop], ",")]
+        close = _matching_brace(text, stop + 1)
+        body = text[stop + 1:close]
+        if _scan(body, 0, "{") < len(body):
+            nodes.append(Rule(selectors, [], raw_body=_minify_fragment(body.strip(), "{};:,>+~")))
+        else:
+            nodes.append(Rule(selectors, parse_declarations(body)))
+        pos = close + 1
+    return nodes
+
+
+def parse_stylesheet(text: str) -> list:
+    """Parses css into list of Rule and AtRule, comments are dropped"""
+    return _parse_nodes(strip_comments(text))
+
+
+def _sides(prefix: str, suffix: str = "") -> tuple:
+    return tuple(f"{prefix}-{side}{suffix}" for side in ("top", "right", "bottom", "left"))
+
+
+def _logical(prefix: str, suffix: str, physical: tuple) -> dict:
+    """Logical properties map to physical sides by writing mode, which is unknown here, so each of them
+    is taken as setting every side"""
+    return {f"{prefix}-{axis}{end}{suffix}": physical
+            for axis in ("block", "inline") for end in ("", "-start", "-end")}
+
+
+# shorthand -> properties it sets, entries may be shorthands themselves
+SHORTHANDS = {
+    "all": None,
+    "inset": ("top", "right", "bottom", "left"),
+    **_logical("inset", "", ("top", "right", "bottom", "left")),
+    "margin": _sides("margin"),
+    **_logical("margin", "", _sides("margin")),
+    "padding": _sides("padding"),
+    **_logical("padding", "", _sides("padding")),
+    "scroll-margin": _sides("scroll-margin"),
+    **_logical("scroll-margin", "", _sides("scroll-margin")),
+    "scroll-padding": _sides("scroll-padding"),
+    **_logical("scroll-padding", "", _sides("scroll-padding")),
+    # border resets border-image too, but not border-radius
+    "border": ("border-width", "border-style", "border-color", "border-image"),
+    "border-width": _sides("border", "-width"),
+    "border-style": _sides("border", "-style"),
+    "border-color": _sides("border", "-color"),
+    **{f"border-{side}": (f"border-{side}-width", f"border-{side}-style", f"border-{side}-color")
+       for side in ("top", "right", "bottom", "left")},
+    **_logical("border", "", ("border-width", "border-style", "border-color")),
+    **_logical("border", "-width", ("border-width",)),
+    **_logical("border", "-style", ("border-style",)),
+    **_logical("border", "-color", ("border-color",)),
+    "border-image": ("border-image-source", "border-image-slice", "border-image-width", "border-image-outset",
+                     "border-image-repeat"),
+    "border-radius": ("border-top-left-radius", "border-top-right-radius", "border-bottom-right-radius",
+                      "border-bottom-left-radius"),
+    **{f"border-{block}-{inline}-radius": ("border-radius",)
+       for block in ("start", "end") for inline in ("start", "end")},
+    "outline": ("outline-color", "outline-style", "outline-width"),
+    "background": ("background-color", "background-image", "background-position", "background-size",
+                   "background-repeat", "background-attachment", "background-origin", "background-clip"),
+    "background-position": ("background-position-x", "background-position-y"),
+    "font": ("font-style", "font-variant", "font-weight", "font-stretch", "font-size", "line-height",
+             "font-family", "font-size-adjust", "font-kerning", "font-language-override", "font-optical-sizing",
+             "font-variation-settings", "font-feature-settings"),
+    "font-variant": ("font-variant-caps", "font-variant-ligatures", "font-variant-numeric", "font-variant-east-asian",
+                     "font-variant-alternates", "font-variant-position", "font-variant-emoji"),
+    "gap": ("row-gap", "column-gap"),
+    "grid-gap": ("gap",),
+    "grid-row-gap": ("row-gap",),
+    "grid-column-gap": ("column-gap",),
+    "place-content": ("align-content", "justify-content"),
+    "place-items": ("align-items", "justify-items"),
+    "place-self": ("align-self", "justify-self"),
+    "flex": ("flex-grow", "flex-shrink", "flex-basis"),
+    "flex-flow": ("flex-direction", "flex-wrap"),
+    "grid": ("grid-template", "grid-auto-rows", "grid-auto-columns", "grid-auto-flow"),
+    "grid-template": ("grid-template-rows", "grid-template-columns", "grid-template-areas"),
+    "grid-area": ("grid-row", "grid-column"),
+    "grid-row": ("grid-row-start", "grid-row-end"),
+    "grid-column": ("grid-column-start", "grid-column-end"),
+    "transition": ("transition-property", "transition-duration", "transition-timing-function", "transition-delay",
+                   "transition-behavior"),
+    "animation": ("animation-name", "animation-duration", "animation-timing-function", "animation-delay",
+                  "animation-iteration-count", "animation-direction", "animation-fill-mode", "animation-play-state",
+                  "animation-timeline"),
+    "list-style": ("list-style-type", "list-style-position", "list-style-image"),
+    "text-decoration": ("text-decoration-line", "text-decoration-style", "text-decoration-color",
+                        "text-decoration-thickness"),
+    "text-emphasis": ("text-emphasis-style", "text-emphasis-color"),
+    "white-space": ("white-space-collapse", "text-wrap-mode"),
+    "text-wrap": ("text-wrap-mode", "text-wrap-style"),
+    "columns": ("column-width", "column-count"),
+    "column-rule": ("column-rule-width", "column-rule-style", "column-rule-color"),
+    "overflow": ("overflow-x", "overflow-y"),
+    "overflow-block": ("overflow",),
+    "overflow-inline": ("overflow",),
+    "overscroll-behavior": ("overscroll-behavior-x", "overscroll-behavior-y"),
+    "mask": ("mask-image", "mask-mode", "mask-position", "mask-size", "mask-repeat", "mask-origin", "mask-clip",
+             "mask-composite", "mask-border"),
+    "mask-border": ("mask-border-source", "mask-border-slice", "mask-border-width", "mask-border-outset",
+                    "mask-border-repeat", "mask-border-mode"),
+    "container": ("container-name", "container-type"),
+    "offset": ("offset-position", "offset-path", "offset-distance", "offset-rotate", "offset-anchor"),
+    "contain-intrinsic-size": ("contain-intrinsic-width", "contain-intrinsic-height"),
+    "inline-size": ("width", "height"),
+    "block-size": ("width", "height"),
+    "min-inline-size": ("min-width", "min-height"),
+    "min-block-size": ("min-width", "min-height"),
+    "max-inline-size": ("max-width", "max-height"),
+    "max-block-size": ("max-width", "max-height"),
+    "word-wrap": ("overflow-wrap",),
+}
+# properties not set by any shorthand above, any other property is unknown
+LONGHANDS = {
+    "color", "display", "opacity", "visibility", "cursor", "z-index", "position", "float", "clear", "box-sizing",
+    "box-shadow", "transform", "transform-origin", "transform-style", "translate", "rotate", "scale", "perspective",
+    "perspective-origin", "backface-visibility", "filter", "backdrop-filter", "content", "pointer-events",
+    "user-select", "vertical-align", "text-align", "text-align-last", "text-indent", "text-transform",
+    "text-overflow", "text-shadow", "text-rendering", "letter-spacing", "word-spacing", "word-break", "hyphens",
+    "tab-size", "direction", "unicode-bidi", "writing-mode", "order", "isolation", "mix-blend-mode",
+    "background-blend-mode", "will-change", "clip-path", "clip", "object-fit", "object-position", "aspect-ratio",
+    "resize", "appearance", "caret-color", "accent-color", "color-scheme", "outline-offset", "quotes",
+    "counter-reset", "counter-increment", "table-layout", "border-collapse", "border-spacing", "caption-side",
+    "empty-cells", "fill", "stroke", "stroke-width", "zoom", "contain", "content-visibility", "scroll-behavior",
+    "scrollbar-width", "scrollbar-color", "scrollbar-gutter", "touch-action", "image-rendering",
+    "font-smooth", "line-clamp", "box-decoration-break", "print-color-adjust", "forced-color-adjust",
+    "width", "height", "min-width", "min-height", "max-width", "max-height",
+}
+
+
+def _expand(property: str) -> frozenset | None:
+    if property not in SHORTHANDS:
+        return frozenset((property,))
+    parts = SHORTHANDS[property]
+    if parts is None:
+        return None
+    return frozenset().union(*(_expand(part) for part in parts))
+
+
+# property -> longhands it sets, None (all, unknown properties) overlaps everything
+_LONGHANDS_OF = {property: _expand(property) for property in (*SHORTHANDS, *LONGHANDS)}
+for _longhands in list(_LONGHANDS_OF.values()):
+    for _longhand in _longhands or ():
+        _LONGHANDS_OF.setdefault(_longhand, frozenset((_longhand,)))
+
+
+def _property_longhands(property: str) -> frozenset | None:
+    """Longhands set by property, so inset and top overlap but margin-left and margin-top do not.
+    Vendor prefix is ignored, None means property is unknown and may overlap anything"""
+    if property.startswith("--"):
+        return frozenset((property,))
+    property = property.lower()
+    if property.startswith("-"):
+        property = property.split("-", 2)[-1]
+    return _LONGHANDS_OF.get(property)
+
+
+def dedupe_declarations(declarations: list[Declaration]) -> list[Declaration]:
+    """Drops declarations overridden later in the same block, !important beats normal ones regardless of order"""
+    winners = {}
+    for index, declaration in enumerate(declarations):
+        current = winners.get(declaration.property)
+        if current is None or declaration.important or not declarations[current].important:
+            winners[declaration.property] = index
+    keep = set(winners.values())
+    return [d for index, d in enumerate(declarations) if index in keep]
+
+
+def _families(node) -> frozenset | None:
+    """Longhands touched by node, None means unknown (blocks merging over it)"""
+    if isinstance(node, Rule) and node.raw_body is None:
+        touched = frozenset()
+        for declaration in node.declarations:
+            longhands = _property_longhands(declaration.property)
+            if longhands is None:
+                return None
+            touched |= longhands
+        return touched
+    if isinstance(node, AtRule) and node.rules is None and node.declarations is None:
+        return frozenset()
+    return None
+
+
+def merge_rules(nodes: list) -> list:
+    """Merges rule into earlier rule with identical selector when no rule between them touches same properties"""
+    result = []
+    by_selector: dict[str, int] = {}
+    for node in nodes:
+        if isinstance(node, AtRule) and node.name in GROUP_AT_RULES and node.rules is not None:
+            node.rules = merge_rules(node.rules)
+
+        if not isinstance(node, Rule) or node.raw_body is not None:
+            result.append(node)
+            continue
+
+        node.declarations = dedupe_declarations(node.declarations)
+        target_index = by_selector.get(node.selector)
+        if target_index is not None:
+            families = _families(node)
+            blocked = False
+            for between in result[target_index + 1:]:
+                touched = _families(between)
+                if touched is None or (families is None and touched) or (families and touched & families):
+                    blocked = True
+                    break
+            if not blocked:
+                target = result[target_index]
+                target.declarations = dedupe_declarations(target.declarations + node.declarations)
+                continue
+
+        by_selector[node.selector] = len(result)
+        result.append(node)
+    return [node for node in result if not (isinstance(node, Rule) and node.raw_body is None and not node.declarations)]
+
+
+@traced("css.optimize")
+def optimize_css(text: str) -> str:
+    """Strips comments and whitespace, merges rules with same selector and drops overridden declarations"""
+    return "".join(node.to_css() for node in merge_rules(parse_stylesheet(text)))
+
+
+class SimpleSelector:
+    """One part of compound selector: tag, universal, id, class, attribute, pseudo-class or pseudo-element"""
+    def __init__(self, kind: str, name: str = "", operator: str = "", value: str = "", argument: str = None) -> None:
+        self.kind = kind
+        self.name = name
+        self.operator = operator
+        self.value = value
+        self.argument = argument
+
+    def __repr__(self) -> str:
+        return f"SimpleSelector({self.kind!r}, {self.name!r})"
+
+
+_COMBINATOR_CHARS = " \t\n\r\f>+~"
+_IDENT = re.compile(r"-?(?:[_a-zA-Z]|[^\x00-\x7f]|\\.)(?:[_a-zA-Z0-9-]|[^\x00-\x7f]|\\.)*")
+_ATTRIBUTE = re.compile(r"""\s*([^\s~|^$*!=\]]+)\s*(?:([~|^$*]?=)\s*("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|[^\s\]]+)\s*([iIsS])?\s*)?$""")
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        value = value[1:-1]
+    return re.sub(r"\\(.)", r"\1", value)
+
+
+def parse_compound(compound: str) -> list[SimpleSelector]:
+    parts = []
+    pos = 0
+    while pos < len(compound):
+        char = compound[pos]
+        if char == "*":
+            parts.append(SimpleSelector("universal", "*"))
+            pos += 1
+        elif char in "#.":
+            match = _IDENT.match(compound, pos + 1)
+            if not match:
+                raise ValueError(f"Bad selector: {compound}")
+            parts.append(SimpleSelector("id" if char == "#" else "class", _unquote(match.group())))
+            pos = match.end()
+        elif char == "[":
+            end = _scan(compound, pos + 1, "]")
+            match = _ATTRIBUTE.match(compound[pos + 1:end])
+            if not match:
+                raise ValueError(f"Bad attribute selector: {compound[pos:end + 1]}")
+            name, operator, value, flag = match.groups()
+            parts.append(SimpleSelector("attribute", name.lower(), operator or "",
+                                        _unquote(value) if value is not None else "", flag.lower() if flag else None))
+            pos = end + 1
+        elif char == ":":
+            kind = "pseudo"
+            pos += 1
+            if compound.startswith(":", pos):
+                kind = "pseudo_element"
+                pos += 1
+            match = _IDENT.match(compound, pos)
+            if not match:
+                raise ValueError(f"Bad pseudo selector: {compound}")
+            name = match.group().lower()
+            pos = match.end()
+            argument = None
+            if compound.startswith("(", pos):
+                end = _scan(compound, pos + 1, ")")
+                argument = compound[pos + 1:end].strip()
+                pos = end + 1
+            parts.append(SimpleSelector(kind, name, argument=argument))
+        else:
+            match = _IDENT.match(compound, pos)
+            if not match:
+                raise ValueError(f"Bad selector: {compound}")
+            parts.append(SimpleSelector("tag", match.group().lower()))
+            pos = match.end()
+    return parts
+
+
+def parse_selector(selector: str) -> list[tuple[str, list[SimpleSelector]]]:
+    """Splits complex selector into (combinator, compound) pairs, combinator of first compound is "" unless selector is relative"""
+    result = []
+    selector = selector.strip()
+    pos = 0
+    while pos < len(selector):
+        combinator = ""
+        start = pos
+        while pos < len(selector) and selector[pos] in _COMBINATOR_CHARS:
+            if selector[pos] in ">+~":
+                combinator = selector[pos]
+            pos += 1
+        if pos > start and not combinator and result:
+            combinator = " "
+        end = _scan(selector, pos, _COMBINATOR_CHARS)
+        result.append((combinator, parse_compound(selector[pos:end])))
+        pos = end
+    return result
+
+
+def split_selector_list(selectors: str) -> list[str]:
+    return [s.strip() for s in _split_top_level(selectors, ",") if s.strip()]
@@ -0,0 +1,383 @@
+"""Static DOM snapshot and selector engine used to find css rules that match nothing.
+
+Snapshot is html saved from VSCode devtools (Copy outerHTML of <html> element).
+Matching is optimistic: state that can not be known from snapshot (:hover, :focus,
+unsupported pseudo-classes, attributes VSCode changes at runtime like style and aria-*,
+state classes like .focused and .active) is assumed to match, so selector is reported dead
+only when it can not match snapshot in any state. Plain tag, id and other class selectors
+are matched against snapshot as is.
+"""
+import hashlib
+from functools import lru_cache
+from html.parser import HTMLParser
+
+from css import parse_selector, split_selector_list
+from tracing import traced
+
+
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr",
+}
+STRUCTURAL_PSEUDO = {
+    "root", "scope", "empty", "first-child", "last-child", "only-child", "first-of-type", "last-of-type",
+    "only-of-type", "nth-child", "nth-last-child", "nth-of-type", "nth-last-of-type",
+}
+# attributes toggled at runtime, [style*="display: none"] of closed widget must not make selector dead.
+# class is matched as state classes below, [class~=x] like .x, other operators as dynamic attribute
+DYNAMIC_ATTRIBUTES = {
+    "style", "hidden", "open", "checked", "selected", "disabled", "tabindex", "title", "value",
+}
+DYNAMIC_ATTRIBUTE_PREFIXES = ("aria-",)
+# classes VSCode toggles with ui state, snapshot captures only one state of them
+STATE_CLASSES = {
+    "active", "focused", "selected", "checked", "dirty", "expanded", "collapsed", "visible", "hidden", "disabled",
+    "open", "pinned", "sticky", "dragging", "drag-over", "dragged", "highlighted", "maximized", "minimized",
+    "fullscreen", "loading", "hover", "pressed", "toggled", "synthetic-focus", "preview", "modified", "empty",
+}
+# single colon forms of pseudo-elements
+LEGACY_PSEUDO_ELEMENTS = {"before", "after", "first-line", "first-letter"}
+
+
+class Element:
+    __slots__ = ("tag", "id", "classes", "attributes", "parent", "siblings", "index", "order", "end", "has_text")
+
+    def __init__(self, tag: str, attributes: dict[str, str], parent, siblings: list) -> None:
+        self.tag = tag
+        self.attributes = attributes
+        self.id = attributes.get("id")
+        self.classes = frozenset(attributes.get("class", "").split())
+        self.parent = parent
+        # element children of parent (top-level elements for root), index is position there
+        self.siblings = siblings
+        self.index = len(siblings)
+        # position in document order, descendants are elements[order + 1:end]
+        self.order = 0
+        self.end = 0
+        self.has_text = False
+
+    def __repr__(self) -> str:
+        return f"Element({self.tag!r}, id={self.id!r}, classes={sorted(self.classes)!r})"
+
+
+class Document:
+    def __init__(self, elements: list[Element], digest: str = "") -> None:
+        self.elements = elements
+        # changes with snapshot content, part of render cache key
+        self.digest = digest
+        self.by_id: dict[str, list[Element]] = {}
+        self.by_class: dict[str, list[Element]] = {}
+        self.by_tag: dict[str, list[Element]] = {}
+        # selector -> matches_any result, snapshot never changes so answers stay valid
+        self._answers: dict[str, bool] = {}
+        for element in elements:
+            if element.id:
+                self.by_id.setdefault(element.id, []).append(element)
+            for name in element.classes:
+                self.by_class.setdefault(name, []).append(element)
+            self.by_tag.setdefault(element.tag, []).append(element)
+
+    def descendants(self, element: Element) -> list[Element]:
+        return self.elements[element.order + 1:element.end]
+
+    def _missing_names(self, chain: tuple) -> bool:
+        """Some id, class or tag required by chain is not in snapshot at all (common after VSCode renames)"""
+        for _, compound in chain:
+            for simple in compound:
+                if simple.kind == "id" and simple.name not in self.by_id:
+                    return True
+                if simple.kind == "class" and simple.name not in self.by_class and simple.name not in STATE_CLASSES:
+                    return True
+                if simple.kind == "tag" and simple.name not in self.by_tag:
+                    return True
+        return False
+
+    def _candidates(self, compound) -> list[Element]:
+        """Elements that can match compound judging by its id, classes and tag"""
+        best = None
+        for simple in compound:
+            if simple.kind == "id":
+                found = self.by_id.get(simple.name, [])
+            elif simple.kind == "class" and simple.name not in STATE_CLASSES:
+                found = self.by_class.get(simple.name, [])
+            elif simple.kind == "tag":
+                found = self.by_tag.get(simple.name, [])
+            else:
+                continue
+            if best is None or len(found) < len(best):
+                best = found
+        return self.elements if best is None else best
+
+    def matches_any(self, selector: str) -> bool:
+        """False only when selector surely matches no element of snapshot. Unparsable selectors are kept"""
+        answer = self._answers.get(selector)
+        if answer is None:
+            try:
+                chain = _parsed(selector)
+            except ValueError:
+                answer = True
+            else:
+                if self._missing_names(chain):
+                    answer = False
+                else:
+                    matcher = _Matcher(self)
+                    answer = any(matcher.match(element, chain, True) for element in self._candidates(chain[-1][1]))
+            self._answers[selector] = answer
+        return answer
+
+
+class _SnapshotParser(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.elements: list[Element] = []
+        self.roots: list[Element] = []
+        self.stack: list[Element] = []
+        # element order -> its element children
+        self.children: dict[int, list[Element]] = {}
+
+    def handle_starttag(self, tag, attrs):
+        self._open(tag, attrs)
+        if tag in VOID_ELEMENTS:
+            self._close()
+
+    def handle_startendtag(self, tag, attrs):
+        self._open(tag, attrs)
+        self._close()
+
+    def handle_endtag(self, tag):
+        # unclosed elements inside are closed too, stray end tags are ignored
+        for depth in range(len(self.stack) - 1, -1, -1):
+            if self.stack[depth].tag == tag:
+                while len(self.stack) > depth:
+                    self._close()
+                return
+
+    def handle_data(self, data):
+        if self.stack and data.strip():
+            self.stack[-1].has_text = True
+
+    def _open(self, tag, attrs):
+        parent = self.stack[-1] if self.stack else None
+        siblings = self.roots if parent is None else self.children.setdefault(parent.order, [])
+        element = Element(tag, {name: value if value is not None else "" for name, value in attrs}, parent, siblings)
+        element.order = len(self.elements)
+        siblings.append(element)
+        self.elements.append(element)
+        self.stack.append(element)
+
+    def _close(self):
+        element = self.stack.pop()
+        element.end = len(self.elements)
+
+    def finish(self) -> list[Element]:
+        self.close()
+        while self.stack:
+            self._close()
+        return self.elements
+
+
+def parse_html(text: str) -> Document:
+    parser = _SnapshotParser()
+    parser.feed(text)
+    elements = parser.finish()
+    return Document(elements, hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest())
+
+
+@traced("dom.load_snapshot")
+def load_snapshot(path: str) -> Document:
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return parse_html(f.read())
+
+
+@lru_cache(maxsize=4096)
+def _parsed(selector: str) -> tuple:
+    return tuple(parse_selector(selector))
+
+
+@lru_cache(maxsize=1024)
+def _parsed_list(selectors: str) -> tuple:
+    return tuple(_parsed(selector) for selector in split_selector_list(selectors))
+
+
+def _parse_nth(argument: str) -> tuple[int, int] | None:
+    """(a, b) of an+b, None for forms not supported (like "of S")"""
+    argument = argument.replace(" ", "").lower()
+    if argument == "odd":
+        return 2, 1
+    if argument == "even":
+        return 2, 0
+    try:
+        if "n" not in argument:
+            return 0, int(argument)
+        a, _, b = argument.partition("n")
+        a = -1 if a == "-" else 1 if a in ("", "+") else int(a)
+        return a, int(b) if b else 0
+    except ValueError:
+        return None
+
+
+def _nth_matches(a: int, b: int, position: int) -> bool:
+    if a == 0:
+        return position == b
+    n, remainder = divmod(position - b, a)
+    return remainder == 0 and n >= 0
+
+
+def _is_dynamic_attribute(name: str) -> bool:
+    name = name.lower()
+    return name in DYNAMIC_ATTRIBUTES or name.startswith(DYNAMIC_ATTRIBUTE_PREFIXES)
+
+
+def _class_matches(element: Element, name: str, may: bool) -> bool:
+    if name in STATE_CLASSES:
+        return may
+    return name in element.classes
+
+
+def _attribute_matches(element: Element, simple) -> bool:
+    value = element.attributes.get(simple.name)
+    if value is None:
+        return False
+    operator = simple.operator
+    if not operator:
+        return True
+    expected = simple.value
+    if simple.argument == "i":
+        value, expected = value.lower(), expected.lower()
+    if operator == "=":
+        return value == expected
+    if operator == "~=":
+        return expected in value.split()
+    if operator == "|=":
+        return value == expected or value.startswith(expected + "-")
+    if not expected:
+        return False
+    if operator == "^=":
+        return value.startswith(expected)
+    if operator == "$=":
+        return value.endswith(expected)
+    return expected in value
+
+
+class _Matcher:
+    """Right to left matcher. may=True answers "can match", may=False "surely matches" (used under :not)"""
+    def __init__(self, document: Document) -> None:
+        self.document = document
+        self.has_cache: dict[tuple, bool] = {}
+
+    def match(self, element: Element, chain: tuple, may: bool, anchor: Element = None) -> bool:
+        return self._match_from(element, chain, len(chain) - 1, may, anchor)
+
+    def _match_from(self, element: Element, chain: tuple, i: int, may: bool, anchor: Element) -> bool:
+        combinator, compound = chain[i]
+        if not self._compound(element, compound, may):
+            return False
+        if i == 0:
+            return anchor is None or self._related(element, anchor, combinator or " ")
+        if combinator == ">":
+            return element.parent is not None and self._match_from(element.parent, chain, i - 1, may, anchor)
+        if combinator == "+":
+            return element.index > 0 and self._match_from(element.siblings[element.index - 1], chain, i - 1, may, anchor)
+        if combinator == "~":
+            return any(self._match_from(sibling, chain, i - 1, may, anchor) for sibling in element.siblings[:element.index])
+        ancestor = element.parent
+        while ancestor is not None:
+            if self._match_from(ancestor, chain, i - 1, may, anchor):
+                return True
+            ancestor = ancestor.parent
+        return False
+
+    @staticmethod
+    def _related(element: Element, anchor: Element, combinator: str) -> bool:
+        """element relates to :has() anchor as relative selector requires"""
+        if combinator == ">":
+            return element.parent is anchor
+        if combinator == "+":
+            return element.siblings is anchor.siblings and element.index == anchor.index + 1
+        if combinator == "~":
+            return element.siblings is anchor.siblings and element.index > anchor.index
+        return anchor.order < element.order < anchor.end
+
+    def _compound(self, element: Element, compound: list, may: bool) -> bool:
+        for simple in compound:
+            kind = simple.kind
+            if kind == "class":
+                ok = _class_matches(element, simple.name, may)
+            elif kind == "tag":
+                ok = element.tag == simple.name
+            elif kind == "id":
+                ok = element.id == simple.name
+            elif kind == "attribute":
+                if simple.name.lower() == "class":
+                    if simple.operator == "~=" and simple.argument is None:
+                        ok = _class_matches(element, simple.value, may)
+                    else:
+                        # whole attribute value changes with state classes
+                        ok = may if simple.operator else "class" in element.attributes
+                elif _is_dynamic_attribute(simple.name):
+                    # like dynamic pseudo-classes: "can match" when optimistic, "not surely" under :not
+                    ok = may
+                else:
+                    ok = _attribute_matches(element, simple)
+            elif kind == "pseudo":
+                ok = self._pseudo(element, simple, may)
+            else:
+                # universal selector and pseudo-elements
+                ok = True
+            if not ok:
+                return False
+        return True
+
+    def _pseudo(self, element: Element, simple, may: bool) -> bool:
+        name = simple.name
+        argument = simple.argument
+        if name == "not" and argument is not None:
+            return not any(self.match(element, chain, not may) for chain in _parsed_list(argument))
+        if name in ("is", "where", "matches", "any", "-webkit-any") and argument is not None:
+            return any(self.match(element, chain, may) for chain in _parsed_list(argument))
+        if name == "has" and argument is not None:
+            return any(self._has(element, selector, may) for selector in split_selector_list(argument))
+        if name in LEGACY_PSEUDO_ELEMENTS:
+            return True
+        if name in STRUCTURAL_PSEUDO:
+            result = self._structural(element, name, argument)
+            if result is not None:
+                return result
+        # dynamic state (:hover, :focus, :checked...) or unsupported pseudo-class
+        return may
+
+    def _has(self, element: Element, selector: str, may: bool) -> bool:
+        key = (element.order, selector, may)
+        cached = self.has_cache.get(key)
+        if cached is None:
+            chain = _parsed(selector)
+            if chain[0][0] in ("+", "~"):
+                scope = []
+                for sibling in element.siblings[element.index + 1:]:
+                    scope.append(sibling)
+                    scope.extend(self.document.descendants(sibling))
+            else:
+                scope = self.document.descendants(element)
+            cached = self.has_cache[key] = any(self.match(candidate, chain, may, element) for candidate in scope)
+        return cached
+
+    @staticmethod
+    def _structural(element: Element, name: str, argument: str) -> bool | None:
+        if name in ("root", "scope"):
+            return element.parent is None
+        if name == "empty":
+            return element.end == element.order + 1 and not element.has_text
+        siblings = element.siblings
+        if name.endswith("of-type"):
+            siblings = [sibling for sibling in siblings if sibling.tag == element.tag]
+        position = siblings.index(element) + 1 if name.endswith("of-type") else element.index + 1
+        last_position = len(siblings) - position + 1
+        if name in ("first-child", "first-of-type"):
+            return position == 1
+        if name in ("last-child", "last-of-type"):
+            return last_position == 1
+        if name in ("only-child", "only-of-type"):
+            return len(siblings) == 1
+        nth = _parse_nth(argument or "")
+        if nth is None:
+            return None
+        return _nth_matches(*nth, last_position if "last" in name else position)
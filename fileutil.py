@@ -0,0 +1,38 @@
+import os
+import stat
+import tempfile
+
+
+def _current_umask() -> int:
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# read once at import, os.umask can not be queried without changing it
+UMASK = _current_umask()
+
+
+def atomic_write(path: str, data: bytes) -> None:
+    """Writes data to temp file in same folder and renames it over path.
+    Symlinked path is followed, so link stays and its target is replaced. Mode of existing file is kept,
+    new file gets default mode (0666 without umask) instead of 0600 of temp file"""
+    path = os.path.realpath(path)
+    folder = os.path.dirname(path)
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = 0o666 & ~UMASK
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=folder)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        # os.fchmod is not available on Windows
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
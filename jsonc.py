@@ -0,0 +1,145 @@
+import re
+import json
+
+from fileutil import atomic_write
+from tracing import traced
+
+
+_TOKEN = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<line_comment>//[^\n]*)
+  | (?P<block_comment>/\*.*?\*/)
+  | (?P<string>"(?:[^"\\\n]|\\.)*")
+  | (?P<punct>[{}\[\]:,])
+  | (?P<literal>[^\s{}\[\]:,"/]+)
+""", re.VERBOSE | re.DOTALL)
+_SKIPPED = ("space", "line_comment", "block_comment")
+
+
+class JsoncError(ValueError):
+    pass
+
+
+def tokenize(text: str, pos: int = 0):
+    """Yields (kind, start, end) of tokens, comments and whitespace included"""
+    length = len(text)
+    while pos < length:
+        match = _TOKEN.match(text, pos)
+        if not match:
+            raise JsoncError(f"Unexpected character {text[pos]!r} at offset {pos}")
+        yield match.lastgroup, match.start(), match.end()
+        pos = match.end()
+
+
+def _tokens(text: str):
+    """Tokens without whitespace and comments"""
+    for kind, start, end in tokenize(text):
+        if kind not in _SKIPPED:
+            yield kind, start, end
+
+
+def _skip_value(text: str, tokens, first) -> int:
+    """first is first token of value, returns end offset of whole value"""
+    kind, start, end = first
+    if kind != "punct" or text[start] not in "{[":
+        return end
+    depth = 1
+    for kind, start, end in tokens:
+        if kind == "punct":
+            if text[start] in "{[":
+                depth += 1
+            elif text[start] in "}]":
+                depth -= 1
+                if depth == 0:
+                    return end
+    raise JsoncError("Unexpected end of document")
+
+
+def find_member(text: str, key: str) -> dict:
+    """Looks for key in top-level object.
+
+    Returns dict with "value" ((start, end) of value or None when key is absent), "insert_at" (offset after
+    last member, or after its trailing comma), "closing" (offset of closing brace when key is absent),
+    "members" (count) and "trailing_comma"
+    """
+    tokens = _tokens(text)
+    first = next(tokens, None)
+    if first is None or text[first[1]] != "{":
+        raise JsoncError("Top level value is not an object")
+
+    found = {"value": None, "insert_at": first[2], "closing": None, "members": 0, "trailing_comma": False}
+    for kind, start, end in tokens:
+        if kind == "punct" and text[start] == "}":
+            found["closing"] = start
+            return found
+        if kind == "punct" and text[start] == "," and found["members"]:
+            found["insert_at"] = end
+            found["trailing_comma"] = True
+            continue
+        if kind != "string":
+            raise JsoncError(f"Expected key at offset {start}")
+
+        member_key = json.loads(text[start:end])
+        colon = next(tokens, None)
+        if colon is None or text[colon[1]] != ":":
+            raise JsoncError(f"Expected ':' at offset {end}")
+        value = next(tokens, None)
+        if value is None:
+            raise JsoncError("Unexpected end of document")
+        value_end = _skip_value(text, tokens, value)
+        if member_key == key:
+            found["value"] = (value[1], value_end)
+            return found
+        found["insert_at"] = value_end
+        found["members"] += 1
+        found["trailing_comma"] = False
+    raise JsoncError("Unexpected end of document")
+
+
+def _line_indent(text: str, offset: int) -> str:
+    line_start = text.rfind("\n", 0, offset) + 1
+    line = text[line_start:offset]
+    return line[:len(line) - len(line.lstrip())]
+
+
+def set_member(text: str, key: str, value) -> str:
+    """Returns text with top-level key set to value, everything else (comments, formatting) is kept"""
+    value_text = json.dumps(value, ensure_ascii=False)
+    found = find_member(text, key)
+    if found["value"] is not None:
+        start, end = found["value"]
+        try:
+            if json.loads(text[start:end]) == value:
+                return text
+        except ValueError:
+            pass
+        return text[:start] + value_text + text[end:]
+
+    insert_at = found["insert_at"]
+    if not found["members"]:
+        member = f"\n    {json.dumps(key)}: {value_text}"
+        newline = "" if "\n" in text[insert_at:found["closing"]] else "\n"
+        return text[:insert_at] + member + newline + text[insert_at:]
+
+    indent = _line_indent(text, insert_at) or "    "
+    member = f"\n{indent}{json.dumps(key)}: {value_text}"
+    if found["trailing_comma"]:
+        return text[:insert_at] + member + "," + text[insert_at:]
+    return text[:insert_at] + "," + member + text[insert_at:]
+
+
+@traced("settings.patch_file")
+def patch_file(path: str, key: str, value) -> bool:
+    """Sets top-level key in JSONC file, returns False if file already had same value"""
+    with open(path, "rb") as f:
+        raw = f.read()
+    bom = raw.startswith(b"\xef\xbb\xbf")
+    text = raw.decode("utf-8-sig")
+    if not text.strip():
+        text = "{}"
+
+    patched = set_member(text, key, value)
+    if patched == text:
+        return False
+    atomic_write(path, (b"\xef\xbb\xbf" if bom else b"") + patched.encode("utf-8"))
+    return True
@@ -1,69 +1,681 @@
+import abc
 import os
 import json
 
+from fileutil import atomic_write
+from selection import TweakSelection
+from templates import ParamError
+from tracing import traced, count
+from tweaks import TWEAKS
 
-class ProjectHandler:
+
+BATCH_SIZE = 200
+
+
+class InheritanceError(ValueError):
+    """Project extends itself (through other projects) or extends project that does not exist"""
+
+
+class ProjectStore(abc.ABC):
+    """Storage backend of ProjectHandler.
+
+    Projects are identified by abs_path, its extension is replaced by .css when project is rendered.
+    Abstract methods are required, store missing one of them can not be created.
+    count/page/projects_using read every project by default, stores with paged=True answer count/page
+    and with tweak_index=True projects_using without it, so ProjectHandler asks them instead of using
+    loaded projects. watchable=True means projects are files that can be watched (see StylesWatcher).
+    """
+    paged = False
+    tweak_index = False
+    watchable = False
+
+    def __init__(self, folder: str) -> None:
+        # folder of rendered css files
+        self.folder = folder
+
+    @abc.abstractmethod
+    def load_batches(self, batch_size: int = BATCH_SIZE):
+        """Yields (projects, done, total) while loading"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def load(self, abs_path: str):
+        """Returns project stored under path or None"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def project_path(self, name: str) -> str:
+        """abs_path of new project with given name"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def save(self, project):
+        raise NotImplementedError
+
+    def save_many(self, projects: list):
+        for project in projects:
+            self.save(project)
+
+    @abc.abstractmethod
+    def delete(self, project):
+        raise NotImplementedError
+
+    def _listed(self, name_filter: str = "") -> list:
+        """Every stored project sorted by name (case insensitive), keeping names containing name_filter"""
+        name_filter = name_filter.lower()
+        projects = [project for batch, _, _ in self.load_batches() for project in batch
+                    if name_filter in project.name.lower()]
+        projects.sort(key=lambda project: project.name.lower())
+        return projects
+
+    def count(self, name_filter: str = "") -> int:
+        return len(self._listed(name_filter))
+
+    def page(self, offset: int, limit: int, name_filter: str = "") -> list:
+        return self._listed(name_filter)[offset:offset + limit]
+
+    def projects_using(self, tweak_id: str) -> list:
+        """Projects selecting tweak themselves, inherited use is found by ProjectHandler"""
+        return [project for batch, _, _ in self.load_batches() for project in batch if tweak_id in project.tweaks]
+
+    def close(self):
+        pass
+
+
+class JsonDirectoryStore(ProjectStore):
+    """One <name>.json file per project, parsed files are cached in index file next to them"""
     EMPTY_PROJECT = {"name": "", "tweaks": []}
-    
-    def __init__(self, styles_folder_name: str = "styles") -> None:
-        self.styles_folder_name = styles_folder_name
+    INDEX_FILE_NAME = ".projects_index.cache"
+    INDEX_VERSION = 3
+    watchable = True
+
+    def __init__(self, folder: str = "styles") -> None:
+        super().__init__(folder)
         self._prepare_dirs()
-        self.projects = self.load_projects()
+        # abs path -> (size, mtime_ns) of every json file seen by last load, kept current by file events
+        self.file_stats: dict[str, tuple[int, int]] = {}
 
     def _prepare_dirs(self):
-        if not os.path.exists(self.styles_folder_name):
-            os.makedirs(self.styles_folder_name)
+        if not os.path.exists(self.folder):
+            os.makedirs(self.folder)
+
+    def _index_path(self) -> str:
+        return os.path.join(self.folder, self.INDEX_FILE_NAME)
+
+    def _read_index(self) -> dict:
+        try:
+            with open(self._index_path(), "r", encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get("version") == self.INDEX_VERSION:
+                return index.get("files", {})
+        except (OSError, ValueError, AttributeError):
+            pass
+        return {}
 
+    @traced("projects.write_index")
+    def _write_index(self, files: dict):
+        data = json.dumps({"version": self.INDEX_VERSION, "files": files})
+        try:
+            atomic_write(self._index_path(), data.encode("utf-8"))
+        except OSError as e:
+            print(f"Error saving projects index: {e}")
+
+    @traced("projects.load_project_from_file")
+    def parse_project_file(self, file_path: str, stat: os.stat_result) -> dict:
+        """Returns index entry for project file, entry without name means file is not a project"""
+        entry = {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+
+            if all(key in data for key in self.EMPTY_PROJECT.keys()):
+                entry["name"] = data["name"]
+                entry["tweaks"] = data["tweaks"]
+                if data.get("extends"):
+                    entry["extends"] = data["extends"]
+                if data.get("remove"):
+                    entry["remove"] = data["remove"]
+                if data.get("params"):
+                    entry["params"] = data["params"]
+
+        except Exception as e:
+            print(f"Error loading project {os.path.basename(file_path)}: {e}")
+        return entry
+
+    @traced("projects.scan")
+    def scan_project_files(self) -> list:
+        """Returns (file name, path, stat) of every *.json file in styles folder"""
+        files = []
+        if not os.path.exists(self.folder):
+            return files
+
+        with os.scandir(self.folder) as entries:
+            for file in entries:
+                if file.name.endswith(".json") and file.is_file():
+                    files.append((file.name, file.path, file.stat()))
+        return files
+
+    def load_batches(self, batch_size: int = BATCH_SIZE):
+        """Only new and modified files are parsed, others come from index"""
+        files = self.scan_project_files()
+        total = len(files)
+        index = self._read_index()
+        entries = {}
+        changed = False
+        batch = []
+
+        for done, (name, path, stat) in enumerate(files, 1):
+            self.file_stats[os.path.abspath(path)] = (stat.st_size, stat.st_mtime_ns)
+            entry = index.get(name)
+            if entry is None or entry.get("size") != stat.st_size or entry.get("mtime") != stat.st_mtime_ns:
+                entry = self.parse_project_file(path, stat)
+                changed = True
+                count("projects.parsed")
+            else:
+                count("projects.index_hits")
+            entries[name] = entry
+
+            if "name" in entry:
+                batch.append(Project.from_entry(entry, os.path.abspath(path)))
+
+            if done % batch_size == 0:
+                yield batch, done, total
+                batch = []
+
+        if changed or len(entries) != len(index):
+            self._write_index(entries)
+
+        yield batch, total, total
+
+    def load(self, abs_path: str):
+        try:
+            with open(abs_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        return Project().from_json(data, abs_path)
+
+    def project_path(self, name: str) -> str:
+        return os.path.abspath(os.path.join(self.folder, f"{name}.json"))
+
+    def save(self, project):
+        save_project_file(project)
+        stat = os.stat(project.abs_path)
+        self.file_stats[project.abs_path] = (stat.st_size, stat.st_mtime_ns)
+
+    def delete(self, project):
+        try:
+            os.remove(project.abs_path)
+        except FileNotFoundError:
+            pass
+        self.file_stats.pop(project.abs_path, None)
+
+
+class ProjectHandler:
+    BATCH_SIZE = BATCH_SIZE
+
+    def __init__(self, styles_folder_name: str = "styles", lazy: bool = False, store: ProjectStore = None) -> None:
+        """With lazy=True projects list starts empty and is filled by add_projects (see load_project_batches).
+        Projects are kept as json files in styles folder unless other store is given"""
+        self.store = store if store is not None else JsonDirectoryStore(styles_folder_name)
+        self.styles_folder_name = self.store.folder
+        self.projects = []
+        self._by_path: dict[str, Project] = {}
+        # bumped on every change of loaded projects, invalidates sorted listing
+        self.revision = 0
+        self._listing: tuple[int, str, list] | None = None
+        # inheritance graph of loaded projects: base abs_path -> abs paths of projects extending it
+        self._children: dict[str, set[str]] = {}
+        # abs_path -> resolved tweaks of loaded project, dropped when project or any of its bases changes
+        self._resolved: dict = {}
+        # abs_path -> resolved parameter values, invalidated together with _resolved
+        self._resolved_params: dict = {}
+        if not lazy:
+            self.add_projects(self.load_projects())
+
+    @property
+    def file_stats(self) -> dict[str, tuple[int, int]]:
+        return self.store.file_stats
+
+    def scan_project_files(self) -> list:
+        return self.store.scan_project_files()
+
+    def load_project_batches(self, batch_size: int = BATCH_SIZE):
+        """Yields (projects, done, total) while loading"""
+        return self.store.load_batches(batch_size)
+
+    @traced("projects.load_projects")
     def load_projects(self) -> list:
         projects = []
-        
-        if not os.path.exists(self.styles_folder_name):
-            return projects
-        
-        for file in os.listdir(self.styles_folder_name):
-            if file.endswith(".json"):
-                file_path = os.path.join(self.styles_folder_name, file)
-                try:
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        data = json.load(f)
-                    
-                    if all(key in data for key in self.EMPTY_PROJECT.keys()):
-                        projects.append(Project().from_json(data, os.path.abspath(file_path)))
-                        
-                except Exception as e:
-                    print(f"Error loading project {file}: {e}")
-        
+        for batch, _, _ in self.load_project_batches():
+            projects.extend(batch)
+        return projects
+
+    def add_projects(self, projects: list) -> list:
+        """Adds projects not known yet, returns actually added ones"""
+        added = []
+        for project in projects:
+            if project.abs_path not in self._by_path:
+                self._by_path[project.abs_path] = project
+                self.projects.append(project)
+                self._link(project)
+                added.append(project)
+        if added:
+            self.revision += 1
+            # projects extending added ones could have been resolved before their base was loaded
+            for project in added:
+                if project.abs_path in self._children:
+                    self.invalidate(project.abs_path)
+        return added
+
+    def get_project_by_path(self, abs_path: str):
+        return self._by_path.get(abs_path)
+
+    def load_project(self, abs_path: str):
+        """Reads project from store (not from loaded list), None if it does not exist"""
+        return self.store.load(abs_path)
+
+    def _remember(self, project):
+        """Updates loaded copy of saved project, returns it"""
+        existing = self._by_path.get(project.abs_path)
+        if existing is None:
+            existing = project.copy()
+            self.add_projects([existing])
+        else:
+            self._update(existing, project.name, project.tweaks.copy(), project.extends, project.removed, project.params)
+        return existing
+
+    def _update(self, existing, name: str, tweaks, extends: list, removed: list, params: dict):
+        """Changes loaded project in place, resolved tweaks of it and its descendants are dropped"""
+        self._unlink(existing)
+        existing.name = name
+        existing.tweaks = tweaks if isinstance(tweaks, TweakSelection) else TweakSelection(tweaks)
+        existing.extends = _names(extends)
+        existing.removed = list(removed)
+        existing.params = _copy_params(params)
+        self._link(existing)
+        self.invalidate(existing.abs_path)
+        self.revision += 1
+
+    def remember_saved(self, project):
+        """Updates loaded copy of project written to store outside save_project (autosave thread).
+        Call on thread that owns handler, resolved tweaks of its descendants are dropped"""
+        return self._remember(project)
+
+    def save_project(self, project):
+        """Raises InheritanceError (nothing is saved) if project would extend itself or unknown project"""
+        self.check_bases(project)
+        self.store.save(project)
+        return self._remember(project)
+
+    def save_projects(self, projects: list):
+        """Saves projects at once, database stores do it in one transaction"""
+        for project in projects:
+            self.check_bases(project)
+        self.store.save_many(projects)
+        for project in projects:
+            self._remember(project)
+
+    def delete_project(self, project):
+        self.store.delete(project)
+        self._forget(project.abs_path)
+
+    def _forget(self, abs_path: str):
+        project = self._by_path.pop(abs_path, None)
+        if project:
+            self.projects.remove(project)
+            self._unlink(project)
+            self.invalidate(abs_path)
+            self.revision += 1
+        return project
+
+    def count(self, name_filter: str = "") -> int:
+        if self.store.paged:
+            return self.store.count(name_filter)
+        return len(self._listed(name_filter))
+
+    def page(self, offset: int, limit: int, name_filter: str = "") -> list:
+        """Projects sorted by name (case insensitive), name_filter keeps names containing it"""
+        if self.store.paged:
+            return self.store.page(offset, limit, name_filter)
+        return self._listed(name_filter)[offset:offset + limit]
+
+    def _listed(self, name_filter: str) -> list:
+        """Sorted loaded projects matching filter. Last listing is reused while projects do not change,
+        longer filter containing previous one only narrows it"""
+        name_filter = name_filter.lower()
+        listing = self._listing
+        if listing and listing[0] == self.revision and listing[1] == name_filter:
+            return listing[2]
+        if listing and listing[0] == self.revision and listing[1] in name_filter:
+            projects = listing[2]
+        else:
+            projects = sorted(self.projects, key=lambda project: project.name.lower())
+        if name_filter:
+            projects = [project for project in projects if name_filter in project.name.lower()]
+        self._listing = (self.revision, name_filter, projects)
         return projects
-    
-    def new_project(self, name: str, tweaks: list = None):
+
+    def projects_using(self, tweak_id: str) -> list:
+        """Projects with tweak selected (own or inherited), stores with tweak index answer without loading
+        every project. Inherited use is found through loaded descendants of projects selecting tweak"""
+        if self.store.tweak_index:
+            direct = [self._by_path.get(project.abs_path, project) for project in self.store.projects_using(tweak_id)]
+        else:
+            direct = [project for project in self.projects if tweak_id in project.tweaks]
+        found = {project.abs_path: project for project in direct}
+        for project in direct:
+            for descendant in self.descendants(project):
+                if descendant.abs_path not in found and tweak_id in self._resolved_or_empty(descendant):
+                    found[descendant.abs_path] = descendant
+        return list(found.values())
+
+    def _resolved_or_empty(self, project) -> TweakSelection:
+        try:
+            return self.resolved_tweaks(project)
+        except InheritanceError:
+            return TweakSelection()
+
+    def remove_project_file(self, path: str):
+        """Forgets project of deleted file, returns removed project or None"""
+        abs_path = os.path.abspath(path)
+        self.store.file_stats.pop(abs_path, None)
+        return self._forget(abs_path)
+
+    def reload_project_file(self, path: str):
+        """Parses one added or changed file and updates project list in place.
+        Returns (event, project): event is "added", "changed" or "removed" (file is not a project anymore), or (None, None)"""
+        abs_path = os.path.abspath(path)
+        try:
+            stat = os.stat(abs_path)
+        except FileNotFoundError:
+            project = self.remove_project_file(abs_path)
+            return ("removed", project) if project else (None, None)
+
+        self.store.file_stats[abs_path] = (stat.st_size, stat.st_mtime_ns)
+        entry = self.store.parse_project_file(abs_path, stat)
+        existing = self._by_path.get(abs_path)
+        if "name" not in entry:
+            if existing:
+                self._forget(abs_path)
+                return "removed", existing
+            return None, None
+
+        if existing:
+            self._update(existing, entry["name"], entry["tweaks"], entry.get("extends", []), entry.get("remove", []),
+                         entry.get("params"))
+            return "changed", existing
+
+        project = Project.from_entry(entry, abs_path)
+        self.add_projects([project])
+        return "added", project
+
+    def base_paths(self, project) -> list[str]:
+        return [self.store.project_path(name) for name in project.extends]
+
+    def _link(self, project):
+        for base_path in self.base_paths(project):
+            self._children.setdefault(base_path, set()).add(project.abs_path)
+
+    def _unlink(self, project):
+        for base_path in self.base_paths(project):
+            children = self._children.get(base_path)
+            if children is not None:
+                children.discard(project.abs_path)
+                if not children:
+                    del self._children[base_path]
+
+    def _descendant_paths(self, abs_path: str) -> list[str]:
+        """Paths of loaded projects extending project directly or through others, nearest first"""
+        seen = {abs_path}
+        found = []
+        queue = [abs_path]
+        for path in queue:
+            for child in self._children.get(path, ()):
+                if child not in seen:
+                    seen.add(child)
+                    found.append(child)
+                    queue.append(child)
+        return found
+
+    def descendants(self, project) -> list:
+        """Loaded projects whose resolved tweaks depend on project, they need rendering again when it changes"""
+        return [self._by_path[path] for path in self._descendant_paths(project.abs_path) if path in self._by_path]
+
+    def invalidate(self, abs_path: str) -> int:
+        """Drops resolved tweaks of project and its descendants only, returns count of dropped sets"""
+        dropped = 0
+        for path in [abs_path] + self._descendant_paths(abs_path):
+            dropped += self._resolved.pop(path, None) is not None
+            self._resolved_params.pop(path, None)
+        return dropped
+
+    def _base(self, abs_path: str):
+        """Base project, lazy handler reads bases that are not loaded from store"""
+        project = self._by_path.get(abs_path)
+        return project if project is not None else self.store.load(abs_path)
+
+    def check_bases(self, project):
+        """Raises InheritanceError if project extends itself through its bases or extends unknown project.
+        Bases are walked without resolved cache, project may differ from its loaded copy"""
+        checked = set()
+
+        def walk(current, chain: list[str]):
+            for base_path, name in zip(self.base_paths(current), current.extends):
+                if base_path in chain:
+                    raise _cycle_error(chain, base_path, name)
+                if base_path in checked:
+                    continue
+                base = project if base_path == project.abs_path else self._base(base_path)
+                if base is None:
+                    raise InheritanceError(f"Project {current.name} extends unknown project {name}")
+                walk(base, chain + [base_path])
+                checked.add(base_path)
+
+        walk(project, [project.abs_path])
+
+    def inherited_tweaks(self, project) -> TweakSelection:
+        """Resolved tweaks of bases joined in extends order"""
+        return self._inherited(project, [project.abs_path])
+
+    def _inherited(self, project, chain: list[str]) -> TweakSelection:
+        inherited = None
+        for base_path, name in zip(self.base_paths(project), project.extends):
+            if base_path in chain:
+                raise _cycle_error(chain, base_path, name)
+            base = self._base(base_path)
+            if base is None:
+                raise InheritanceError(f"Project {project.name} extends unknown project {name}")
+            tweaks = self._resolve(base, chain + [base_path])
+            if inherited is None:
+                inherited = tweaks.copy()
+            else:
+                for tweak_id in tweaks:
+                    inherited.add(tweak_id)
+        return inherited if inherited is not None else TweakSelection()
+
+    def resolved_tweaks(self, project) -> TweakSelection:
+        """Tweaks project ends up with: inherited ones without project.removed, then project.tweaks.
+        Sets of loaded projects are memoized until project or one of its bases changes, do not modify result.
+        Raises InheritanceError on cycles and unknown bases"""
+        return self._resolve(project, [project.abs_path])
+
+    def _resolve(self, project, chain: list[str]) -> TweakSelection:
+        if not project.extends:
+            return project.tweaks
+        loaded = self._by_path.get(project.abs_path) is project
+        if loaded:
+            resolved = self._resolved.get(project.abs_path)
+            if resolved is not None:
+                count("projects.resolve_hits")
+                return resolved
+
+        count("projects.resolved")
+        resolved = self._inherited(project, chain)
+        for tweak_id in project.removed:
+            resolved.discard(tweak_id)
+        for tweak_id in project.tweaks:
+            resolved.add(tweak_id)
+        if loaded:
+            self._resolved[project.abs_path] = resolved
+        return resolved
+
+    def resolved_params(self, project) -> dict:
+        """Parameter values of project: values of bases (later bases win), overridden by its own.
+        Memoized like resolved_tweaks, do not modify result"""
+        return self._resolve_params(project, [project.abs_path])
+
+    def _resolve_params(self, project, chain: list[str]) -> dict:
+        if not project.extends:
+            return project.params
+        loaded = self._by_path.get(project.abs_path) is project
+        if loaded:
+            resolved = self._resolved_params.get(project.abs_path)
+            if resolved is not None:
+                return resolved
+
+        resolved = {}
+        for base_path, name in zip(self.base_paths(project), project.extends):
+            if base_path in chain:
+                raise _cycle_error(chain, base_path, name)
+            base = self._base(base_path)
+            if base is None:
+                raise InheritanceError(f"Project {project.name} extends unknown project {name}")
+            for tweak_id, values in self._resolve_params(base, chain + [base_path]).items():
+                resolved[tweak_id] = {**resolved.get(tweak_id, {}), **values}
+        for tweak_id, values in project.params.items():
+            resolved[tweak_id] = {**resolved.get(tweak_id, {}), **values}
+        if loaded:
+            self._resolved_params[project.abs_path] = resolved
+        return resolved
+
+    def flattened(self, project):
+        """Copy of project with resolved tweaks and params and no bases, what renderers and worker processes get"""
+        return Project(project.name, self.resolved_tweaks(project).copy(), project.abs_path,
+                       params=self.resolved_params(project))
+
+    def set_param(self, project, tweak_id: str, name: str, value: str = None):
+        """Sets parameter value of tweak in project, None returns it to inherited (or default) value.
+        Raises ParamError when value does not fit parameter type"""
+        tweak = TWEAKS.get(tweak_id)
+        param = next((param for param in tweak.params if param.name == name), None) if tweak else None
+        if param is None:
+            raise ParamError(f"Tweak {tweak_id} has no parameter {name}")
+        values = project.params.setdefault(tweak_id, {})
+        if value is None:
+            values.pop(name, None)
+        else:
+            values[name] = param.validate(value)
+        if not values:
+            del project.params[tweak_id]
+        if self._by_path.get(project.abs_path) is project:
+            self.invalidate(project.abs_path)
+
+    def set_tweak(self, project, tweak_id: str, checked: bool) -> bool:
+        """Checks or unchecks tweak in resolved tweaks of project. Unchecked inherited tweak goes to
+        project.removed, checked one not inherited goes to project.tweaks. Returns False if nothing changed"""
+        inherited = self.inherited_tweaks(project) if project.extends else None
+        if checked:
+            changed = tweak_id in project.removed
+            if changed:
+                project.removed.remove(tweak_id)
+            if inherited is None or tweak_id not in inherited:
+                changed = project.tweaks.add(tweak_id) or changed
+        else:
+            changed = project.tweaks.remove(tweak_id)
+            if inherited is not None and tweak_id in inherited and tweak_id not in project.removed:
+                project.removed.append(tweak_id)
+                changed = True
+        if changed and self._by_path.get(project.abs_path) is project:
+            self.invalidate(project.abs_path)
+        return changed
+
+    def new_project(self, name: str, tweaks: list = None, extends: list = None, removed: list = None, params: dict = None):
+        """Creates (or overwrites) project with given name, returns it"""
         if tweaks is None:
             tweaks = []
-            
-        file_path = os.path.join(self.styles_folder_name, f"{name}.json")
-        project_data = {
-            "name": name,
-            "tweaks": tweaks
-        }
-        
+
+        project = Project(name, tweaks, self.store.project_path(name), extends, removed, params)
         try:
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(project_data, f, indent=4)
-            
-            self.projects.append(Project(name, tweaks, os.path.abspath(file_path)))
-            
+            return self.save_project(project)
+        except InheritanceError:
+            raise
         except Exception as e:
             raise Exception(f"Failed to create project: {e}")
 
 
+def _copy_params(params: dict) -> dict:
+    return {tweak_id: dict(values) for tweak_id, values in params.items()} if params else {}
+
+
+def _names(extends) -> list[str]:
+    """extends can be a single name in json"""
+    if isinstance(extends, str):
+        return [extends]
+    return list(extends) if extends else []
+
+
+def _cycle_error(chain: list[str], base_path: str, name: str) -> InheritanceError:
+    names = [os.path.splitext(os.path.basename(path))[0] for path in chain[chain.index(base_path):]]
+    return InheritanceError(f"Inheritance cycle: {' -> '.join(names + [name])}")
+
+
+def copy_projects(source: ProjectStore, target: ProjectStore, batch_size: int = BATCH_SIZE) -> int:
+    """Bulk import/export between stores, every batch is saved at once. Returns number of copied projects"""
+    copied = 0
+    for batch, _, _ in source.load_batches(batch_size):
+        if batch:
+            target.save_many([project.copy(target.project_path(project.name)) for project in batch])
+            copied += len(batch)
+    return copied
+
+
+def save_project_file(project, path: str = None):
+    """Writes project json atomically, path defaults to project.abs_path"""
+    data = json.dumps(project.to_json(), indent=4)
+    atomic_write(path or project.abs_path, data.encode("utf-8"))
+
+
 class Project:
-    def __init__(self, name: str = "", tweaks: list = None, abs_path: str = "") -> None:
+    """Project extending others (by name) gets their tweaks, then drops removed ones and adds own tweaks,
+    see ProjectHandler.resolved_tweaks. Project without extends simply lists all its tweaks"""
+    def __init__(self, name: str = "", tweaks: list = None, abs_path: str = "", extends: list = None,
+                 removed: list = None, params: dict = None) -> None:
         self.name = name
-        self.tweaks = tweaks if tweaks is not None else []
+        self.tweaks = tweaks if isinstance(tweaks, TweakSelection) else TweakSelection(tweaks)
         self.abs_path = abs_path
-    
+        # names of base projects
+        self.extends = _names(extends)
+        # inherited tweak ids turned off in this project
+        self.removed = list(removed) if removed else []
+        # tweak id -> {parameter name: value}, only values differing from tweak defaults are stored
+        self.params = _copy_params(params)
+
+    def copy(self, abs_path: str = None):
+        return Project(self.name, self.tweaks.copy(), abs_path or self.abs_path, self.extends, self.removed, self.params)
+
+    def to_json(self) -> dict:
+        data = {"name": self.name, "tweaks": self.tweaks.to_json()}
+        if self.extends:
+            data["extends"] = self.extends
+        if self.removed:
+            data["remove"] = self.removed
+        if self.params:
+            data["params"] = self.params
+        return data
+
     def from_json(self, data: dict, abs_path: str):
         return Project(
-            data.get("name", ""), 
-            data.get("tweaks", []), 
-            abs_path
-        )
\ No newline at end of file
+            data.get("name", ""),
+            data.get("tweaks", []),
+            abs_path,
+            data.get("extends", []),
+            data.get("remove", []),
+            data.get("params", {})
+        )
+
+    @staticmethod
+    def from_entry(entry: dict, abs_path: str):
+        """Project of projects index entry (see JsonDirectoryStore.parse_project_file)"""
+        return Project(entry["name"], entry["tweaks"], abs_path, entry.get("extends"), entry.get("remove"),
+                       entry.get("params"))
@@ -0,0 +1,48 @@
+from css import AtRule, Rule, GROUP_AT_RULES, parse_stylesheet
+from dom import Document
+from tracing import traced
+from tweaks import Tweak
+
+
+def _prunable(nodes):
+    """Rules whose selectors are matched against elements, keyframes and other at-rules are skipped"""
+    for node in nodes:
+        if isinstance(node, Rule):
+            yield node
+        elif isinstance(node, AtRule) and node.name in GROUP_AT_RULES and node.rules is not None:
+            yield from _prunable(node.rules)
+
+
+def find_dead_rules(css: str, document: Document) -> list[tuple[Rule, list[str]]]:
+    """(rule, its selectors matching nothing in snapshot) for every rule having such selectors"""
+    found = []
+    for rule in _prunable(parse_stylesheet(css)):
+        dead = [selector for selector in rule.selectors if not document.matches_any(selector)]
+        if dead:
+            found.append((rule, dead))
+    return found
+
+
+def tweak_dead_rules(tweak: Tweak, document: Document) -> list[tuple[Rule, list[str]]]:
+    return find_dead_rules(tweak.css(), document)
+
+
+def _prune_nodes(nodes: list, document: Document) -> list:
+    result = []
+    for node in nodes:
+        if isinstance(node, Rule):
+            node.selectors = [selector for selector in node.selectors if document.matches_any(selector)]
+            if not node.selectors:
+                continue
+        elif isinstance(node, AtRule) and node.name in GROUP_AT_RULES and node.rules is not None:
+            node.rules = _prune_nodes(node.rules, document)
+            if not node.rules:
+                continue
+        result.append(node)
+    return result
+
+
+@traced("css.prune")
+def prune_css(css: str, document: Document) -> str:
+    """Drops selectors matching nothing in snapshot and rules left without selectors. Output is minified"""
+    return "".join(node.to_css() for node in _prune_nodes(parse_stylesheet(css), document))
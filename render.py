@@ -0,0 +1,148 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+from analysis import check_project_cost
+from css import optimize_css
+from dom import Document
+from fileutil import atomic_write
+from pruning import prune_css
+from tracing import traced, count
+from tweaks import TWEAKS, TweakRegistry, TweaksHandler
+
+
+def get_css_path(original: str) -> str:
+    return ".".join(original.split(".")[:-1])+".css"
+
+
+class RenderCache:
+    """LRU cache of rendered css keyed by fingerprint of ordered tweak ids and catalog version.
+    Catalog version changes with every tweak (re)registration or content change, so stale css is never returned"""
+    def __init__(self, max_entries: int = 512, max_bytes: int = 32 * 1024 * 1024, registry: TweakRegistry = None) -> None:
+        self.registry = registry if registry is not None else TWEAKS
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: OrderedDict[tuple, str] = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(tweak_ids, params: dict = None) -> bytes:
+        digest = hashlib.blake2b(digest_size=16)
+        for tweak_id in tweak_ids:
+            digest.update(tweak_id.encode("utf-8"))
+            digest.update(b"\0")
+            values = params.get(tweak_id) if params else None
+            if values:
+                digest.update(json.dumps(values, sort_keys=True).encode("utf-8"))
+                digest.update(b"\0")
+        return digest.digest()
+
+    def key(self, tweak_ids, optimize: bool, snapshot: Document = None, params: dict = None) -> tuple:
+        return (self.registry.version, optimize, snapshot.digest if snapshot else None, self.fingerprint(tweak_ids, params))
+
+    def get(self, key: tuple) -> str | None:
+        with self.lock:
+            css = self.entries.get(key)
+            if css is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return css
+
+    def put(self, key: tuple, css: str):
+        if len(css) > self.max_bytes:
+            return
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self.entries[key] = css
+            self.size += len(css)
+            while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+
+RENDER_CACHE = RenderCache()
+
+
+@traced("render.render_css")
+def render_css(tweak_ids: list[str], optimize: bool = False, max_cost: int = None, cache: RenderCache = RENDER_CACHE,
+               snapshot: Document = None, params: dict = None) -> str:
+    """Joins content of tweaks, with optimize=True output is minified and duplicate rules are merged.
+    If max_cost is set, SelectorCostError is raised when selectors of tweaks cost more.
+    With snapshot, selectors matching nothing in that DOM snapshot are dropped.
+    params maps tweak id to its parameter values, tweaks without values use defaults.
+    Results are memoized in cache, pass cache=None to always render"""
+    if max_cost is not None:
+        check_project_cost(tweak_ids, max_cost)
+    
+    key = None
+    if cache is not None:
+        key = cache.key(tweak_ids, optimize, snapshot, params)
+        css = cache.get(key)
+        if css is not None:
+            count("render.cache_hits")
+            return css
+    
+    css = TweaksHandler(tweak_ids).get_css_content(params)
+    if snapshot is not None:
+        css = prune_css(css, snapshot)
+    if optimize:
+        css = optimize_css(css)
+    if key is not None:
+        cache.put(key, css)
+    return css
+
+
+class CssWriter:
+    """Writes rendered css only when its content hash differs from the file on disk"""
+    def __init__(self) -> None:
+        # path -> (sha256, mtime_ns, size) of the last written or read file
+        self.digests: dict[str, tuple[str, int, int]] = {}
+
+    def _stored_digest(self, path: str) -> str | None:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self.digests.pop(path, None)
+            return None
+        
+        cached = self.digests.get(path)
+        if cached and cached[1:] == (stat.st_mtime_ns, stat.st_size):
+            return cached[0]
+        
+        with open(path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        self.digests[path] = (digest, stat.st_mtime_ns, stat.st_size)
+        return digest
+
+    @traced("render.write_css")
+    def write(self, path: str, css: str) -> bool:
+        """Returns True if file was written, False if it already had same content"""
+        data = css.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        if self._stored_digest(path) == digest:
+            count("render.unchanged")
+            return False
+        
+        atomic_write(path, data)
+        count("render.bytes_written", len(data))
+        stat = os.stat(path)
+        self.digests[path] = (digest, stat.st_mtime_ns, stat.st_size)
+        return True
+
+    def render(self, project_path: str, tweak_ids: list[str], optimize: bool = False, max_cost: int = None,
+               snapshot: Document = None, params: dict = None) -> bool:
+        return self.write(get_css_path(project_path), render_css(tweak_ids, optimize, max_cost, snapshot=snapshot, params=params))
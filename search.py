@@ -0,0 +1,220 @@
+import re
+from array import array
+from bisect import bisect_left
+
+from tweaks import TWEAKS, TweakRegistry
+
+
+_WORD = re.compile(r"[^\W_]+")
+# terms of this length and longer also match tokens with one typo (see is_fuzzy)
+FUZZY_MIN_LENGTH = 4
+
+
+def tokenize(text: str) -> list[str]:
+    return _WORD.findall(text.lower())
+
+
+def _prefix_end(prefix: str) -> str:
+    """Smallest string greater than every string starting with prefix"""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def is_fuzzy(term: str) -> bool:
+    """Long enough terms also match with typo, numbers are matched by prefix only"""
+    return len(term) >= FUZZY_MIN_LENGTH and not term.isdigit()
+
+
+def fuzzy_prefix_match(term: str, token: str) -> bool:
+    """True if some prefix of token differs from term by at most one substitution, insertion,
+    deletion or swap of neighbour characters. First character has to match"""
+    if token.startswith(term):
+        return True
+    if not token or token[0] != term[0]:
+        return False
+    # first position where they differ, everything before is equal
+    i = 1
+    limit = min(len(term), len(token))
+    while i < limit and term[i] == token[i]:
+        i += 1
+    rest = term[i + 1:]
+    return (
+        token.startswith(rest, i + 1)                                     # substitution
+        or token.startswith(term[i:], i + 1)                              # extra character in token
+        or token.startswith(rest, i)                                      # character missing in token
+        or (i + 1 < len(term) and token.startswith(term[i + 1] + term[i] + term[i + 2:], i))  # swap
+    )
+
+
+class SearchIndex:
+    """Inverted index of id, name and description tokens of catalog.
+
+    Postings are sorted arrays of ordinals. Term matches token when token starts with it,
+    fuzzy terms also match with one typo (see is_fuzzy and fuzzy_prefix_match).
+    Result of query is ordinals of tweaks matching every term, in catalog order.
+    """
+    def __init__(self, registry: TweakRegistry = None) -> None:
+        self.registry = registry if registry is not None else TWEAKS
+        self.tokens: list[str] = []
+        self.postings: dict[str, array] = {}
+        # ordinal -> " token token ..." for checking single tweak without index
+        self.documents: list[str] = []
+        # matches of short prefixes, they cover large part of vocabulary
+        self._prefix_cache: dict[str, list[int]] = {}
+        self.version = None
+        self.build()
+
+    def build(self):
+        postings: dict[str, list[int]] = {}
+        documents = []
+        for ordinal, tweak in enumerate(self.registry):
+            tokens = dict.fromkeys(tokenize(tweak.id) + tokenize(tweak.name) + tokenize(tweak.description))
+            for token in tokens:
+                postings.setdefault(token, []).append(ordinal)
+            documents.append(" " + " ".join(tokens))
+        self.postings = {token: array("I", ordinals) for token, ordinals in postings.items()}
+        self.tokens = sorted(postings)
+        self.documents = documents
+        self._prefix_cache = {}
+        self.version = self.registry.version
+
+    def _token_range(self, prefix: str) -> tuple[int, int]:
+        return bisect_left(self.tokens, prefix), bisect_left(self.tokens, _prefix_end(prefix))
+
+    def _union(self, tokens: list[str]):
+        """Sorted ordinals of tweaks having any of tokens"""
+        if len(tokens) == 1:
+            return self.postings[tokens[0]]
+        result = set()
+        for token in tokens:
+            result.update(self.postings[token])
+        return sorted(result)
+
+    def matching_tokens(self, term: str) -> list[str]:
+        start, end = self._token_range(term)
+        tokens = self.tokens[start:end]
+        if is_fuzzy(term):
+            first_start, first_end = self._token_range(term[0])
+            tokens += [
+                token for token in self.tokens[first_start:first_end]
+                if len(token) >= len(term) - 1 and not token.startswith(term) and fuzzy_prefix_match(term, token)
+            ]
+        return tokens
+
+    def term_matches(self, term: str):
+        """Sorted ordinals of tweaks having token matched by term"""
+        if len(term) > 2:
+            return self._union(self.matching_tokens(term))
+        cached = self._prefix_cache.get(term)
+        if cached is None:
+            cached = self._prefix_cache[term] = self._union(self.matching_tokens(term))
+        return cached
+
+    def document_matches(self, ordinal: int, term: str) -> bool:
+        document = self.documents[ordinal]
+        if " " + term in document:
+            return True
+        if not is_fuzzy(term):
+            return False
+        return any(fuzzy_prefix_match(term, token) for token in document.split())
+
+    def search(self, query: str) -> list[int]:
+        terms = tokenize(query)
+        if not terms:
+            return list(range(len(self.registry)))
+        matches = sorted((self.term_matches(term) for term in set(terms)), key=len)
+        result = list(matches[0])
+        for other in matches[1:]:
+            if not result:
+                break
+            result = intersect(result, other, len(self.registry))
+        return result
+
+
+def intersect(result: list[int], matches, total: int) -> list[int]:
+    """Sorted ordinals present in both sorted sequences, total is catalog size"""
+    if len(result) == total:
+        return list(matches)
+    if len(matches) == total:
+        return result
+    if len(matches) < len(result):
+        result, matches = matches, result
+    matches = set(matches)
+    return [ordinal for ordinal in result if ordinal in matches]
+
+
+class IncrementalSearch:
+    """Search-as-you-type session: when query only gets longer, previous result is narrowed
+    instead of searching whole index again. Results of recent queries are kept for backspace"""
+    HISTORY_SIZE = 32
+    # below this many candidates checking them one by one is cheaper than index lookup
+    SCAN_LIMIT = 256
+
+    def __init__(self, index: SearchIndex) -> None:
+        self.index = index
+        self.reset()
+
+    def reset(self):
+        self.version = self.index.version
+        self.query_terms: list[str] = []
+        self.result: list[int] = list(range(len(self.index.registry)))
+        self.history: dict[tuple, list[int]] = {}
+
+    @staticmethod
+    def _narrows(old: list[str], new: list[str]) -> bool:
+        """New terms can only match subset of what old terms matched"""
+        if len(new) < len(old):
+            return False
+        for old_term, new_term in zip(old, new):
+            if not new_term.startswith(old_term):
+                return False
+            # fuzzy matching switched on can add matches
+            if is_fuzzy(old_term) != is_fuzzy(new_term):
+                return False
+        return True
+
+    def update(self, query: str) -> list[int]:
+        """Returns ordinals matching query, call on every keystroke"""
+        if self.version != self.index.version:
+            self.reset()
+        terms = tokenize(query)
+        key = tuple(terms)
+        if terms == self.query_terms:
+            return self.result
+
+        cached = self.history.get(key)
+        if cached is not None:
+            result = cached
+        elif not terms:
+            result = list(range(len(self.index.registry)))
+        elif self.query_terms and self._narrows(self.query_terms, terms):
+            result = self.result
+            changed = [term for i, term in enumerate(terms) if i >= len(self.query_terms) or term != self.query_terms[i]]
+            for term in changed:
+                if len(result) <= self.SCAN_LIMIT:
+                    result = [ordinal for ordinal in result if self.index.document_matches(ordinal, term)]
+                else:
+                    result = intersect(result, self.index.term_matches(term), len(self.index.registry))
+        else:
+            result = self.index.search(query)
+
+        self.query_terms = terms
+        self.result = result
+        self.history.pop(key, None)
+        self.history[key] = result
+        if len(self.history) > self.HISTORY_SIZE:
+            del self.history[next(iter(self.history))]
+        return result
+
+
+_indexes: dict[int, SearchIndex] = {}
+
+
+def get_search_index(registry: TweakRegistry = None) -> SearchIndex:
+    """Returns index of registry, it is rebuilt only after catalog has changed"""
+    registry = registry if registry is not None else TWEAKS
+    index = _indexes.get(id(registry))
+    if index is None or index.registry is not registry:
+        index = _indexes[id(registry)] = SearchIndex(registry)
+    elif index.version != registry.version:
+        index.build()
+    return index
@@ -0,0 +1,127 @@
+from array import array
+
+from tweaks import TWEAKS, TweakRegistry
+
+
+class TweakSelection:
+    """Ordered set of tweak ids stored as catalog ordinals.
+
+    Membership is a bitmask, order is an array of ordinals. Removing only clears the bit,
+    stale array entries are skipped on iteration and dropped when array gets twice bigger
+    than selection. Ids unknown to the catalog are kept (after known ones) so saving
+    a project never loses them.
+    """
+    __slots__ = ("registry", "mask", "_order", "_count", "_unknown")
+
+    def __init__(self, tweak_ids=None, registry: TweakRegistry = None) -> None:
+        self.registry = registry if registry is not None else TWEAKS
+        self.mask = 0
+        self._order = array("I")
+        self._count = 0
+        self._unknown: list[str] = []
+        if tweak_ids:
+            for tweak_id in tweak_ids:
+                self.add(tweak_id)
+
+    def add(self, tweak_id: str) -> bool:
+        """Returns False if tweak was already selected"""
+        ordinal = self.registry.ordinal(tweak_id)
+        if ordinal is None:
+            if tweak_id in self._unknown:
+                return False
+            self._unknown.append(tweak_id)
+            return True
+
+        bit = 1 << ordinal
+        if self.mask & bit:
+            return False
+        self.mask |= bit
+        self._order.append(ordinal)
+        self._count += 1
+        if len(self._order) > 2 * self._count + 8:
+            self._compact()
+        return True
+
+    def remove(self, tweak_id: str) -> bool:
+        """Returns False if tweak was not selected"""
+        ordinal = self.registry.ordinal(tweak_id)
+        if ordinal is None:
+            if tweak_id not in self._unknown:
+                return False
+            self._unknown.remove(tweak_id)
+            return True
+
+        bit = 1 << ordinal
+        if not self.mask & bit:
+            return False
+        self.mask &= ~bit
+        self._count -= 1
+        return True
+
+    def discard(self, tweak_id: str):
+        self.remove(tweak_id)
+
+    def _ordinals(self) -> list[int]:
+        """Selected ordinals in selection order, when tweak was re-added its last position counts"""
+        if len(self._order) == self._count:
+            return list(self._order)
+        seen = 0
+        result = []
+        for ordinal in reversed(self._order):
+            bit = 1 << ordinal
+            if self.mask & bit and not seen & bit:
+                seen |= bit
+                result.append(ordinal)
+        result.reverse()
+        return result
+
+    def _compact(self):
+        self._order = array("I", self._ordinals())
+
+    def __contains__(self, tweak_id: str) -> bool:
+        ordinal = self.registry.ordinal(tweak_id)
+        if ordinal is None:
+            return tweak_id in self._unknown
+        return bool(self.mask >> ordinal & 1)
+
+    def __iter__(self):
+        for ordinal in self._ordinals():
+            yield self.registry.by_ordinal(ordinal).id
+        yield from self._unknown
+
+    def __len__(self) -> int:
+        return self._count + len(self._unknown)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, TweakSelection):
+            return self.ids() == other.ids()
+        if isinstance(other, list):
+            return self.ids() == other
+        return NotImplemented
+
+    # mutable, so equal selections must not end up as dict keys or set members
+    __hash__ = None
+
+    def __reduce__(self):
+        # registry is not pickled, selection is rebuilt against catalog of receiving process
+        return (TweakSelection, (self.ids(),))
+
+    def __repr__(self) -> str:
+        return f"TweakSelection({self.ids()!r})"
+
+    def ids(self) -> list[str]:
+        return list(self)
+
+    def copy(self) -> "TweakSelection":
+        if len(self._order) != self._count:
+            # copies of resolved selections are made repeatedly, drop stale entries once
+            self._compact()
+        selection = TweakSelection(registry=self.registry)
+        selection.mask = self.mask
+        selection._order = array("I", self._order)
+        selection._count = self._count
+        selection._unknown = list(self._unknown)
+        return selection
+
+    def to_json(self) -> list[str]:
+        return self.ids()
@@ -0,0 +1,180 @@
+import os
+import json
+import sqlite3
+import threading
+
+from projects import BATCH_SIZE, Project, ProjectStore
+from tracing import traced
+
+
+SCHEMA_VERSION = 3
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    tweaks TEXT NOT NULL,
+    extends TEXT NOT NULL DEFAULT '[]',
+    removed TEXT NOT NULL DEFAULT '[]',
+    params TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS projects_name_nocase ON projects (name COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS project_tweaks (
+    project_id INTEGER NOT NULL REFERENCES projects (id) ON DELETE CASCADE,
+    tweak_id TEXT NOT NULL,
+    PRIMARY KEY (project_id, tweak_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS project_tweaks_tweak ON project_tweaks (tweak_id);
+"""
+# statements upgrading database of version N to N + 1
+MIGRATIONS = {
+    1: [
+        "ALTER TABLE projects ADD COLUMN extends TEXT NOT NULL DEFAULT '[]'",
+        "ALTER TABLE projects ADD COLUMN removed TEXT NOT NULL DEFAULT '[]'",
+    ],
+    2: [
+        "ALTER TABLE projects ADD COLUMN params TEXT NOT NULL DEFAULT '{}'",
+    ],
+}
+PROJECT_COLUMNS = "name, tweaks, extends, removed, params"
+# executescript would commit on its own, migration runs statements one by one in single transaction
+SCHEMA_STATEMENTS = [statement.strip() for statement in SCHEMA.split(";") if statement.strip()]
+
+
+class SqliteProjectStore(ProjectStore):
+    """All projects in one SQLite file.
+
+    Ordered tweak list is kept as json in projects table, project_tweaks duplicates it
+    as rows indexed by tweak id, so projects_using does not read every project.
+    Only own tweaks of project are indexed, inherited ones are found by ProjectHandler.
+    Projects have virtual paths <folder>/<name>.project, their css is rendered to <folder>/<name>.css
+    """
+    PROJECT_EXTENSION = ".project"
+    paged = True
+    tweak_index = True
+
+    def __init__(self, db_path: str, folder: str = "styles") -> None:
+        super().__init__(folder)
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        self.db_path = db_path
+        # connection is shared with loader and autosave threads, every access holds the lock
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self._migrate()
+
+    def _migrate(self):
+        """Upgrades schema in one transaction, failed migration leaves database as it was"""
+        with self.lock, self.connection:
+            version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+            if version > SCHEMA_VERSION:
+                raise ValueError(f"Project database {self.db_path} has newer schema version {version}")
+            # sqlite3 does not begin transaction before DDL itself, commit or rollback is done by with block
+            self.connection.execute("BEGIN")
+            if version:
+                for old in range(version, SCHEMA_VERSION):
+                    for statement in MIGRATIONS[old]:
+                        self.connection.execute(statement)
+            for statement in SCHEMA_STATEMENTS:
+                self.connection.execute(statement)
+            self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    def project_path(self, name: str) -> str:
+        return os.path.abspath(os.path.join(self.folder, name + self.PROJECT_EXTENSION))
+
+    def _name_of(self, abs_path: str) -> str | None:
+        folder, file_name = os.path.split(abs_path)
+        if folder != os.path.abspath(self.folder) or not file_name.endswith(self.PROJECT_EXTENSION):
+            return None
+        return file_name[:-len(self.PROJECT_EXTENSION)]
+
+    def _project(self, name: str, tweaks: str, extends: str, removed: str, params: str):
+        return Project(name, json.loads(tweaks), self.project_path(name), json.loads(extends), json.loads(removed),
+                       json.loads(params))
+
+    def _query(self, sql: str, params: tuple = ()) -> list:
+        with self.lock:
+            return self.connection.execute(sql, params).fetchall()
+
+    def load_batches(self, batch_size: int = BATCH_SIZE):
+        """Projects come in id order, every batch is separate query so writes can run between them"""
+        total = self._query("SELECT count(*) FROM projects")[0][0]
+        done = 0
+        last_id = -1
+        while True:
+            rows = self._query(
+                f"SELECT id, {PROJECT_COLUMNS} FROM projects WHERE id > ? ORDER BY id LIMIT ?", (last_id, batch_size)
+            )
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            done += len(rows)
+            yield [self._project(*row[1:]) for row in rows], done, max(done, total)
+        if done == 0:
+            yield [], 0, 0
+
+    def load(self, abs_path: str):
+        name = self._name_of(abs_path)
+        if name is None:
+            return None
+        rows = self._query(f"SELECT {PROJECT_COLUMNS} FROM projects WHERE name = ?", (name,))
+        return self._project(*rows[0]) if rows else None
+
+    def _save(self, project):
+        tweak_ids = project.tweaks.ids()
+        self.connection.execute(
+            f"INSERT INTO projects ({PROJECT_COLUMNS}) VALUES (?, ?, ?, ?, ?) ON CONFLICT (name) DO UPDATE SET "
+            "tweaks = excluded.tweaks, extends = excluded.extends, removed = excluded.removed, params = excluded.params",
+            (project.name, json.dumps(tweak_ids), json.dumps(project.extends), json.dumps(project.removed),
+             json.dumps(project.params))
+        )
+        project_id = self.connection.execute("SELECT id FROM projects WHERE name = ?", (project.name,)).fetchone()[0]
+        self.connection.execute("DELETE FROM project_tweaks WHERE project_id = ?", (project_id,))
+        self.connection.executemany(
+            "INSERT OR IGNORE INTO project_tweaks (project_id, tweak_id) VALUES (?, ?)",
+            ((project_id, tweak_id) for tweak_id in tweak_ids)
+        )
+
+    def save(self, project):
+        self.save_many([project])
+
+    @traced("projects.sqlite_save_many")
+    def save_many(self, projects: list):
+        """Saves every project or none of them"""
+        with self.lock, self.connection:
+            for project in projects:
+                self._save(project)
+
+    def delete(self, project):
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM projects WHERE name = ?", (project.name,))
+
+    @staticmethod
+    def _filter_clause(name_filter: str) -> tuple[str, tuple]:
+        if not name_filter:
+            return "", ()
+        return " WHERE instr(lower(name), ?) > 0", (name_filter.lower(),)
+
+    def count(self, name_filter: str = "") -> int:
+        where, params = self._filter_clause(name_filter)
+        return self._query("SELECT count(*) FROM projects" + where, params)[0][0]
+
+    def page(self, offset: int, limit: int, name_filter: str = "") -> list:
+        where, params = self._filter_clause(name_filter)
+        rows = self._query(
+            f"SELECT {PROJECT_COLUMNS} FROM projects" + where + " ORDER BY name COLLATE NOCASE, id LIMIT ? OFFSET ?",
+            params + (limit, offset)
+        )
+        return [self._project(*row) for row in rows]
+
+    def projects_using(self, tweak_id: str) -> list:
+        rows = self._query(
+            "SELECT p.name, p.tweaks, p.extends, p.removed, p.params FROM project_tweaks t JOIN projects p ON p.id = t.project_id "
+            "WHERE t.tweak_id = ? ORDER BY p.name COLLATE NOCASE",
+            (tweak_id,)
+        )
+        return [self._project(*row) for row in rows]
@@ -0,0 +1,94 @@
+import re
+
+
+PLACEHOLDER = re.compile(r"\{\{\s*([A-Za-z_][\w-]*)\s*\}\}")
+_NUMBER = r"[+-]?(?:\d+\.?\d*|\.\d+)"
+PARAM_TYPES = {
+    "number": re.compile(_NUMBER),
+    "percentage": re.compile(_NUMBER + "%"),
+    "length": re.compile(_NUMBER + r"(?:px|em|rem|%|vh|vw|vmin|vmax|ch|ex|pt|cm|mm|in)|[+-]?0"),
+    "color": re.compile(r"#(?:[0-9a-fA-F]{3,4}|[0-9a-fA-F]{6}|[0-9a-fA-F]{8})|(?:rgb|rgba|hsl|hsla)\([\d\s.,%/+-]*\)|[a-zA-Z]+"),
+    "text": re.compile(r"[^\n]*"),
+}
+# values end up inside declarations, these would let them escape
+FORBIDDEN = re.compile(r"[;{}<>\\\n]|/\*|\*/")
+
+
+class ParamError(ValueError):
+    pass
+
+
+class TweakParam:
+    """Typed tweak parameter, value is css text put in place of {{name}} in tweak content"""
+    __slots__ = ("name", "type", "default", "label", "_valid")
+    # distinct valid values remembered per parameter, projects tend to reuse few of them
+    VALID_CACHE_SIZE = 1024
+
+    def __init__(self, name: str, type: str, default: str, label: str = None) -> None:
+        if type not in PARAM_TYPES:
+            raise ParamError(f"Unknown type {type!r} of parameter {name}")
+        self.name = name
+        self.type = type
+        self.label = label or name
+        # value -> css text of values that passed validation
+        self._valid: dict = {}
+        self.default = None
+        self.default = self.validate(default)
+
+    def validate(self, value) -> str:
+        """Returns value as css text, raises ParamError if it is not of parameter type"""
+        if not isinstance(value, (str, int, float)):
+            raise ParamError(f"Invalid {self.type} value {value!r} for parameter {self.name}")
+        text = self._valid.get(value)
+        if text is not None:
+            return text
+        text = str(value).strip()
+        if FORBIDDEN.search(text) or not PARAM_TYPES[self.type].fullmatch(text):
+            raise ParamError(f"Invalid {self.type} value {value!r} for parameter {self.name}")
+        if len(self._valid) >= self.VALID_CACHE_SIZE:
+            self._valid.clear()
+        self._valid[value] = text
+        return text
+
+    def to_json(self) -> dict:
+        data = {"name": self.name, "type": self.type, "default": self.default}
+        if self.label != self.name:
+            data["label"] = self.label
+        return data
+
+    @staticmethod
+    def from_json(data: dict):
+        return TweakParam(data["name"], data.get("type", "text"), data["default"], data.get("label"))
+
+
+class Template:
+    """Tweak content compiled once into printf format and parameter of every placeholder,
+    so rendering is one % operation"""
+    __slots__ = ("params", "format", "slots", "default_css")
+
+    def __init__(self, content: str, params: list[TweakParam]) -> None:
+        self.params = params
+        index = {param.name: i for i, param in enumerate(params)}
+        parts = []
+        slots: list[TweakParam] = []
+        position = 0
+        for match in PLACEHOLDER.finditer(content):
+            name = match.group(1)
+            if name not in index:
+                raise ParamError(f"Unknown parameter {{{{{name}}}}} in tweak content")
+            parts.append(content[position:match.start()].replace("%", "%%"))
+            parts.append("%s")
+            slots.append(params[index[name]])
+            position = match.end()
+        parts.append(content[position:].replace("%", "%%"))
+        self.format = "".join(parts)
+        self.slots = tuple(slots)
+        self.default_css = self.format % tuple(param.default for param in self.slots)
+
+    def render(self, values: dict = None) -> str:
+        """Missing values are defaults, unknown names are ignored. Raises ParamError on invalid value"""
+        if not values:
+            return self.default_css
+        return self.format % tuple(
+            param.validate(values[param.name]) if param.name in values else param.default for param in self.slots
+        )
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# modules live in repository root, tests run without installing the app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
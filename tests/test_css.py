@@ -0,0 +1,29 @@
+import pytest
+
+from css import optimize_css
+
+
+@pytest.mark.parametrize("text", [
+    "a{top:0}b{inset:5px}a{top:1px}",
+    "a{inset:0}b{left:5px}a{inset:1px}",
+    "a{line-height:1}b{font:12px sans-serif}a{line-height:2}",
+    "a{row-gap:1px}b{gap:2px}a{row-gap:3px}",
+    "a{align-items:start}b{place-items:center}a{align-items:end}",
+    "a{justify-self:start}b{place-self:center}a{justify-self:end}",
+    "a{margin-top:0}b{margin-block:5px}a{margin-top:1px}",
+    "a{color:red}b{all:unset}a{color:blue}",
+    "a{color:red}b{-webkit-unknown-thing:1}a{color:blue}",
+    "a{-webkit-unknown-thing:1}b{color:red}a{-webkit-unknown-thing:2}",
+])
+def test_overlapping_rule_between_blocks_merge(text):
+    assert optimize_css(text) == text
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("a{margin-top:0}b{margin-left:5px}a{margin-top:1px}", "a{margin-top:1px}b{margin-left:5px}"),
+    ("a{top:0}b{bottom:5px}a{top:1px}", "a{top:1px}b{bottom:5px}"),
+    ("a{color:red}b{font:12px serif}a{color:blue}", "a{color:blue}b{font:12px serif}"),
+    ("a{--x:1}b{--y:2}a{--x:3}", "a{--x:3}b{--y:2}"),
+])
+def test_disjoint_rule_between_merges(text, expected):
+    assert optimize_css(text) == expected
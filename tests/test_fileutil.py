@@ -0,0 +1,47 @@
+import os
+import stat
+import sys
+
+import pytest
+
+from fileutil import UMASK, atomic_write
+from jsonc import patch_file
+
+
+def mode_of(path: str) -> int:
+    return stat.S_IMODE(os.lstat(path).st_mode)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="symlinks need privileges on Windows")
+def test_symlinked_settings_keep_link(tmp_path):
+    target = tmp_path / "real-settings.json"
+    target.write_text('{\n    // comment\n    "a": 1\n}\n', encoding="utf-8")
+    link = tmp_path / "settings.json"
+    link.symlink_to(target)
+
+    assert patch_file(str(link), "b", 2)
+
+    assert link.is_symlink()
+    assert '"b": 2' in target.read_text(encoding="utf-8")
+    assert not [name for name in os.listdir(tmp_path) if name.startswith(".tmp-")]
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="posix modes")
+def test_existing_mode_is_kept(tmp_path):
+    path = tmp_path / "project-0.css"
+    path.write_bytes(b"old")
+    os.chmod(path, 0o644)
+
+    atomic_write(str(path), b"new")
+
+    assert path.read_bytes() == b"new"
+    assert mode_of(str(path)) == 0o644
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="posix modes")
+def test_new_file_gets_default_mode(tmp_path):
+    path = tmp_path / "project-1.json"
+
+    atomic_write(str(path), b"{}")
+
+    assert mode_of(str(path)) == 0o666 & ~UMASK
@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+from jsonc import JsoncError, patch_file, set_member, tokenize
+
+
+KEY = "custom-ui-style.external.imports"
+VALUE = ["file:///home/user/styles/project.css"]
+MEMBER = f'"{KEY}": ["file:///home/user/styles/project.css"]'
+
+
+def loads(text: str):
+    """Parses JSONC the way VSCode does: comments and trailing commas are allowed"""
+    tokens = [(kind, text[start:end]) for kind, start, end in tokenize(text)
+              if kind not in ("space", "line_comment", "block_comment")]
+    kept = [value for i, (kind, value) in enumerate(tokens)
+            if not (value == "," and i + 1 < len(tokens) and tokens[i + 1][1] in "}]")]
+    return json.loads("".join(kept))
+
+
+def test_insert_keeps_comments():
+    text = '{\n    // theme\n    "workbench.colorTheme": "Dark", /* size */\n    "editor.fontSize": 14\n}\n'
+    patched = set_member(text, KEY, VALUE)
+    assert patched == ('{\n    // theme\n    "workbench.colorTheme": "Dark", /* size */\n    "editor.fontSize": 14,\n'
+                       f'    {MEMBER}\n}}\n')
+    assert loads(patched) == {"workbench.colorTheme": "Dark", "editor.fontSize": 14, KEY: VALUE}
+
+
+def test_insert_after_trailing_comma_keeps_it():
+    patched = set_member('{\n    "editor.fontSize": 14,\n}\n', KEY, VALUE)
+    assert patched == f'{{\n    "editor.fontSize": 14,\n    {MEMBER},\n}}\n'
+    assert loads(patched)[KEY] == VALUE
+
+
+def test_insert_without_trailing_comma_adds_separator():
+    patched = set_member('{\n  "editor.fontSize": 14\n}', KEY, VALUE)
+    assert patched == f'{{\n  "editor.fontSize": 14,\n  {MEMBER}\n}}'
+
+
+def test_existing_key_is_replaced_in_place():
+    text = f'{{\n    "{KEY}": ["file:///old.css"], // managed by tweaks\n    "editor.fontSize": 14\n}}\n'
+    patched = set_member(text, KEY, VALUE)
+    assert patched == f'{{\n    {MEMBER}, // managed by tweaks\n    "editor.fontSize": 14\n}}\n'
+    assert set_member(patched, KEY, VALUE) is patched
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("{}", f"{{\n    {MEMBER}\n}}"),
+    ("{\n}\n", f"{{\n    {MEMBER}\n}}\n"),
+    ("{\n    // nothing yet\n}\n", f"{{\n    {MEMBER}\n    // nothing yet\n}}\n"),
+])
+def test_empty_object(text, expected):
+    assert set_member(text, KEY, VALUE) == expected
+
+
+def test_comment_markers_inside_strings_are_not_comments():
+    text = '{\n    "http.proxy": "http://proxy//path",\n    "files.exclude": {"/*": true},\n    "b": "/* no */"\n}\n'
+    patched = set_member(text, KEY, VALUE)
+    assert patched == text[:-3] + f',\n    {MEMBER}\n}}\n'
+    assert loads(patched)["files.exclude"] == {"/*": True}
+
+
+def test_not_an_object_is_rejected():
+    with pytest.raises(JsoncError):
+        set_member("[1, 2]", KEY, VALUE)
+    with pytest.raises(JsoncError):
+        set_member('{"a": 1', KEY, VALUE)
+
+
+def test_patch_file_keeps_bom(tmp_path):
+    path = tmp_path / "settings.json"
+    path.write_bytes(b'\xef\xbb\xbf{\n    // comment\n    "a": 1\n}\n')
+
+    assert patch_file(str(path), KEY, VALUE)
+    raw = path.read_bytes()
+    assert raw.startswith(b"\xef\xbb\xbf") and raw.count(b"\xef\xbb\xbf") == 1
+    assert loads(raw.decode("utf-8-sig")) == {"a": 1, KEY: VALUE}
+    assert not patch_file(str(path), KEY, VALUE)
+    assert path.read_bytes() == raw
+
+
+def test_patch_file_without_bom_and_empty_file(tmp_path):
+    path = tmp_path / "settings.json"
+    path.write_bytes(b"")
+
+    assert patch_file(str(path), KEY, VALUE)
+    assert not path.read_bytes().startswith(b"\xef\xbb\xbf")
+    assert loads(path.read_text(encoding="utf-8")) == {KEY: VALUE}
@@ -0,0 +1,101 @@
+import sqlite3
+
+import pytest
+
+import sqlite_store
+from projects import JsonDirectoryStore, Project, ProjectStore
+from sqlite_store import SqliteProjectStore
+
+
+class HalfStore(ProjectStore):
+    def load_batches(self, batch_size=1):
+        yield [], 0, 0
+
+    def load(self, abs_path):
+        return None
+
+
+class MemoryStore(ProjectStore):
+    """Only required methods, listing comes from ProjectStore defaults"""
+    def __init__(self, projects):
+        super().__init__("styles")
+        self.projects = {project.abs_path: project for project in projects}
+
+    def load_batches(self, batch_size=2):
+        projects = list(self.projects.values())
+        for start in range(0, len(projects), batch_size):
+            batch = projects[start:start + batch_size]
+            yield batch, start + len(batch), len(projects)
+
+    def load(self, abs_path):
+        return self.projects.get(abs_path)
+
+    def project_path(self, name):
+        return f"/memory/{name}.json"
+
+    def save(self, project):
+        self.projects[project.abs_path] = project
+
+    def delete(self, project):
+        self.projects.pop(project.abs_path, None)
+
+
+def test_half_implemented_store_fails_on_creation(tmp_path):
+    with pytest.raises(TypeError, match="project_path"):
+        HalfStore(str(tmp_path))
+
+
+def test_json_store_implements_store(tmp_path):
+    assert JsonDirectoryStore(str(tmp_path)).folder == str(tmp_path)
+
+
+def test_default_listing_of_store():
+    store = MemoryStore([Project(name, tweaks, f"/memory/{name}.json") for name, tweaks in [
+        ("beta", ["center_tabs"]), ("Alpha", []), ("gamma", ["center_tabs", "hide_vscode_icon"]), ("alps", [])]])
+
+    assert store.count() == 4
+    assert store.count("AL") == 2
+    assert [project.name for project in store.page(1, 2)] == ["alps", "beta"]
+    assert [project.name for project in store.page(0, 10, "a")] == ["Alpha", "alps", "beta", "gamma"]
+    assert sorted(project.name for project in store.projects_using("center_tabs")) == ["beta", "gamma"]
+
+
+def columns(db_path) -> list[str]:
+    with sqlite3.connect(db_path) as connection:
+        return [row[1] for row in connection.execute("PRAGMA table_info(projects)")]
+
+
+def user_version(db_path) -> int:
+    with sqlite3.connect(db_path) as connection:
+        return connection.execute("PRAGMA user_version").fetchone()[0]
+
+
+def test_failed_migration_leaves_database_unchanged(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "projects.db")
+    with sqlite3.connect(db_path) as connection:
+        connection.execute("CREATE TABLE projects (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE, tweaks TEXT NOT NULL)")
+        connection.execute("PRAGMA user_version = 1")
+    monkeypatch.setitem(sqlite_store.MIGRATIONS, 2, ["ALTER TABLE missing ADD COLUMN params TEXT"])
+
+    with pytest.raises(sqlite3.OperationalError):
+        SqliteProjectStore(db_path, str(tmp_path / "styles"))
+
+    assert columns(db_path) == ["id", "name", "tweaks"]
+    assert user_version(db_path) == 1
+
+
+def test_migration_upgrades_old_database(tmp_path):
+    db_path = str(tmp_path / "projects.db")
+    with sqlite3.connect(db_path) as connection:
+        connection.execute("CREATE TABLE projects (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE, tweaks TEXT NOT NULL)")
+        connection.execute("INSERT INTO projects (name, tweaks) VALUES ('old', '[\"center_tabs\"]')")
+        connection.execute("PRAGMA user_version = 1")
+
+    store = SqliteProjectStore(db_path, str(tmp_path / "styles"))
+    try:
+        assert [project.name for project in store.projects_using("center_tabs")] == []
+        assert [project.name for project in store.page(0, 10)] == ["old"]
+    finally:
+        store.close()
+    assert user_version(db_path) == sqlite_store.SCHEMA_VERSION
+    assert columns(db_path) == ["id", "name", "tweaks", "extends", "removed", "params"]
@@ -0,0 +1,56 @@
+import os
+
+import pytest
+
+from dom import load_snapshot
+from pruning import find_dead_rules, prune_css, tweak_dead_rules
+from tweaks import TWEAKS
+
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+@pytest.fixture(scope="module")
+def palette_closed():
+    return load_snapshot(os.path.join(FIXTURES, "workbench-palette-closed.html"))
+
+
+def test_negated_dynamic_attribute_is_not_dead(palette_closed):
+    # snapshot has style="display: none;" on quick input, palette can still be opened
+    assert palette_closed.matches_any('body:has(.quick-input-widget:not([style*="display: none;"])) .monaco-grid-view')
+    assert tweak_dead_rules(TWEAKS.get("blur_bg_cmd_palette"), palette_closed) == []
+
+
+def test_dynamic_attribute_value_is_not_dead(palette_closed):
+    assert palette_closed.matches_any('.quick-input-widget .monaco-list[aria-label*="Select Color Theme"]')
+
+
+def test_static_structure_is_still_checked(palette_closed):
+    assert not palette_closed.matches_any(".monaco-workbench .part.sidebar>.title")
+    assert not palette_closed.matches_any(".quick-input-widget>.monaco-list")
+    assert palette_closed.matches_any(".monaco-workbench .part.statusbar>.right-items")
+
+
+def test_prune_drops_only_dead_selectors(palette_closed):
+    css = ".part.statusbar>.left-items, .part.sidebar{display:none}.part.panel{color:red}"
+    assert [dead for _, dead in find_dead_rules(css, palette_closed)] == [[".part.sidebar"], [".part.panel"]]
+    assert prune_css(css, palette_closed) == ".part.statusbar>.left-items{display:none}"
+
+
+def test_state_class_missing_from_snapshot_is_not_dead(palette_closed):
+    # snapshot was taken with editor unfocused and no dirty tab
+    assert "focused" not in palette_closed.by_class and "dirty" not in palette_closed.by_class
+    assert palette_closed.matches_any(".part.editor .editor-group-container.focused .tab.dirty")
+    assert palette_closed.matches_any('.part.editor .tab[class~="dirty"]')
+    assert find_dead_rules(".tabs-container>.tab.dirty .label-name{font-style:italic}", palette_closed) == []
+
+
+def test_state_class_is_not_surely_present(palette_closed):
+    # second tab is inactive in snapshot, first one may lose .active too
+    assert palette_closed.matches_any(".tabs-container>.tab:not(.active)")
+    assert palette_closed.matches_any(".tabs-container>.tab:first-child:not(.active)")
+
+
+def test_renamed_class_is_still_dead(palette_closed):
+    assert not palette_closed.matches_any(".part.editor .tab.dirty .renamed-label")
+    assert not palette_closed.matches_any('.part.editor [class~="renamed-label"]')
@@ -0,0 +1,94 @@
+import itertools
+
+import pytest
+
+from search import IncrementalSearch, SearchIndex, fuzzy_prefix_match, tokenize
+from tweaks import Tweak, TweakRegistry
+
+
+TWEAKS = [
+    ("hide_vscode_icon", "Hide VSCode icon", "Removes application icon from title bar"),
+    ("center_tabs", "Center opened tabs", "Tabs are centered in editor title"),
+    ("center_tab_text", "Center text on tabs", "Label of every tab is centered"),
+    ("blur_bg_cmd_palette", "Blur bg on command palette", "Blurs workbench behind quick input"),
+    ("hide_layout_buttons", "Hide layout settings from top bar", "Layout buttons are hidden"),
+    ("sidebar_14px", "14px sidebar margin", "Adds 14px margin to sidebar items"),
+    ("status_bar_compact", "Compact status bar", "Smaller status bar items"),
+]
+
+
+@pytest.fixture
+def index():
+    registry = TweakRegistry([Tweak(id, name, description, "a{}") for id, name, description in TWEAKS])
+    return SearchIndex(registry)
+
+
+def ids(index, ordinals) -> list[str]:
+    return [index.registry.by_ordinal(ordinal).id for ordinal in ordinals]
+
+
+def test_prefix_matching(index):
+    assert ids(index, index.search("cent")) == ["center_tabs", "center_tab_text"]
+    assert ids(index, index.search("center text")) == ["center_tab_text"]
+    assert ids(index, index.search("hi ic")) == ["hide_vscode_icon"]
+    assert ids(index, index.search("")) == [id for id, _, _ in TWEAKS]
+
+
+def test_one_typo_matches_long_terms(index):
+    # substitution, missing character, extra character, swapped neighbours
+    for query in ("cemter", "cnter", "centter", "cetner"):
+        assert ids(index, index.search(query)) == ["center_tabs", "center_tab_text"], query
+    assert index.search("cxntxr") == []
+    # short terms and numbers are matched by prefix only
+    assert ids(index, index.search("tab")) == ["center_tabs", "center_tab_text"]
+    assert ids(index, index.search("14")) == ["sidebar_14px"]
+    assert index.search("15") == [] and index.search("1444") == []
+
+
+def test_fuzzy_prefix_match():
+    assert fuzzy_prefix_match("palete", "palette")
+    assert fuzzy_prefix_match("plaette", "palette")
+    assert not fuzzy_prefix_match("xalette", "palette")
+    assert not fuzzy_prefix_match("paxxtte", "palette")
+
+
+QUERIES = ["c", "ce", "cen", "cent", "centr", "center", "center t", "center te", "center tex",
+           "b", "bl", "blu", "blur", "blurr", "hide l", "hide la", "status b", "status ba", "14", "14p"]
+
+
+# narrowing checks candidates one by one below SCAN_LIMIT, intersects with index above it
+@pytest.mark.parametrize("scan_limit", [IncrementalSearch.SCAN_LIMIT, 0])
+def test_narrowed_result_matches_fresh_search(index, monkeypatch, scan_limit):
+    monkeypatch.setattr(IncrementalSearch, "SCAN_LIMIT", scan_limit)
+    for query in QUERIES:
+        session = IncrementalSearch(index)
+        for length in range(1, len(query) + 1):
+            prefix = query[:length]
+            assert session.update(prefix) == index.search(prefix), prefix
+
+
+def test_any_typing_sequence_matches_fresh_search(index):
+    session = IncrementalSearch(index)
+    for first, second in itertools.product(QUERIES, repeat=2):
+        for query in (first, second, first + " " + second):
+            assert session.update(query) == index.search(query), query
+
+
+def test_backspace_restores_earlier_results(index):
+    session = IncrementalSearch(index)
+    typed = ["s", "st", "sta", "status", "status x"]
+    results = [list(session.update(query)) for query in typed]
+    assert results[-1] == []
+
+    for query, expected in zip(reversed(typed[:-1]), reversed(results[:-1])):
+        assert session.update(query) == expected
+        assert session.history[tuple(tokenize(query))] is session.result
+    assert session.update("") == list(range(len(TWEAKS)))
+
+
+def test_catalog_change_resets_session(index):
+    session = IncrementalSearch(index)
+    assert ids(index, session.update("compact")) == ["status_bar_compact"]
+    index.registry.register(Tweak("compact_tabs", "Compact tabs", "", "a{}"))
+    index.build()
+    assert ids(index, session.update("compact")) == ["status_bar_compact", "compact_tabs"]
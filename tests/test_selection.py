@@ -0,0 +1,74 @@
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from selection import TweakSelection
+from tweaks import TWEAKS
+
+
+KNOWN = ["center_tabs", "hide_vscode_icon", "blur_bg_cmd_palette"]
+
+
+def test_selection_order_is_kept():
+    selection = TweakSelection(KNOWN)
+    assert selection.ids() == KNOWN
+    assert not selection.add("hide_vscode_icon")
+    selection.remove("hide_vscode_icon")
+    selection.add("hide_vscode_icon")
+    assert selection.ids() == ["center_tabs", "blur_bg_cmd_palette", "hide_vscode_icon"]
+    assert len(selection) == 3
+
+
+def test_repeated_toggling_compacts_order():
+    selection = TweakSelection(KNOWN)
+    for _ in range(50):
+        selection.remove("center_tabs")
+        selection.add("center_tabs")
+    assert selection.ids() == ["hide_vscode_icon", "blur_bg_cmd_palette", "center_tabs"]
+    assert len(selection._order) <= 2 * len(selection) + 8
+
+
+def test_unknown_ids_come_after_known_ones():
+    selection = TweakSelection(["removed_from_catalog", "center_tabs", "other_unknown", "hide_vscode_icon"])
+    assert selection.ids() == ["center_tabs", "hide_vscode_icon", "removed_from_catalog", "other_unknown"]
+    assert "other_unknown" in selection
+    assert selection.remove("removed_from_catalog")
+    assert not selection.remove("removed_from_catalog")
+    assert selection.to_json() == ["center_tabs", "hide_vscode_icon", "other_unknown"]
+
+
+def test_equality_and_unhashable():
+    assert TweakSelection(KNOWN) == TweakSelection(KNOWN)
+    assert TweakSelection(KNOWN) == KNOWN
+    assert TweakSelection(KNOWN) != TweakSelection(list(reversed(KNOWN)))
+    with pytest.raises(TypeError):
+        hash(TweakSelection(KNOWN))
+
+
+def test_copy_is_independent():
+    selection = TweakSelection(KNOWN + ["unknown_tweak"])
+    selection.remove("center_tabs")
+    copy = selection.copy()
+    copy.add("center_tabs")
+    copy.remove("unknown_tweak")
+    assert selection.ids() == ["hide_vscode_icon", "blur_bg_cmd_palette", "unknown_tweak"]
+    assert copy.ids() == ["hide_vscode_icon", "blur_bg_cmd_palette", "center_tabs"]
+
+
+def test_pickle_round_trip():
+    selection = TweakSelection(KNOWN + ["unknown_tweak"])
+    selection.remove("hide_vscode_icon")
+    restored = pickle.loads(pickle.dumps(selection))
+    assert restored == selection
+    assert restored.registry is TWEAKS
+
+
+def _ids(selection: TweakSelection) -> list[str]:
+    return selection.ids()
+
+
+def test_round_trip_through_process_pool():
+    selection = TweakSelection(["unknown_tweak"] + list(reversed(KNOWN)))
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        assert executor.submit(_ids, selection).result() == selection.ids()
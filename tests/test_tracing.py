@@ -0,0 +1,21 @@
+import tracing
+
+
+def test_worker_records_are_merged_without_export(monkeypatch):
+    monkeypatch.setattr(tracing._state, "enabled", False)
+    monkeypatch.setattr(tracing._state, "path", "parent-trace.json")
+    monkeypatch.setattr(tracing._state, "events", [])
+    monkeypatch.setattr(tracing._state, "counters", {"render.cache_hits": 1})
+
+    tracing.start_worker((True, tracing._origin))
+    assert tracing._state.path is None
+    with tracing.span("render.write_css"):
+        tracing.count("render.cache_hits", 2)
+    recorded = tracing.take_recorded()
+    assert tracing.take_recorded() == {"events": [], "counters": {}}
+
+    tracing.reset()
+    tracing._state.counters["render.cache_hits"] = 1
+    tracing.merge(recorded)
+    assert tracing._state.counters == {"render.cache_hits": 3}
+    assert [event["name"] for event in tracing._state.events] == ["render.cache_hits", "render.write_css"]
@@ -0,0 +1,76 @@
+import json
+import os
+
+from vscode_targets import CUSTOM_UI_STYLE_IMPORTS, apply_css, css_import_uri, discover_targets
+
+
+def make_settings(path, text: str = "{}\n"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return str(path)
+
+
+def test_discovers_builds_profiles_and_flatpak_in_fake_home(tmp_path, monkeypatch):
+    other = tmp_path / "other-config"
+    make_settings(other / "Code" / "User" / "settings.json")
+    # real environment of current user must not leak into fake home
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(other))
+    home = tmp_path / "home"
+    config = home / ".config"
+    make_settings(config / "Code" / "User" / "settings.json")
+    make_settings(config / "Code" / "User" / "profiles" / "work" / "settings.json")
+    make_settings(config / "VSCodium" / "User" / "settings.json")
+    os.makedirs(config / "Code - Insiders" / "User")
+    make_settings(home / ".var" / "app" / "com.visualstudio.code" / "config" / "Code" / "User" / "settings.json")
+
+    targets = discover_targets(home=str(home), platform="linux")
+
+    assert [target.label for target in targets] == ["Code", "Code (work)", "VSCodium", "Code"]
+    assert all(target.path.startswith(str(home)) for target in targets)
+
+
+def test_config_roots_of_other_platforms(tmp_path):
+    home = tmp_path / "home"
+    mac = make_settings(home / "Library" / "Application Support" / "Code" / "User" / "settings.json")
+    windows = make_settings(home / "AppData" / "Roaming" / "Code" / "User" / "settings.json")
+
+    assert [target.path for target in discover_targets(home=str(home), platform="darwin")] == [mac]
+    assert [target.path for target in discover_targets(home=str(home), platform="win32")] == [windows]
+
+
+def test_symlinked_profile_is_found_once(tmp_path):
+    home = tmp_path / "home"
+    user = home / ".config" / "Code" / "User"
+    make_settings(user / "settings.json")
+    os.makedirs(user / "profiles" / "same")
+    os.symlink(user / "settings.json", user / "profiles" / "same" / "settings.json")
+
+    assert [target.label for target in discover_targets(home=str(home), platform="linux")] == ["Code"]
+
+
+def test_apply_css_patches_only_given_targets(tmp_path):
+    home = tmp_path / "home"
+    user = home / ".config" / "Code" / "User"
+    make_settings(user / "settings.json", '{\n    // keep me\n    "editor.fontSize": 14,\n}\n')
+    skipped = make_settings(user / "profiles" / "skipped" / "settings.json", "{}\n")
+    targets = discover_targets(home=str(home), platform="linux")
+    css_path = str(tmp_path / "project.css")
+
+    results = apply_css([target for target in targets if target.profile is None], css_path)
+
+    assert [(result.changed, result.error) for result in results] == [(True, None)]
+    text = (user / "settings.json").read_text(encoding="utf-8")
+    assert "// keep me" in text
+    assert f'"{CUSTOM_UI_STYLE_IMPORTS}": {json.dumps([css_import_uri(css_path)])}' in text
+    assert open(skipped, encoding="utf-8").read() == "{}\n"
+    assert not apply_css(targets[:1], css_path)[0].changed
+
+
+def test_apply_css_reports_broken_settings(tmp_path):
+    home = tmp_path / "home"
+    make_settings(home / ".config" / "Code" / "User" / "settings.json", "[1, 2]\n")
+
+    results = apply_css(discover_targets(home=str(home), platform="linux"), str(tmp_path / "project.css"))
+
+    assert results[0].error and not results[0].changed
@@ -0,0 +1,32 @@
+import json
+import os
+
+import watcher
+from fileutil import atomic_write
+from projects import ProjectHandler
+from watcher import StylesWatcher
+
+
+def write_project(folder, name: str, title: str = None):
+    atomic_write(str(folder / f"{name}.json"), json.dumps({"name": title or name, "tweaks": []}).encode())
+
+
+def test_listing_stats_only_new_missing_and_replaced_files(tmp_path, monkeypatch):
+    for i in range(5):
+        write_project(tmp_path, f"project-{i}")
+    styles_watcher = StylesWatcher(ProjectHandler(str(tmp_path)))
+    assert styles_watcher.poll_listing() == []
+
+    write_project(tmp_path, "project-1", "renamed")
+    write_project(tmp_path, "added")
+    os.remove(tmp_path / "project-2.json")
+    stated = []
+    real_stat = os.stat
+    monkeypatch.setattr(watcher.os, "stat", lambda path, *args, **kwargs: stated.append(path) or real_stat(path, *args, **kwargs))
+
+    events = styles_watcher.poll_listing()
+    assert sorted((kind, os.path.basename(path)) for kind, path in events) == [
+        ("added", "added.json"), ("changed", "project-1.json"), ("removed", "project-2.json")]
+    assert sorted(os.path.basename(path) for path in stated) == ["added.json", "project-1.json", "project-2.json"]
+    styles_watcher.apply(events)
+    assert styles_watcher.poll_listing() == []
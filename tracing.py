@@ -0,0 +1,216 @@
+"""Lightweight spans and counters.
+
+Disabled by default, then span() returns shared no-op object and traced functions
+only check one flag. Enable with VSCODE_TWEAKS_TRACE=<path> (or "1" for default path),
+--trace flag of cli/main or enable(). Chrome trace-event json is written to path and
+plain text summary next to it (path + ".txt") at exit.
+Worker processes record with start_worker() and send take_recorded() back, parent merge()s it.
+"""
+import os
+import sys
+import json
+import time
+import atexit
+import threading
+import functools
+
+
+ENV_VAR = "VSCODE_TWEAKS_TRACE"
+DEFAULT_TRACE_PATH = "vscode-tweaks-trace.json"
+
+
+class _State:
+    enabled = False
+    path: str | None = None
+    events: list = []
+    counters: dict[str, float] = {}
+    lock = threading.Lock()
+    exit_hook = False
+
+
+_state = _State()
+_origin = time.perf_counter()
+
+
+def _now_us() -> float:
+    return (time.perf_counter() - _origin) * 1_000_000
+
+
+class _NoSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+class _Span:
+    def __init__(self, name: str, args: dict) -> None:
+        self.name = name
+        self.args = args
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = _now_us()
+        return self
+
+    def __exit__(self, *exc):
+        end = _now_us()
+        _state.events.append({
+            "name": self.name,
+            "ph": "X",
+            "ts": self.start,
+            "dur": end - self.start,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": self.args,
+        })
+        return False
+
+    def set(self, **args):
+        """Adds arguments known only at the end of span"""
+        self.args.update(args)
+
+
+def is_enabled() -> bool:
+    return _state.enabled
+
+
+def enable(path: str = None):
+    """Starts recording, with path results are exported at interpreter exit"""
+    _state.enabled = True
+    if path:
+        _state.path = path
+        if not _state.exit_hook:
+            _state.exit_hook = True
+            atexit.register(_export_at_exit)
+
+
+def disable():
+    _state.enabled = False
+
+
+def reset():
+    _state.events = []
+    _state.counters = {}
+
+
+def worker_state() -> tuple:
+    """Passed to initializer of worker process, see start_worker"""
+    return _state.enabled, _origin
+
+
+def start_worker(state: tuple):
+    """Records in worker process when parent does, with timestamps on parent clock.
+    Worker never exports, parent merges what take_recorded() returns with result of each task"""
+    global _origin
+    _state.enabled, _origin = state
+    # set by env var on import under spawn, or inherited under fork, would overwrite trace file of parent
+    _state.path = None
+    reset()
+
+
+def take_recorded() -> dict | None:
+    """Events and counters recorded since last call, None when disabled"""
+    if not _state.enabled:
+        return None
+    with _state.lock:
+        recorded = {"events": _state.events, "counters": _state.counters}
+        reset()
+    return recorded
+
+
+def merge(recorded: dict | None):
+    """Adds what take_recorded() returned in other process"""
+    if not recorded:
+        return
+    with _state.lock:
+        _state.events.extend(recorded["events"])
+        for name, value in recorded["counters"].items():
+            _state.counters[name] = _state.counters.get(name, 0) + value
+
+
+def span(name: str, **args):
+    """Context manager measuring block, use as `with span("render", project=name):`"""
+    if not _state.enabled:
+        return _NO_SPAN
+    return _Span(name, args)
+
+
+def traced(name: str = None):
+    """Decorator wrapping every call of function into span"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _state.enabled:
+                return func(*args, **kwargs)
+            with _Span(span_name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name: str, value: float = 1):
+    if not _state.enabled:
+        return
+    with _state.lock:
+        total = _state.counters.get(name, 0) + value
+        _state.counters[name] = total
+    _state.events.append({"name": name, "ph": "C", "ts": _now_us(), "pid": os.getpid(), "args": {name: total}})
+
+
+def chrome_trace() -> dict:
+    return {"traceEvents": list(_state.events), "displayTimeUnit": "ms"}
+
+
+def export_chrome(path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(chrome_trace(), f)
+
+
+def summary() -> str:
+    stats: dict[str, list[float]] = {}
+    for event in _state.events:
+        if event["ph"] == "X":
+            stats.setdefault(event["name"], []).append(event["dur"] / 1000)
+
+    lines = [f"{'span':<48} {'calls':>7} {'total ms':>10} {'mean ms':>9} {'max ms':>9}"]
+    for name, durations in sorted(stats.items(), key=lambda item: sum(item[1]), reverse=True):
+        lines.append(f"{name:<48} {len(durations):>7} {sum(durations):>10.2f} {sum(durations) / len(durations):>9.3f} {max(durations):>9.3f}")
+    if _state.counters:
+        lines.append("")
+        lines.append(f"{'counter':<48} {'value':>7}")
+        for name, value in sorted(_state.counters.items()):
+            lines.append(f"{name:<48} {value:>7g}")
+    return "\n".join(lines)
+
+
+def _export_at_exit():
+    if not _state.events or not _state.path:
+        return
+    try:
+        export_chrome(_state.path)
+        text = summary()
+        with open(_state.path + ".txt", "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(text, file=sys.stderr)
+        print(f"Trace saved to {_state.path}", file=sys.stderr)
+    except OSError as e:
+        print(f"Error saving trace: {e}", file=sys.stderr)
+
+
+def enable_from_env():
+    value = os.environ.get(ENV_VAR)
+    if value:
+        enable(DEFAULT_TRACE_PATH if value == "1" else value)
+
+
+enable_from_env()
@@ -1,14 +1,196 @@
+import os
+import json
+import mmap
+
+from templates import Template, TweakParam
+
+
+# next to main.py, not in working directory main.py is started from
+CATALOGS_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalogs")
+PACK_EXTENSION = ".pack"
+PACK_VERSION = 2
+# version 1 packs have no params
+PACK_VERSIONS = (1, PACK_VERSION)
+
+
+class PackedContent:
+    """Read-only memory map of css bodies file of a tweak pack, shared by all its tweaks"""
+    __slots__ = ("path", "_map")
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            # empty file can not be mapped
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+
+    def read(self, offset: int, length: int) -> str:
+        return self._map[offset:offset + length].decode("utf-8")
+
+
 class Tweak:
-    def __init__(self, id: str, name: str, description: str, content: str, conflicts: list[str] = None) -> None:
+    """Content of packed tweak stays in pack file until it is read.
+    Content of tweak with params is a template, {{name}} is replaced by parameter value (see css)"""
+    __slots__ = ("id", "name", "description", "conflicts", "has_conflicts", "params", "_content", "_packed", "_registry",
+                 "_template")
+
+    def __init__(self, id: str, name: str, description: str, content: str, conflicts: list[str] = None,
+                 params: list[TweakParam] = None) -> None:
         self.id = id
         self.name = name
         self.description = description
+        self.params = params if params is not None else []
+        # registry the tweak belongs to, its version is bumped when content changes
+        self._registry = None
+        # (PackedContent, offset, length) while content is not set directly
+        self._packed = None
+        self._template = None
         self.content = content 
         self.conflicts = conflicts if conflicts is not None else []
         self.has_conflicts = len(self.conflicts) > 0
 
+    @property
+    def content(self) -> str:
+        if self._packed is not None:
+            source, offset, length = self._packed
+            # decoded on every access, so only rendered tweaks are resident
+            return source.read(offset, length)
+        return self._content
+
+    @content.setter
+    def content(self, value: str):
+        self._content = value
+        self._packed = None
+        if value is not None:
+            self._compile()
+        if self._registry is not None:
+            self._registry.version += 1
+
+    def _compile(self):
+        """Compiles content once, raises ParamError when it uses undeclared parameter"""
+        self._template = Template(self.content, self.params) if self.params else None
+
+    def css(self, values: dict = None) -> str:
+        """Content with parameter values (dict name -> value, defaults for missing ones) substituted"""
+        if self._template is None:
+            return self.content
+        return self._template.render(values)
+
+    @property
+    def content_key(self):
+        """Changes whenever content changes, cheap to compare (packed content is not read)"""
+        return self._packed if self._packed is not None else self._content
+
+    @staticmethod
+    def from_pack(data: dict, source: PackedContent):
+        tweak = Tweak(data["id"], data.get("name", data["id"]), data.get("description", ""), None, data.get("conflicts", []),
+                      _params(data))
+        tweak._packed = (source, data["offset"], data["length"])
+        # only templates are read at load
+        if tweak.params:
+            tweak._compile()
+        return tweak
+
+    @staticmethod
+    def from_json(data: dict):
+        return Tweak(
+            data["id"],
+            data.get("name", data["id"]),
+            data.get("description", ""),
+            data.get("content", ""),
+            data.get("conflicts", []),
+            _params(data)
+        )
+
+
+def _params(data: dict) -> list[TweakParam]:
+    return [TweakParam.from_json(item) for item in data.get("params", [])]
+
 
-TWEAKS = [
+class TweakRegistry:
+    """Catalog of tweaks indexed by id, keeps registration order as ordinal"""
+    def __init__(self, tweaks: list[Tweak] = None) -> None:
+        self._tweaks: list[Tweak] = []
+        self._by_id: dict[str, Tweak] = {}
+        self._ordinals: dict[str, int] = {}
+        # changes on every register and tweak content change, lets derived structures
+        # (conflict graph, render cache) know they are stale
+        self.version = 0
+        if tweaks:
+            for tweak in tweaks:
+                self.register(tweak)
+
+    def register(self, tweak: Tweak) -> int:
+        """Adds tweak to catalog, tweak with same id is replaced but keeps its ordinal"""
+        ordinal = self._ordinals.get(tweak.id)
+        if ordinal is None:
+            ordinal = len(self._tweaks)
+            self._tweaks.append(tweak)
+            self._ordinals[tweak.id] = ordinal
+        else:
+            self._tweaks[ordinal] = tweak
+        self._by_id[tweak.id] = tweak
+        tweak._registry = self
+        self.version += 1
+        return ordinal
+
+    def get(self, id: str) -> Tweak | None:
+        return self._by_id.get(id)
+
+    def ordinal(self, id: str) -> int | None:
+        return self._ordinals.get(id)
+
+    def by_ordinal(self, ordinal: int) -> Tweak:
+        return self._tweaks[ordinal]
+
+    def load_catalog(self, path: str) -> int:
+        """Loads tweak pack from json file, returns count of loaded tweaks"""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get("tweaks", [])
+        for item in data:
+            self.register(Tweak.from_json(item))
+        return len(data)
+
+    def load_pack(self, path: str) -> int:
+        """Loads packed catalog (see write_pack), css bodies are read lazily through mmap"""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") not in PACK_VERSIONS:
+            raise ValueError(f"Unsupported pack version {data.get('version')}")
+        source = PackedContent(os.path.join(os.path.dirname(path), data["content"]))
+        for item in data["tweaks"]:
+            self.register(Tweak.from_pack(item, source))
+        return len(data["tweaks"])
+
+    def load_catalogs(self, folder: str = CATALOGS_FOLDER) -> int:
+        """Loads every *.json and *.pack tweak pack from folder in name order"""
+        loaded = 0
+        if not os.path.isdir(folder):
+            return loaded
+        for file in sorted(os.listdir(folder)):
+            if file.endswith(".json") or file.endswith(PACK_EXTENSION):
+                load = self.load_pack if file.endswith(PACK_EXTENSION) else self.load_catalog
+                try:
+                    loaded += load(os.path.join(folder, file))
+                except Exception as e:
+                    print(f"Error loading catalog {file}: {e}")
+        return loaded
+
+    def __contains__(self, id: str) -> bool:
+        return id in self._by_id
+
+    def __iter__(self):
+        return iter(self._tweaks)
+
+    def __len__(self) -> int:
+        return len(self._tweaks)
+
+    def __getitem__(self, index):
+        return self._tweaks[index]
+
+
+TWEAKS = TweakRegistry([
     Tweak(
         "hide_vscode_icon", 
         "Hide VSCode icon", 
@@ -23,8 +205,9 @@ TWEAKS = [
         "Add 14px margin to topbar",
         "If you hiding vscode icon this tweak is very recommended because many windows in vscode having margin 14px",
         """.monaco-workbench .part.titlebar>.titlebar-container>.titlebar-left>.menubar {
-  margin-left: 14px !important;
-}"""
+  margin-left: {{margin}} !important;
+}""",
+        params=[TweakParam("margin", "length", "14px", "Margin")]
     ),
     Tweak(
         "blur_bg_cmd_palette",
@@ -32,14 +215,15 @@ TWEAKS = [
         "Adding blur to bg when opening command palette (control + shift + p)",
         """/** style(command-palette) add blur underlay */
 body:has(.quick-input-widget:not([style*="display: none;"])) .monaco-grid-view {
-  filter: blur(var(--al-command-palette-blur-amount, 4px)) brightness(70%) !important;
+  filter: blur(var(--al-command-palette-blur-amount, {{blur}})) brightness({{brightness}}) !important;
 }
 
 /** style(command-palette) remove blur underlay when color theme selection */
 body:has(.quick-input-widget .monaco-list[aria-label*="Select Color Theme"]) .monaco-grid-view,
 body:has(.quick-input-widget .monaco-list[aria-label*="Select File Icon"]) .monaco-grid-view {
   filter: initial !important;
-}"""
+}""",
+        params=[TweakParam("blur", "length", "4px", "Blur radius"), TweakParam("brightness", "percentage", "70%", "Brightness")]
     ),
     Tweak(
         "center_tabs",
@@ -54,8 +238,9 @@ body:has(.quick-input-widget .monaco-list[aria-label*="Select File Icon"]) .mona
         "Dynamic tabs size",
         "Expands tabs on tab line to fill empty space",
         """.monaco-workbench .part.editor>.content .editor-group-container>.title .tabs-container>.tab.sizing-fit[role="tab"] {
-    flex: 1 1 300px !important; 
-}"""
+    flex: 1 1 {{basis}} !important; 
+}""",
+        params=[TweakParam("basis", "length", "300px", "Tab width")]
     ),
     Tweak(
         "center_tab_text",
@@ -122,30 +307,60 @@ body:has(.quick-input-widget .monaco-list[aria-label*="Select File Icon"]) .mona
   display: none !important;
 }"""
     )
-]
+])
+
+
+def write_pack(path: str, tweaks: list[Tweak]) -> int:
+    """Writes tweaks as pack: metadata json at path and css bodies joined into path + ".css".
+    Returns size of css file"""
+    content_path = path + ".css"
+    entries = []
+    offset = 0
+    with open(content_path, "wb") as f:
+        for tweak in tweaks:
+            body = tweak.content.encode("utf-8")
+            f.write(body + b"\n")
+            entry = {
+                "id": tweak.id,
+                "name": tweak.name,
+                "description": tweak.description,
+                "conflicts": tweak.conflicts,
+                "offset": offset,
+                "length": len(body),
+            }
+            if tweak.params:
+                entry["params"] = [param.to_json() for param in tweak.params]
+            entries.append(entry)
+            offset += len(body) + 1
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"version": PACK_VERSION, "content": os.path.basename(content_path), "tweaks": entries}, f)
+    return offset
 
 
 def find_tweak_by_id(id: str):
-    for tweak in TWEAKS:
-        if tweak.id == id:
-            return tweak
-    return None
+    return TWEAKS.get(id)
 
 
 class TweaksHandler:
-    def __init__(self, tweaks: list[str] = None) -> None:
+    def __init__(self, tweaks: list[str] = None, registry: TweakRegistry = None) -> None:
+        self.registry = registry if registry is not None else TWEAKS
         self.tweaks = []
+        self._by_id = {}
         if tweaks:
             for tweak_id in tweaks:
-                tweak = find_tweak_by_id(tweak_id)
+                tweak = self.registry.get(tweak_id)
                 if tweak:
                     self.tweaks.append(tweak)
+                    self._by_id[tweak_id] = tweak
     
     def get_tweak_by_id(self, id: str) -> Tweak:
-        for tweak in self.tweaks:
-            if tweak.id == id:
-                return tweak
-        raise ValueError(f"Tweak with ID '{id}' not found")
+        tweak = self._by_id.get(id)
+        if tweak is None:
+            raise ValueError(f"Tweak with ID '{id}' not found")
+        return tweak
     
-    def get_css_content(self) -> str:
-        return "\n".join([tweak.content for tweak in self.tweaks])
\ No newline at end of file
+    def get_css_content(self, params: dict = None) -> str:
+        """params maps tweak id to its parameter values"""
+        if not params:
+            return "\n".join([tweak.css() for tweak in self.tweaks])
+        return "\n".join([tweak.css(params.get(tweak.id)) for tweak in self.tweaks])
\ No newline at end of file
@@ -0,0 +1,117 @@
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from jsonc import patch_file
+from tracing import traced
+
+
+CUSTOM_UI_STYLE_IMPORTS = "custom-ui-style.external.imports"
+# folder names of VSCode builds inside config root
+PRODUCTS = ["Code", "Code - Insiders", "Code - OSS", "VSCodium", "VSCodium - Insiders"]
+
+
+class SettingsTarget:
+    def __init__(self, product: str, profile: str, path: str) -> None:
+        self.product = product
+        # None for default profile
+        self.profile = profile
+        self.path = path
+
+    @property
+    def label(self) -> str:
+        return f"{self.product} ({self.profile})" if self.profile else self.product
+
+    def __repr__(self) -> str:
+        return f"SettingsTarget({self.label!r}, {self.path!r})"
+
+
+class ApplyResult:
+    def __init__(self, target: SettingsTarget, changed: bool = False, error: str = None, seconds: float = 0.0) -> None:
+        self.target = target
+        self.changed = changed
+        self.error = error
+        self.seconds = seconds
+
+
+def config_roots(home: str = None, platform: str = None, env: dict = None) -> list[str]:
+    """Folders that can contain VSCode user data on given platform.
+    With home given, environment of current user is not read unless env is passed too"""
+    platform = platform if platform is not None else sys.platform
+    if env is None:
+        env = {} if home is not None else os.environ
+    home = home if home is not None else os.path.expanduser("~")
+
+    if platform == "win32":
+        appdata = env.get("APPDATA") or os.path.join(home, "AppData", "Roaming")
+        return [appdata]
+    if platform == "darwin":
+        return [os.path.join(home, "Library", "Application Support")]
+
+    roots = [env.get("XDG_CONFIG_HOME") or os.path.join(home, ".config")]
+    # flatpak builds keep their config inside app sandbox
+    for app_id in ("com.visualstudio.code", "com.vscodium.codium"):
+        roots.append(os.path.join(home, ".var", "app", app_id, "config"))
+    return roots
+
+
+@traced("settings.discover_targets")
+def discover_targets(home: str = None, platform: str = None, env: dict = None) -> list[SettingsTarget]:
+    """Finds settings.json of every installed VSCode build and of its profiles"""
+    targets = []
+    seen = set()
+    for root in config_roots(home, platform, env):
+        for product in PRODUCTS:
+            user_dir = os.path.join(root, product, "User")
+            if not os.path.isdir(user_dir):
+                continue
+
+            candidates = [(None, os.path.join(user_dir, "settings.json"))]
+            profiles_dir = os.path.join(user_dir, "profiles")
+            if os.path.isdir(profiles_dir):
+                for profile in sorted(os.listdir(profiles_dir)):
+                    candidates.append((profile, os.path.join(profiles_dir, profile, "settings.json")))
+
+            for profile, path in candidates:
+                real_path = os.path.realpath(path)
+                if os.path.isfile(path) and real_path not in seen:
+                    seen.add(real_path)
+                    targets.append(SettingsTarget(product, profile, path))
+    return targets
+
+
+def filter_targets(targets: list[SettingsTarget], patterns: list[str]) -> list[SettingsTarget]:
+    """Keeps targets whose label or path contains any of patterns (case insensitive), empty patterns keep all"""
+    if not patterns:
+        return list(targets)
+    patterns = [pattern.lower() for pattern in patterns]
+    return [
+        target for target in targets
+        if any(pattern in target.label.lower() or pattern in target.path.lower() for pattern in patterns)
+    ]
+
+
+def css_import_uri(css_path: str) -> str:
+    return "file://"+css_path
+
+
+def _apply_one(target: SettingsTarget, imports: list[str]) -> ApplyResult:
+    start = time.perf_counter()
+    result = ApplyResult(target)
+    try:
+        result.changed = patch_file(target.path, CUSTOM_UI_STYLE_IMPORTS, imports)
+    except Exception as e:
+        result.error = str(e)
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+@traced("settings.apply_css")
+def apply_css(targets: list[SettingsTarget], css_path: str, max_workers: int = None) -> list[ApplyResult]:
+    """Points Custom UI Style imports of every target to css file, targets are patched concurrently"""
+    if not targets:
+        return []
+    imports = [css_import_uri(css_path)]
+    with ThreadPoolExecutor(max_workers=max_workers or min(8, len(targets))) as executor:
+        return list(executor.map(lambda target: _apply_one(target, imports), targets))
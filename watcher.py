@@ -0,0 +1,96 @@
+import os
+import time
+
+from projects import ProjectHandler
+
+
+class StylesWatcher:
+    """Finds added, changed and removed project files by comparing stats with the last known ones.
+    Only files reported by poll are parsed again, see ProjectHandler.reload_project_file"""
+    def __init__(self, project_handler: ProjectHandler) -> None:
+        self.project_handler = project_handler
+        # abs path -> inode of every project file at last poll_listing, None before first one
+        self.inodes: dict[str, int] | None = None
+
+    def poll(self) -> list[tuple[str, str]]:
+        """Returns (kind, abs path) events, kind is "added", "changed" or "removed". Every file is stat-ed"""
+        known = self.project_handler.file_stats
+        current = {}
+        for _, path, stat in self.project_handler.scan_project_files():
+            current[os.path.abspath(path)] = (stat.st_size, stat.st_mtime_ns)
+        
+        events = []
+        for path, stat in current.items():
+            previous = known.get(path)
+            if previous is None:
+                events.append(("added", path))
+            elif previous != stat:
+                events.append(("changed", path))
+        for path in known.keys() - current.keys():
+            events.append(("removed", path))
+        return events
+
+    def poll_paths(self, paths) -> list[tuple[str, str]]:
+        """Same as poll, but only given files are stat-ed"""
+        known = self.project_handler.file_stats
+        events = []
+        for path in paths:
+            path = os.path.abspath(path)
+            if not path.endswith(".json"):
+                continue
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                if path in known:
+                    events.append(("removed", path))
+                continue
+            previous = known.get(path)
+            if previous is None:
+                events.append(("added", path))
+            elif previous != (stat.st_size, stat.st_mtime_ns):
+                events.append(("changed", path))
+        return events
+
+    def poll_listing(self) -> list[tuple[str, str]]:
+        """Same as poll for directory events, which do not name the file. Folder is listed without stat
+        and only new, missing and replaced (inode changed, as by atomic save) files are stat-ed.
+        Inode costs a stat on Windows, there it is as slow as poll"""
+        folder = self.project_handler.styles_folder_name
+        listed = {}
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".json") and entry.is_file():
+                        listed[os.path.abspath(entry.path)] = entry.inode()
+        except FileNotFoundError:
+            pass
+
+        previous, self.inodes = self.inodes, listed
+        if previous is None:
+            return self.poll()
+        known = self.project_handler.file_stats
+        paths = [path for path, inode in listed.items() if path not in known or previous.get(path) != inode]
+        paths.extend(path for path in known if path not in listed)
+        return self.poll_paths(paths)
+
+    def apply(self, events: list[tuple[str, str]]) -> list[tuple[str, object]]:
+        """Updates project handler by events, returns (event, project) pairs of affected projects"""
+        updates = []
+        for kind, path in events:
+            if kind == "removed":
+                project = self.project_handler.remove_project_file(path)
+                if project:
+                    updates.append(("removed", project))
+            else:
+                event, project = self.project_handler.reload_project_file(path)
+                if event:
+                    updates.append((event, project))
+        return updates
+
+    def watch(self, callback, interval: float = 1.0):
+        """Polls forever, callback gets list of (event, project) whenever something changed"""
+        while True:
+            updates = self.apply(self.poll())
+            if updates:
+                callback(updates)
+            time.sleep(interval)